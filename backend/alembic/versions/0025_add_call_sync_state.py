@@ -0,0 +1,96 @@
+"""Add call_sync_state table for incremental Retell call sync
+
+Revision ID: 0025_add_call_sync_state
+Revises: 0024_remove_user_name_field
+Create Date: 2025-01-23 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect, text
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0025_add_call_sync_state'
+down_revision: Union[str, None] = '0024_remove_user_name_field'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create call_sync_state and make sure calls.provider_call_id has its unique index
+
+    The call sync upserts with ON CONFLICT (provider_call_id) and needs the partial
+    unique index from 0014. 0014 only logged a warning if it could not create it
+    (duplicate or empty ids), so the ids are cleaned up and creation is retried here.
+    """
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    table_names = inspector.get_table_names()
+
+    if 'call_sync_state' not in table_names:
+        op.create_table(
+            'call_sync_state',
+            sa.Column('tenant_id', sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column('high_water_ms', sa.BigInteger(), nullable=True),
+            sa.Column('last_synced_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('last_run_calls', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+        )
+        print("[MIGRATION 0025] Created call_sync_state table")
+
+    if 'calls' not in table_names:
+        print("[MIGRATION 0025] calls table does not exist, skipping provider_call_id index")
+        return
+
+    indexes = [idx['name'] for idx in inspector.get_indexes('calls')]
+    if 'idx_calls_provider_call_id' in indexes:
+        return
+
+    _ensure_provider_call_id_index(conn)
+
+
+def _ensure_provider_call_id_index(conn) -> None:
+    """Clean up calls.provider_call_id and create its partial unique index
+
+    Empty ids become NULL. Of the rows sharing an id, the most recently updated
+    by a webhook (then the newest) keeps it; the others get NULL. No row is
+    deleted, so segments, cost and usage events keep their call. Raises if the
+    index still can't be created: the call sync can't run without it.
+    """
+    result = conn.execute(text("UPDATE calls SET provider_call_id = NULL WHERE provider_call_id = ''"))
+    print(f"[MIGRATION 0025] Cleared {result.rowcount} empty provider_call_id values")
+
+    columns = [col['name'] for col in inspect(conn).get_columns('calls')]
+    order = "id DESC"
+    if 'last_event_at' in columns:
+        order = "CASE WHEN last_event_at IS NULL THEN 1 ELSE 0 END, last_event_at DESC, id DESC"
+    result = conn.execute(text(f"""
+        UPDATE calls SET provider_call_id = NULL
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (PARTITION BY provider_call_id ORDER BY {order}) AS rn
+                FROM calls
+                WHERE provider_call_id IS NOT NULL
+            ) ranked
+            WHERE rn > 1
+        )
+    """))
+    print(f"[MIGRATION 0025] Detached {result.rowcount} duplicate provider_call_id rows")
+
+    op.execute(text("""
+        CREATE UNIQUE INDEX idx_calls_provider_call_id
+        ON calls(provider_call_id)
+        WHERE provider_call_id IS NOT NULL
+    """))
+    print("[MIGRATION 0025] Created unique index idx_calls_provider_call_id")
+
+
+def downgrade() -> None:
+    """Drop call_sync_state (the provider_call_id index belongs to 0014)"""
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    if 'call_sync_state' in inspector.get_table_names():
+        op.drop_table('call_sync_state')
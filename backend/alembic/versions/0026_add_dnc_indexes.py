@@ -0,0 +1,50 @@
+"""Add (tenant_id, e164) and e164 indexes on dnc_numbers
+
+Revision ID: 0026_add_dnc_indexes
+Revises: 0025_add_call_sync_state
+Create Date: 2025-01-24 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0026_add_dnc_indexes'
+down_revision: Union[str, None] = '0025_add_call_sync_state'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_INDEXES = {
+    'idx_dnc_numbers_tenant_e164': ['tenant_id', 'e164'],
+    'idx_dnc_numbers_e164': ['e164'],
+}
+
+
+def upgrade() -> None:
+    """Index DNC lookups (per-tenant and tenant-less checks both filter on e164)"""
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    if 'dnc_numbers' not in inspector.get_table_names():
+        print("[MIGRATION 0026] dnc_numbers table does not exist, skipping")
+        return
+
+    existing = {idx['name'] for idx in inspector.get_indexes('dnc_numbers')}
+    for name, columns in _INDEXES.items():
+        if name not in existing:
+            op.create_index(name, 'dnc_numbers', columns)
+            print(f"[MIGRATION 0026] Created index {name}")
+
+
+def downgrade() -> None:
+    """Drop the DNC lookup indexes"""
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    if 'dnc_numbers' not in inspector.get_table_names():
+        return
+    existing = {idx['name'] for idx in inspector.get_indexes('dnc_numbers')}
+    for name in _INDEXES:
+        if name in existing:
+            op.drop_index(name, table_name='dnc_numbers')
@@ -0,0 +1,46 @@
+"""Add timezone to leads
+
+Revision ID: 0027_add_lead_timezone
+Revises: 0026_add_dnc_indexes
+Create Date: 2025-01-25 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0027_add_lead_timezone'
+down_revision: Union[str, None] = '0026_add_dnc_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add leads.timezone (IANA zone resolved from the phone number at ingest)
+
+    Existing leads keep NULL; compliance derives their zone from the phone until
+    the lead is next updated.
+    """
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    if 'leads' not in inspector.get_table_names():
+        print("[MIGRATION 0027] leads table does not exist, skipping")
+        return
+
+    columns = [col['name'] for col in inspector.get_columns('leads')]
+    if 'timezone' not in columns:
+        op.add_column('leads', sa.Column('timezone', sa.String(length=64), nullable=True))
+        print("[MIGRATION 0027] Added timezone column to leads")
+
+
+def downgrade() -> None:
+    """Drop leads.timezone"""
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    if 'leads' in inspector.get_table_names():
+        columns = [col['name'] for col in inspector.get_columns('leads')]
+        if 'timezone' in columns:
+            op.drop_column('leads', 'timezone')
@@ -0,0 +1,107 @@
+"""Add tenant_id to cost_events and the tenant_spend_monthly ledger
+
+Revision ID: 0028_add_spend_ledger
+Revises: 0027_add_lead_timezone
+Create Date: 2025-01-26 10:00:00.000000
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect, text
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0028_add_spend_ledger'
+down_revision: Union[str, None] = '0027_add_lead_timezone'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Attribute cost events to tenants and create the monthly spend ledger
+
+    Existing cost_events get tenant_id from their call where they have one. The
+    ledger is seeded with the current and previous month so budget checks are
+    correct right after the upgrade; the reconcile job keeps it in step afterwards.
+    """
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    table_names = inspector.get_table_names()
+    if 'cost_events' not in table_names:
+        print("[MIGRATION 0028] cost_events table does not exist, skipping")
+        return
+
+    columns = [col['name'] for col in inspector.get_columns('cost_events')]
+    if 'tenant_id' not in columns:
+        op.add_column('cost_events', sa.Column('tenant_id', sa.Integer(), nullable=True))
+        print("[MIGRATION 0028] Added tenant_id column to cost_events")
+        if 'calls' in table_names:
+            result = conn.execute(text("""
+                UPDATE cost_events
+                SET tenant_id = (SELECT calls.tenant_id FROM calls WHERE calls.id = cost_events.call_id)
+                WHERE tenant_id IS NULL AND call_id IS NOT NULL
+            """))
+            print(f"[MIGRATION 0028] Attributed {result.rowcount} cost events to tenants via calls")
+
+    indexes = [idx['name'] for idx in inspector.get_indexes('cost_events')]
+    if 'idx_cost_events_tenant_ts' not in indexes:
+        op.create_index('idx_cost_events_tenant_ts', 'cost_events', ['tenant_id', 'ts'])
+        print("[MIGRATION 0028] Created index idx_cost_events_tenant_ts")
+
+    if 'tenant_spend_monthly' in table_names:
+        return
+
+    op.create_table(
+        'tenant_spend_monthly',
+        sa.Column('tenant_id', sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column('month', sa.Date(), primary_key=True),
+        sa.Column('spent_cents', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('events', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+        sa.Column('reconciled_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    print("[MIGRATION 0028] Created tenant_spend_monthly table")
+
+    now = datetime.now(timezone.utc)
+    current = date(now.year, now.month, 1)
+    previous = date(current.year - 1, 12, 1) if current.month == 1 else date(current.year, current.month - 1, 1)
+    totals = {}
+    rows = conn.execute(
+        text("SELECT tenant_id, amount, ts FROM cost_events WHERE ts >= :start"),
+        {"start": datetime(previous.year, previous.month, 1, tzinfo=timezone.utc)},
+    )
+    for tenant_id, amount, ts in rows:
+        if ts is None:
+            continue
+        if ts.tzinfo is not None:
+            ts = ts.astimezone(timezone.utc)
+        key = (tenant_id or 0, date(ts.year, ts.month, 1))
+        spent, events = totals.get(key, (0, 0))
+        totals[key] = (spent + int(amount or 0), events + 1)
+    for (tenant_id, month), (spent, events) in totals.items():
+        conn.execute(
+            text("""
+                INSERT INTO tenant_spend_monthly (tenant_id, month, spent_cents, events, updated_at, reconciled_at)
+                VALUES (:tenant_id, :month, :spent, :events, :now, :now)
+            """),
+            {"tenant_id": tenant_id, "month": month, "spent": spent, "events": events, "now": now},
+        )
+    print(f"[MIGRATION 0028] Seeded {len(totals)} tenant_spend_monthly rows")
+
+
+def downgrade() -> None:
+    """Drop the ledger, the index and cost_events.tenant_id"""
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    table_names = inspector.get_table_names()
+    if 'tenant_spend_monthly' in table_names:
+        op.drop_table('tenant_spend_monthly')
+    if 'cost_events' in table_names:
+        indexes = [idx['name'] for idx in inspector.get_indexes('cost_events')]
+        if 'idx_cost_events_tenant_ts' in indexes:
+            op.drop_index('idx_cost_events_tenant_ts', table_name='cost_events')
+        columns = [col['name'] for col in inspector.get_columns('cost_events')]
+        if 'tenant_id' in columns:
+            op.drop_column('cost_events', 'tenant_id')
@@ -0,0 +1,66 @@
+"""Add budget reservations for calls in flight
+
+Revision ID: 0029_add_budget_reservations
+Revises: 0028_add_spend_ledger
+Create Date: 2025-01-27 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0029_add_budget_reservations'
+down_revision: Union[str, None] = '0028_add_spend_ledger'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add tenant_spend_monthly.reserved_cents and the budget_reservations table"""
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    table_names = inspector.get_table_names()
+
+    if 'tenant_spend_monthly' in table_names:
+        columns = [col['name'] for col in inspector.get_columns('tenant_spend_monthly')]
+        if 'reserved_cents' not in columns:
+            op.add_column(
+                'tenant_spend_monthly',
+                sa.Column('reserved_cents', sa.BigInteger(), nullable=False, server_default='0'),
+            )
+            print("[MIGRATION 0029] Added reserved_cents column to tenant_spend_monthly")
+    else:
+        print("[MIGRATION 0029] tenant_spend_monthly table does not exist, skipping reserved_cents")
+
+    if 'budget_reservations' not in table_names:
+        op.create_table(
+            'budget_reservations',
+            sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('tenant_id', sa.Integer(), nullable=False),
+            sa.Column('month', sa.Date(), nullable=False),
+            sa.Column('amount_cents', sa.Integer(), nullable=False),
+            sa.Column('provider_call_id', sa.String(length=128), nullable=True),
+            sa.Column('status', sa.String(length=16), nullable=False, server_default='reserved'),
+            sa.Column('actual_cents', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.Column('closed_at', sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index('idx_budget_reservations_provider_call_id', 'budget_reservations', ['provider_call_id'])
+        op.create_index('idx_budget_reservations_status_created', 'budget_reservations', ['status', 'created_at'])
+        print("[MIGRATION 0029] Created budget_reservations table")
+
+
+def downgrade() -> None:
+    """Drop budget_reservations and tenant_spend_monthly.reserved_cents"""
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    table_names = inspector.get_table_names()
+    if 'budget_reservations' in table_names:
+        op.drop_table('budget_reservations')
+    if 'tenant_spend_monthly' in table_names:
+        columns = [col['name'] for col in inspector.get_columns('tenant_spend_monthly')]
+        if 'reserved_cents' in columns:
+            op.drop_column('tenant_spend_monthly', 'reserved_cents')
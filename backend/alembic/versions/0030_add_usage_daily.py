@@ -0,0 +1,66 @@
+"""Add daily per-tenant usage rollups
+
+Revision ID: 0030_add_usage_daily
+Revises: 0029_add_budget_reservations
+Create Date: 2025-01-28 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0030_add_usage_daily'
+down_revision: Union[str, None] = '0029_add_budget_reservations'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create usage_daily and usage_daily_outcomes
+
+    Tables start empty; run the rollup_usage_daily worker job with a large `days`
+    once after the upgrade to backfill history.
+    """
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    table_names = inspector.get_table_names()
+
+    if 'usage_daily' not in table_names:
+        op.create_table(
+            'usage_daily',
+            sa.Column('tenant_id', sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column('day', sa.Date(), primary_key=True),
+            sa.Column('calls_created', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('calls_finished', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('billed_seconds', sa.BigInteger(), nullable=False, server_default='0'),
+            sa.Column('minutes_billed', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('cost_cents', sa.BigInteger(), nullable=False, server_default='0'),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+        )
+        op.create_index('idx_usage_daily_day', 'usage_daily', ['day'])
+        print("[MIGRATION 0030] Created usage_daily table")
+
+    if 'usage_daily_outcomes' not in table_names:
+        op.create_table(
+            'usage_daily_outcomes',
+            sa.Column('tenant_id', sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column('day', sa.Date(), primary_key=True),
+            sa.Column('outcome', sa.String(length=64), primary_key=True),
+            sa.Column('calls', sa.Integer(), nullable=False, server_default='0'),
+        )
+        op.create_index('idx_usage_daily_outcomes_day', 'usage_daily_outcomes', ['day'])
+        print("[MIGRATION 0030] Created usage_daily_outcomes table")
+
+
+def downgrade() -> None:
+    """Drop the usage rollup tables"""
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    table_names = inspector.get_table_names()
+    if 'usage_daily_outcomes' in table_names:
+        op.drop_table('usage_daily_outcomes')
+    if 'usage_daily' in table_names:
+        op.drop_table('usage_daily')
@@ -0,0 +1,56 @@
+"""Add the metered subscription item and an index for Stripe usage reporting
+
+Revision ID: 0031_add_stripe_usage_reporting
+Revises: 0030_add_usage_daily
+Create Date: 2025-01-29 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0031_add_stripe_usage_reporting'
+down_revision: Union[str, None] = '0030_add_usage_daily'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add subscriptions.stripe_usage_item_id and index usage_events (synced_to_stripe, ts)"""
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    table_names = inspector.get_table_names()
+
+    if 'subscriptions' in table_names:
+        columns = [col['name'] for col in inspector.get_columns('subscriptions')]
+        if 'stripe_usage_item_id' not in columns:
+            op.add_column('subscriptions', sa.Column('stripe_usage_item_id', sa.String(length=128), nullable=True))
+            print("[MIGRATION 0031] Added stripe_usage_item_id column to subscriptions")
+    else:
+        print("[MIGRATION 0031] subscriptions table does not exist, skipping")
+
+    if 'usage_events' in table_names:
+        indexes = [idx['name'] for idx in inspector.get_indexes('usage_events')]
+        if 'idx_usage_events_synced_ts' not in indexes:
+            op.create_index('idx_usage_events_synced_ts', 'usage_events', ['synced_to_stripe', 'ts'])
+            print("[MIGRATION 0031] Created index idx_usage_events_synced_ts")
+    else:
+        print("[MIGRATION 0031] usage_events table does not exist, skipping")
+
+
+def downgrade() -> None:
+    """Drop the index and subscriptions.stripe_usage_item_id"""
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    table_names = inspector.get_table_names()
+    if 'usage_events' in table_names:
+        indexes = [idx['name'] for idx in inspector.get_indexes('usage_events')]
+        if 'idx_usage_events_synced_ts' in indexes:
+            op.drop_index('idx_usage_events_synced_ts', table_name='usage_events')
+    if 'subscriptions' in table_names:
+        columns = [col['name'] for col in inspector.get_columns('subscriptions')]
+        if 'stripe_usage_item_id' in columns:
+            op.drop_column('subscriptions', 'stripe_usage_item_id')
@@ -0,0 +1,55 @@
+"""Add budget_reservations.expires_at
+
+Revision ID: 0033_add_reservation_expiry
+Revises: 0031_add_stripe_usage_reporting
+Create Date: 2025-01-31 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0033_add_reservation_expiry'
+down_revision: Union[str, None] = '0031_add_stripe_usage_reporting'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add expires_at (scheduled dial + TTL) to budget_reservations
+
+    Existing reservations keep expires_at NULL and expire BUDGET_RESERVATION_TTL_S
+    after creation, as before.
+    """
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    if 'budget_reservations' not in inspector.get_table_names():
+        print("[MIGRATION 0033] budget_reservations table does not exist, skipping")
+        return
+
+    columns = [col['name'] for col in inspector.get_columns('budget_reservations')]
+    if 'expires_at' not in columns:
+        op.add_column('budget_reservations', sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True))
+        print("[MIGRATION 0033] Added expires_at column to budget_reservations")
+
+    indexes = [idx['name'] for idx in inspector.get_indexes('budget_reservations')]
+    if 'idx_budget_reservations_status_expires' not in indexes:
+        op.create_index('idx_budget_reservations_status_expires', 'budget_reservations', ['status', 'expires_at'])
+        print("[MIGRATION 0033] Created index idx_budget_reservations_status_expires")
+
+
+def downgrade() -> None:
+    """Drop budget_reservations.expires_at and its index"""
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    if 'budget_reservations' not in inspector.get_table_names():
+        return
+    indexes = [idx['name'] for idx in inspector.get_indexes('budget_reservations')]
+    if 'idx_budget_reservations_status_expires' in indexes:
+        op.drop_index('idx_budget_reservations_status_expires', table_name='budget_reservations')
+    columns = [col['name'] for col in inspector.get_columns('budget_reservations')]
+    if 'expires_at' in columns:
+        op.drop_column('budget_reservations', 'expires_at')
@@ -0,0 +1,163 @@
+"""Logging setup: non-blocking, structured (JSON) and sampled
+
+Request handlers only enqueue log records (QueueHandler); a background
+QueueListener thread formats them and writes to stdout, so stdout flushes never
+happen on the request path. When the queue is full records are dropped (and
+counted) instead of blocking.
+
+Env config:
+    LOG_LEVEL        Root level (default INFO)
+    LOG_LEVELS       Per-logger levels, e.g. "utils.retell=DEBUG,agoralia.api=WARNING"
+    LOG_SAMPLE       Per-logger sampling rate for records below WARNING,
+                     e.g. "agoralia.api=0.1,utils.retell=0.05" (default 1 = keep all)
+    LOG_FORMAT       "json" (default) or "text"
+    LOG_QUEUE_SIZE   Max pending records before dropping (default 10000)
+"""
+import os
+import sys
+import copy
+import json
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+
+# Attributes every LogRecord has; anything else was passed via extra={...}
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_EXC_FORMATTER = logging.Formatter()
+_LISTENER: Optional[logging.handlers.QueueListener] = None
+_STATS: Dict[str, int] = {"dropped": 0, "sampled_out": 0}
+
+
+def _parse_mapping(value: Optional[str]) -> Dict[str, str]:
+    """Parse "a.b=X,c=Y" into {"a.b": "X", "c": "Y"}"""
+    result: Dict[str, str] = {}
+    for part in (value or "").split(","):
+        name, sep, setting = part.partition("=")
+        if sep and name.strip() and setting.strip():
+            result[name.strip()] = setting.strip()
+    return result
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, extra fields, exc"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of sub-WARNING records per logger (longest configured prefix wins)"""
+
+    def __init__(self, rates: Dict[str, float]) -> None:
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, float] = {}
+
+    def _rate_for(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            best = -1
+            for prefix, value in self.rates.items():
+                if (name == prefix or name.startswith(prefix + ".")) and len(prefix) > best:
+                    rate, best = value, len(prefix)
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        _STATS["sampled_out"] += 1
+        return False
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks: drops (and counts) records when the queue is full"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now (they may change after the call) but leave formatting to the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _STATS["dropped"] += 1
+
+
+def setup_logging(force: bool = False) -> None:
+    """Install the queue-based logging pipeline on the root logger (idempotent)
+
+    Args:
+        force: Re-read env config and rebuild handlers even if already configured
+    """
+    global _LISTENER
+    if _LISTENER is not None and not force:
+        return
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        _LISTENER = None
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    for name, level in _parse_mapping(os.getenv("LOG_LEVELS")).items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    rates: Dict[str, float] = {}
+    for name, rate in _parse_mapping(os.getenv("LOG_SAMPLE")).items():
+        try:
+            rates[name] = max(0.0, min(1.0, float(rate)))
+        except ValueError:
+            continue
+
+    stream = logging.StreamHandler(sys.stdout)
+    if os.getenv("LOG_FORMAT", "json").lower() == "text":
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    else:
+        stream.setFormatter(JsonFormatter())
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+    queue_handler = _DroppingQueueHandler(log_queue)
+    if rates:
+        queue_handler.addFilter(SamplingFilter(rates))
+    root.addHandler(queue_handler)
+
+    _LISTENER = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _LISTENER.start()
+    atexit.register(_LISTENER.stop)
+
+
+def get_logging_stats() -> Dict[str, int]:
+    """Counters for records dropped (queue full) and sampled out"""
+    return dict(_STATS)
@@ -14,6 +14,10 @@ load_dotenv(BACKEND_DIR / ".env")
 
 # Import configuration
 from config import init_db, get_cors_origins, run_migrations
+from config.logging_config import setup_logging
+
+# Queue-based JSON logging (LOG_LEVEL / LOG_LEVELS / LOG_SAMPLE / LOG_FORMAT)
+setup_logging()
 
 # Import routes
 from routes import api_router
@@ -24,6 +28,14 @@ run_migrations()
 # Initialize database (non-blocking, creates tables if missing)
 init_db()
 
+# Detect tenant credential columns once (avoids schema introspection per Retell request)
+from utils.retell import init_retell_credentials
+init_retell_credentials(force=True)
+
+# Compile country compliance rules (DB + JSON defaults) so dial-path checks don't query rules
+from services.compliance import load_country_rule_index
+load_country_rule_index(force=True)
+
 # Create FastAPI app
 app = FastAPI(title="Agoralia Backend", version="0.1.0")
 
@@ -37,26 +49,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Structured request logging (minimal)
+# Structured request logging (records are only enqueued here; see config/logging_config.py)
 logger = logging.getLogger("agoralia.api")
-logging.basicConfig(level=logging.INFO)
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start = time.time()
+    start = time.perf_counter()
     path = request.url.path
     method = request.method
+    status = 500
     try:
         response = await call_next(request)
         status = response.status_code
     except Exception as e:
-        status = 500
         logger.exception("Request error: %s %s -> 500 (%s)", method, path, str(e))
         raise
     finally:
-        dur_ms = int((time.time() - start) * 1000)
-        tenant = request.headers.get("X-Tenant-Id") or "-"
-        logger.info("%s %s %s %dms", method, path, f"tenant={tenant}", dur_ms)
+        dur_ms = int((time.perf_counter() - start) * 1000)
+        logger.info(
+            "%s %s %d %dms", method, path, status, dur_ms,
+            extra={
+                "method": method,
+                "path": path,
+                "status": status,
+                "duration_ms": dur_ms,
+                "tenant": request.headers.get("X-Tenant-Id") or "-",
+            },
+        )
     return response
 
 # Serve static files (logos, etc.) BEFORE API routes
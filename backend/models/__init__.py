@@ -1,7 +1,7 @@
 """SQLAlchemy models for Agoralia"""
 from config.database import Base
-from .calls import CallRecord, CallSegment, ScheduledCall
-from .billing import Plan, Subscription, UsageEvent, Addon, Entitlement
+from .calls import CallRecord, CallSegment, ScheduledCall, CallSyncState
+from .billing import Plan, Subscription, UsageEvent, UsageDaily, UsageDailyOutcome, Addon, Entitlement
 from .workflows import WorkflowUsage, WorkflowEmailEvent
 from .users import User
 from .webhooks import WebhookEvent, WebhookDLQ
@@ -11,7 +11,7 @@ from .workspace_settings import WorkspaceSettings
 from .user_preferences import UserPreferences
 from .agents import Agent, KnowledgeBase, KnowledgeSection, PhoneNumber, TenantAgent
 from .campaigns import Campaign, Lead
-from .compliance import CostEvent, DNCEntry, Consent, CountryRule
+from .compliance import CostEvent, TenantSpendMonthly, BudgetReservation, DNCEntry, Consent, CountryRule
 
 # Note: Disposition, CallMedia, CallStructured, CallSummary removed - migrated to CallRecord
 # Note: UserPlanOverride, EmailProviderSettings removed - not used
@@ -21,9 +21,12 @@ __all__ = [
     "CallRecord",
     "CallSegment",
     "ScheduledCall",
+    "CallSyncState",
     "Plan",
     "Subscription",
     "UsageEvent",
+    "UsageDaily",
+    "UsageDailyOutcome",
     "Addon",
     "Entitlement",
     "WorkflowUsage",
@@ -45,6 +48,8 @@ __all__ = [
     "Campaign",
     "Lead",
     "CostEvent",
+    "TenantSpendMonthly",
+    "BudgetReservation",
     "DNCEntry",
     "Consent",
     "CountryRule",
@@ -1,7 +1,7 @@
 """Billing-related models"""
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from typing import Optional
-from sqlalchemy import Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Integer, BigInteger, String, Text, Date, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from config.database import Base
 
@@ -21,6 +21,7 @@ class Subscription(Base):
     tenant_id: Mapped[int] = mapped_column(Integer)
     stripe_customer_id: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
     stripe_subscription_id: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    stripe_usage_item_id: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)  # metered minutes item
     plan_code: Mapped[str] = mapped_column(String(32), default="free")
     status: Mapped[str] = mapped_column(String(32), default="trialing")  # active|trialing|past_due|canceled
     renews_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -30,12 +31,43 @@ class Subscription(Base):
 
 class UsageEvent(Base):
     __tablename__ = "usage_events"
+    __table_args__ = (
+        Index("idx_usage_events_synced_ts", "synced_to_stripe", "ts"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     tenant_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     call_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("calls.id"), nullable=True)
     minutes_billed: Mapped[int] = mapped_column(Integer, default=0)
     ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    synced_to_stripe: Mapped[int] = mapped_column(Integer, default=0)
+    synced_to_stripe: Mapped[int] = mapped_column(Integer, default=0)  # 0 pending, 1 reported, 2 not billable
+
+
+class UsageDaily(Base):
+    """Usage per tenant and UTC day of call creation (tenant_id 0 = unattributed), see services/usage_rollup.py"""
+    __tablename__ = "usage_daily"
+    __table_args__ = (
+        Index("idx_usage_daily_day", "day"),
+    )
+    tenant_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    calls_created: Mapped[int] = mapped_column(Integer, default=0)
+    calls_finished: Mapped[int] = mapped_column(Integer, default=0)
+    billed_seconds: Mapped[int] = mapped_column(BigInteger, default=0)
+    minutes_billed: Mapped[int] = mapped_column(Integer, default=0)  # per call, rounded up
+    cost_cents: Mapped[int] = mapped_column(BigInteger, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
+class UsageDailyOutcome(Base):
+    """Calls per disposition outcome, tenant and UTC day of call creation"""
+    __tablename__ = "usage_daily_outcomes"
+    __table_args__ = (
+        Index("idx_usage_daily_outcomes_day", "day"),
+    )
+    tenant_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    outcome: Mapped[str] = mapped_column(String(64), primary_key=True)
+    calls: Mapped[int] = mapped_column(Integer, default=0)
 
 
 class Addon(Base):
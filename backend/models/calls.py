@@ -1,7 +1,7 @@
 """Call-related models"""
 from datetime import datetime, timezone
 from typing import Optional
-from sqlalchemy import Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Integer, BigInteger, String, Text, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from config.database import Base
 
@@ -9,6 +9,17 @@ from config.database import Base
 class CallRecord(Base):
     __tablename__ = "calls"
 
+    # One Retell call_id = one Agoralia call (partial index, also the ON CONFLICT target for call sync)
+    __table_args__ = (
+        Index(
+            "idx_calls_provider_call_id",
+            "provider_call_id",
+            unique=True,
+            postgresql_where=text("provider_call_id IS NOT NULL"),
+            sqlite_where=text("provider_call_id IS NOT NULL"),
+        ),
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     tenant_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
@@ -83,3 +94,15 @@ class ScheduledCall(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
+
+
+class CallSyncState(Base):
+    """Per-tenant high-water mark for incremental Retell call sync (tenant_id 0 = global account)"""
+    __tablename__ = "call_sync_state"
+
+    tenant_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    high_water_ms: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)  # max Retell start_timestamp synced
+    last_synced_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_run_calls: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
@@ -56,6 +56,7 @@ class Lead(Base):
     company: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
     phone: Mapped[str] = mapped_column(String(32))
     country_iso: Mapped[Optional[str]] = mapped_column(String(8), nullable=True)
+    timezone: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)  # IANA zone resolved from phone at ingest
     preferred_lang: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
     role: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)  # supplier | supplied
     nature: Mapped[Optional[str]] = mapped_column(String(8), nullable=True, default="unknown")  # "b2b" | "b2c" | "unknown" | "personal"
@@ -1,7 +1,7 @@
 """Compliance-related models"""
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from typing import Optional
-from sqlalchemy import Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Integer, BigInteger, String, Text, Date, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from config.database import Base
 
@@ -15,8 +15,12 @@ from config.database import Base
 
 class CostEvent(Base):
     __tablename__ = "cost_events"
+    __table_args__ = (
+        Index("idx_cost_events_tenant_ts", "tenant_id", "ts"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    tenant_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     call_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("calls.id"), nullable=True)
     component: Mapped[str] = mapped_column(String(32))  # telephony | llm | stt | tts
     amount: Mapped[int] = mapped_column(Integer)  # store cents to avoid FP
@@ -24,8 +28,46 @@ class CostEvent(Base):
     ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
 
+class TenantSpendMonthly(Base):
+    """Running spend per tenant and calendar month (UTC), kept in step with cost_events (tenant_id 0 = unattributed)"""
+    __tablename__ = "tenant_spend_monthly"
+
+    tenant_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    month: Mapped[date] = mapped_column(Date, primary_key=True)  # first day of the month
+    spent_cents: Mapped[int] = mapped_column(BigInteger, default=0)
+    reserved_cents: Mapped[int] = mapped_column(BigInteger, default=0)  # open budget reservations (calls in flight)
+    events: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    reconciled_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class BudgetReservation(Base):
+    """Estimated cost held against a tenant's monthly budget while a call is in flight"""
+    __tablename__ = "budget_reservations"
+    __table_args__ = (
+        Index("idx_budget_reservations_provider_call_id", "provider_call_id"),
+        Index("idx_budget_reservations_status_created", "status", "created_at"),
+        Index("idx_budget_reservations_status_expires", "status", "expires_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    tenant_id: Mapped[int] = mapped_column(Integer)  # 0 = unattributed (as in tenant_spend_monthly)
+    month: Mapped[date] = mapped_column(Date)  # ledger row holding the reservation
+    amount_cents: Mapped[int] = mapped_column(Integer)
+    provider_call_id: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    status: Mapped[str] = mapped_column(String(16), default="reserved")  # reserved | settled | released
+    actual_cents: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)  # scheduled dial + TTL
+    closed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
 class DNCEntry(Base):
     __tablename__ = "dnc_numbers"
+    __table_args__ = (
+        Index("idx_dnc_numbers_tenant_e164", "tenant_id", "e164"),
+        Index("idx_dnc_numbers_e164", "e164"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     tenant_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
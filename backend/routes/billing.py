@@ -3,16 +3,20 @@ import os
 import json
 from typing import Dict, Any, List
 from fastapi import APIRouter, Request, HTTPException, Body
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone, timedelta
 import stripe
 
 from config.database import engine
-from models.billing import Subscription, UsageEvent, Addon, Entitlement
+from models.billing import Subscription, Addon
 from models.campaigns import Campaign, Lead
 from utils.auth import extract_tenant_id
 from utils.tenant import tenant_session
+from services.usage_rollup import usage_by_day
+from services.stripe_usage import report_usage_to_stripe, metered_item_id
+from services.entitlements import FREE_TRIAL_DAYS, get_tenant_entitlements, invalidate_entitlements, plan_entitlements
 
 router = APIRouter()
 
@@ -110,13 +114,16 @@ async def billing_webhook_stripe(request: Request):
                 sub = Subscription(tenant_id=tenant_id, plan_code=plan_code, status="active", stripe_subscription_id=sub_id, stripe_customer_id=cust_id)
                 session.add(sub)
                 session.commit()
+                invalidate_entitlements(tenant_id)
             if etype.startswith("customer.subscription."):
                 sub_id = obj.get("id")
                 status = obj.get("status")
                 row = session.query(Subscription).filter(Subscription.stripe_subscription_id == sub_id).order_by(Subscription.id.desc()).first()
                 if row:
                     row.status = status
+                    row.stripe_usage_item_id = metered_item_id(obj) or row.stripe_usage_item_id
                     session.commit()
+                    invalidate_entitlements(row.tenant_id)
         except Exception:
             session.rollback()
             raise
@@ -127,31 +134,19 @@ async def billing_webhook_stripe(request: Request):
 async def billing_overview(request: Request) -> Dict[str, Any]:
     """Get billing overview"""
     tenant_id = extract_tenant_id(request)
+    snapshot = get_tenant_entitlements(tenant_id)
+    plan = snapshot.plan_code
+    status = snapshot.status
+    trial_days_left = None
+    trial_expires_at = None
+    if snapshot.trial_expires_at is not None:
+        started = snapshot.trial_expires_at - timedelta(days=FREE_TRIAL_DAYS)
+        trial_days_left = max(0, FREE_TRIAL_DAYS - (datetime.now(timezone.utc) - started).days)
+        trial_expires_at = snapshot.trial_expires_at.isoformat()
     with Session(engine) as session:
-        sub = (
-            session.query(Subscription)
-            .filter(Subscription.tenant_id == (tenant_id or 0))
-            .order_by(Subscription.id.desc())
-            .first()
-        )
-        plan = (sub.plan_code if sub else "free")
-        status = (sub.status if sub else "trialing")
-        start_month = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        usage = (
-            session.query(UsageEvent)
-            .filter(UsageEvent.ts >= start_month)
-            .filter((UsageEvent.tenant_id == (tenant_id or 0)) if tenant_id is not None else True)
-            .all()
-        )
-        minutes = sum(int(u.minutes_billed or 0) for u in usage)
-        trial_days_left = None
-        trial_expires_at = None
-        if sub and (sub.plan_code or "free") == "free" and (sub.status or "trialing") == "trialing":
-            started = sub.created_at or datetime.now(timezone.utc)
-            delta_days = (datetime.now(timezone.utc) - started).days
-            left = max(0, 14 - delta_days)
-            trial_days_left = left
-            trial_expires_at = (started + timedelta(days=14)).isoformat()
+        today = datetime.now(timezone.utc).date()
+        usage = usage_by_day(session, tenant_id, today.replace(day=1), today)
+        minutes = sum(row["minutes_billed"] for row in usage)
         plan_lower = (plan or "free").lower()
         minutes_cap = None if plan_lower == "pro" else (1000 if plan_lower == "core" else 100)
         return {
@@ -172,107 +167,20 @@ async def me_usage(request: Request) -> Dict[str, Any]:
 
 @router.post("/usage/sync")
 async def billing_usage_sync() -> Dict[str, Any]:
-    """Sync usage to Stripe"""
-    with Session(engine) as session:
-        rows = session.query(UsageEvent).filter(UsageEvent.synced_to_stripe == 0).all()
-        count = 0
-        for r in rows:
-            r.synced_to_stripe = 1
-            count += 1
-        session.commit()
-    return {"synced": count}
+    """Report pending usage to Stripe now (normally done by the report_stripe_usage worker job)"""
+    stats = await run_in_threadpool(report_usage_to_stripe)
+    return {"synced": stats["reported"], **stats}
 
 
 @router.get("/entitlements")
 async def get_entitlements(request: Request) -> Dict[str, Any]:
     """Get plan entitlements"""
     tenant_id = extract_tenant_id(request)
-    
-    def _plan_entitlements(plan_code: str) -> Dict[str, Any]:
-        if plan_code == "enterprise":
-            return {
-                "calendar_full": True,
-                "calendar_week_day": True,
-                "workflows_limit": None,
-                "languages_allowance": None,
-                "agents_limit": None,  # Unlimited
-                "integrations": ["hubspot", "zoho", "odoo", "csv"],
-                "analytics_advanced": True,
-                "roles_enabled": True,
-                "sso": True,
-                "sla": True,
-                "data_residency": "EU",
-                "retention_custom": True,
-                "premium_models": True,
-                "byo_telephony": True,
-                "custom_integrations": True,
-                "success_manager": True,
-            }
-        if plan_code == "pro":
-            return {
-                "calendar_full": True,
-                "calendar_week_day": True,
-                "workflows_limit": None,
-                "languages_allowance": None,
-                "agents_limit": 20,  # 20 agents max
-                "integrations": ["hubspot", "zoho", "odoo", "csv"],
-                "analytics_advanced": True,
-                "roles_enabled": True,
-            }
-        if plan_code == "core":
-            return {
-                "calendar_full": False,
-                "calendar_week_day": True,
-                "workflows_limit": 3,
-                "languages_allowance": 3,
-                "agents_limit": 5,  # 5 agents max
-                "integrations": ["hubspot", "zoho", "odoo", "csv"],
-            }
-        return {
-            "calendar_full": False,
-            "calendar_week_day": False,
-            "workflows_limit": 0,
-            "languages_allowance": 1,
-            "agents_limit": 1,  # 1 agent max (Free plan)
-            "integrations": ["csv"],
-        }
-    
-    with Session(engine) as session:
-        try:
-            sub = (
-                session.query(Subscription)
-                .filter(Subscription.tenant_id == (tenant_id or 0))
-                .order_by(Subscription.id.desc())
-                .first()
-            )
-            plan_code = (sub.plan_code if sub and hasattr(sub, 'plan_code') and sub.plan_code else None) or "free"
-            base = _plan_entitlements(plan_code)
-        except Exception as e:
-            # Fallback to free plan on any error
-            base = _plan_entitlements("free")
-        try:
-            addons = session.query(Addon).filter(Addon.tenant_id == (tenant_id or 0), Addon.active == 1).all()
-            inbound_slots = 0
-            for a in addons:
-                if a and a.type == "inbound_slot" and a.qty and a.qty > 0:
-                    inbound_slots += int(a.qty)
-            base["inbound_enabled"] = inbound_slots > 0
-            base["inbound_slots"] = inbound_slots
-        except Exception:
-            base["inbound_enabled"] = False
-            base["inbound_slots"] = 0
-        
-        try:
-            rows = session.query(Entitlement).filter(Entitlement.tenant_id == (tenant_id or 0)).all()
-            for e in rows:
-                if e and hasattr(e, 'key') and hasattr(e, 'value'):
-                    try:
-                        base[e.key] = json.loads(e.value) if e.value else True
-                    except Exception:
-                        base[e.key] = e.value
-        except Exception:
-            pass  # Ignore entitlement errors
-    return base
+    try:
+        return dict(get_tenant_entitlements(tenant_id).entitlements)
+    except Exception:
+        # Fallback to free plan on any error
+        return {**plan_entitlements("free"), "inbound_enabled": False, "inbound_slots": 0}
 
 
 @router.get("/addons")
@@ -301,5 +209,6 @@ async def set_inbound_slots(request: Request, body: AddonUpdate) -> Dict[str, An
             row.qty = max(0, int(body.qty or 0))
             row.active = 1 if row.qty > 0 else 0
         session.commit()
+    invalidate_entitlements(tenant_id or 0)
     return {"ok": True}
 
@@ -19,19 +19,25 @@ from utils.helpers import country_iso_from_e164, _resolve_lang, _resolve_agent,
 from utils.retell import (
     get_retell_headers,
     get_retell_base_url,
+    retell_request,
     retell_get_json,
     retell_post_json,
     retell_patch_json,
     retell_delete_json,
     retell_post_multipart,
+    retell_list_calls_page,
 )
+from utils.retell_cache import retell_get_cached
 from utils.websocket import manager as ws_manager
 from services.settings import get_settings
 from services.enforcement import (
     enforce_subscription_or_raise,
     enforce_compliance_or_raise,
-    enforce_budget_or_raise,
+    reserve_budget_or_raise,
+    estimate_call_cost_cents,
 )
+from services.spend_ledger import attach_reservation, release_reservation
+from services.usage_rollup import rollup_call_created
 
 router = APIRouter()
 
@@ -293,12 +299,12 @@ async def purchase_phone_number(request: Request, body: PhoneNumberPurchase):
     # Log the request body for debugging
     import logging
     logger = logging.getLogger(__name__)
-    logger.info(f"[purchase_phone_number] Sending request to RetellAI: {json.dumps(retell_body)}")
+    logger.info("[purchase_phone_number] Sending request to RetellAI: %s", retell_body)
     print(f"[DEBUG] [purchase_phone_number] Request body: {json.dumps(retell_body)}", flush=True)
     
     try:
         data = await retell_post_json("/create-phone-number", retell_body, tenant_id=tenant_id)
-        logger.info(f"[purchase_phone_number] RetellAI response: {json.dumps(data)}")
+        logger.info("[purchase_phone_number] RetellAI response: %s", data)
         print(f"[DEBUG] [purchase_phone_number] RetellAI response: {json.dumps(data)}", flush=True)
         
         # Save phone number to our database
@@ -342,16 +348,14 @@ async def purchase_phone_number(request: Request, body: PhoneNumberPurchase):
                     # Record phone number monthly cost as CostEvent (monthly recurring)
                     # Note: Phone numbers have monthly costs, not one-time purchase costs
                     if phone_cost_cents and phone_cost_cents > 0:
-                        from models.compliance import CostEvent
-                        from datetime import datetime, timezone
-                        phone_cost_event = CostEvent(
-                            call_id=None,  # Not associated with a call
+                        from services.spend_ledger import record_cost
+                        record_cost(
+                            session,
+                            tenant_id,
                             component="telephony",  # Phone number monthly cost
-                            amount=phone_cost_cents,  # Monthly cost in cents
+                            amount_cents=phone_cost_cents,  # Monthly cost in cents
                             currency="USD",
-                            ts=datetime.now(timezone.utc),
                         )
-                        session.add(phone_cost_event)
                     
                     session.commit()
                 elif existing.tenant_id != tenant_id:
@@ -378,7 +382,7 @@ async def purchase_phone_number(request: Request, body: PhoneNumberPurchase):
     except Exception as e:
         import traceback
         logger = logging.getLogger(__name__)
-        logger.error(f"Error purchasing phone number: {e}\n{traceback.format_exc()}")
+        logger.error("Error purchasing phone number: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error purchasing phone number: {str(e)}")
 
 
@@ -569,6 +573,15 @@ async def test_retell_api(request: Request, agent_id: Optional[str] = None):
             }
 
 
+def _release_budget_reservation(reservation_id: Optional[int]) -> None:
+    """Give back the budget held for a call that was not placed"""
+    if reservation_id is None:
+        return
+    with Session(engine) as session:
+        release_reservation(session, reservation_id)
+        session.commit()
+
+
 @router.post("/retell/outbound")
 async def create_outbound_call(request: Request, payload: OutboundCallRequest):
     """Create outbound phone call via Retell"""
@@ -577,14 +590,8 @@ async def create_outbound_call(request: Request, payload: OutboundCallRequest):
     import logging
     logger = logging.getLogger(__name__)
     
-    # Configure logging to stdout if not configured
-    if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setLevel(logging.INFO)
-        logger.addHandler(handler)
-        logger.setLevel(logging.INFO)
-    
     error_step = "initialization"
+    reservation_id = None
     try:
         api_key = os.getenv("RETELL_API_KEY")
         if not api_key:
@@ -602,8 +609,7 @@ async def create_outbound_call(request: Request, payload: OutboundCallRequest):
             campaign_id = payload.metadata.get("campaign_id")
             lead_id = payload.metadata.get("lead_id")
         
-        logger.info(f"[create_outbound_call] tenant_id={tenant_id}, campaign_id={campaign_id}, lead_id={lead_id}")
-        print(f"[DEBUG] tenant_id={tenant_id}, campaign_id={campaign_id}, lead_id={lead_id}", flush=True)
+        logger.debug("[create_outbound_call] tenant_id=%s, campaign_id=%s, lead_id=%s", tenant_id, campaign_id, lead_id)
         
         error_step = "resolve_from_number"
         with Session(engine) as session:
@@ -612,7 +618,7 @@ async def create_outbound_call(request: Request, payload: OutboundCallRequest):
             if lead_id:
                 from models.campaigns import Lead
                 lead = session.get(Lead, lead_id)
-                logger.info(f"[create_outbound_call] lead loaded: {lead is not None}")
+                logger.debug("[create_outbound_call] lead loaded: %s", lead is not None)
                 if lead and tenant_id is not None and lead.tenant_id != tenant_id:
                     lead = None
                 elif lead and lead.campaign_id:
@@ -625,7 +631,7 @@ async def create_outbound_call(request: Request, payload: OutboundCallRequest):
                 lead_id=lead.id if lead else None,
                 tenant_id=tenant_id,
             )
-            logger.info(f"[create_outbound_call] from_num resolved: {from_num}")
+            logger.debug("[create_outbound_call] from_num resolved: %s", from_num)
             if not from_num:
                 raise HTTPException(
                     status_code=400,
@@ -635,14 +641,14 @@ async def create_outbound_call(request: Request, payload: OutboundCallRequest):
                 session, request, payload.to,
                 (payload.metadata or {}).get("lang") if payload.metadata else None
             )
-            logger.info(f"[create_outbound_call] lang resolved: {lang}")
+            logger.debug("[create_outbound_call] lang resolved: %s", lang)
             agent_id = payload.agent_id
             is_multi = False
             if not agent_id:
                 aid, is_multi = _resolve_agent(session, tenant_id, "voice", lang)
                 if aid:
                     agent_id = aid
-            logger.info(f"[create_outbound_call] agent_id: {agent_id}, is_multi: {is_multi}")
+            logger.debug("[create_outbound_call] agent_id: %s, is_multi: %s", agent_id, is_multi)
         
         # Build request body - Retell AI requires: from_number, to_number
         # agent_id is optional - if not provided, Retell uses the agent bound to from_number
@@ -695,8 +701,7 @@ async def create_outbound_call(request: Request, payload: OutboundCallRequest):
             
             if agent_override_dict:
                 body["agent_override"] = agent_override_dict
-                logger.info(f"[create_outbound_call] Agent override applied: {json.dumps(agent_override_dict)}")
-                print(f"[DEBUG] Agent override applied: {json.dumps(agent_override_dict)}", flush=True)
+                logger.debug("[create_outbound_call] Agent override applied: %s", agent_override_dict)
         
         # Dynamic Variables: Personalize agent responses with {{variable_name}} syntax
         # According to Retell docs: all values must be strings
@@ -709,8 +714,7 @@ async def create_outbound_call(request: Request, payload: OutboundCallRequest):
                         detail=f"retell_llm_dynamic_variables.{key} must be a string (got {type(value).__name__})"
                     )
             body["retell_llm_dynamic_variables"] = payload.retell_llm_dynamic_variables
-            logger.info(f"[create_outbound_call] Dynamic variables applied: {payload.retell_llm_dynamic_variables}")
-            print(f"[DEBUG] Dynamic variables applied: {payload.retell_llm_dynamic_variables}", flush=True)
+            logger.debug("[create_outbound_call] Dynamic variables applied: %s", payload.retell_llm_dynamic_variables)
         
         # Knowledge Base IDs: Collect all KB IDs (priority: knowledge_base_ids > kb_id converted to retell_kb_id)
         knowledge_base_ids_list: List[str] = []
@@ -718,7 +722,7 @@ async def create_outbound_call(request: Request, payload: OutboundCallRequest):
         # 1. If knowledge_base_ids provided directly, use them
         if payload.knowledge_base_ids:
             knowledge_base_ids_list.extend(payload.knowledge_base_ids)
-            logger.info(f"[create_outbound_call] Using knowledge_base_ids from payload: {payload.knowledge_base_ids}")
+            logger.debug("[create_outbound_call] Using knowledge_base_ids from payload: %s", payload.knowledge_base_ids)
         
         # 2. If kb_id provided, convert Agoralia KB ID to Retell KB ID (lazy sync)
         if payload.kb_id is not None:
@@ -728,9 +732,9 @@ async def create_outbound_call(request: Request, payload: OutboundCallRequest):
                 if retell_kb_id:
                     if retell_kb_id not in knowledge_base_ids_list:
                         knowledge_base_ids_list.append(retell_kb_id)
-                        logger.info(f"[create_outbound_call] Synced kb_id {payload.kb_id} to retell_kb_id: {retell_kb_id}")
+                        logger.debug("[create_outbound_call] Synced kb_id %s to retell_kb_id: %s", payload.kb_id, retell_kb_id)
                     else:
-                        logger.info(f"[create_outbound_call] retell_kb_id {retell_kb_id} already in knowledge_base_ids")
+                        logger.debug("[create_outbound_call] retell_kb_id %s already in knowledge_base_ids", retell_kb_id)
                 else:
                     # Fallback to old behavior: use metadata kb (for backward compatibility or if sync fails)
                     kb = session.get(KnowledgeBase, payload.kb_id)
@@ -748,7 +752,7 @@ async def create_outbound_call(request: Request, payload: OutboundCallRequest):
                                 "rules": [s.content_text for s in secs if s.kind == "rules" and s.content_text],
                                 "style": [s.content_text for s in secs if s.kind == "style" and s.content_text],
                             }
-                            logger.warning(f"[create_outbound_call] Using legacy metadata kb (sync failed for kb_id {payload.kb_id})")
+                            logger.warning("[create_outbound_call] Using legacy metadata kb (sync failed for kb_id %s)", payload.kb_id)
         
         # 3. Apply knowledge_base_ids to agent_override if present, or create one if needed
         if knowledge_base_ids_list:
@@ -760,8 +764,7 @@ async def create_outbound_call(request: Request, payload: OutboundCallRequest):
             combined_kb_ids = list(set(existing_kb_ids + knowledge_base_ids_list))
             agent_override_dict["retell_llm"]["knowledge_base_ids"] = combined_kb_ids
             body["agent_override"] = agent_override_dict
-            logger.info(f"[create_outbound_call] Added knowledge_base_ids to agent_override.retell_llm: {combined_kb_ids}")
-            print(f"[DEBUG] Added knowledge_base_ids to agent_override.retell_llm: {combined_kb_ids}", flush=True)
+            logger.debug("[create_outbound_call] Added knowledge_base_ids to agent_override.retell_llm: %s", combined_kb_ids)
         
         body.setdefault("metadata", {})
         body["metadata"]["lang"] = lang
@@ -776,12 +779,11 @@ async def create_outbound_call(request: Request, payload: OutboundCallRequest):
         if payload.metadata is not None:
             body["metadata"].update(payload.metadata)
 
-        logger.info(f"[create_outbound_call] body prepared: {json.dumps(body)}")
+        logger.debug("[create_outbound_call] body prepared: %s", body)
         
         # Compliance + subscription + budget gating
         # Reload lead in new session for compliance check
-        logger.info("[create_outbound_call] Starting compliance checks...")
-        print("[DEBUG] Starting compliance checks...", flush=True)
+        logger.debug("[create_outbound_call] Starting compliance checks...")
         error_step = "compliance_check"
         with Session(engine) as session:
             lead_for_compliance = None
@@ -796,59 +798,55 @@ async def create_outbound_call(request: Request, payload: OutboundCallRequest):
                 if tenant_id is not None:
                     query = query.filter(Lead.tenant_id == tenant_id)
                 lead_for_compliance = query.order_by(Lead.id.desc()).first()  # Get most recent lead
-            logger.info("[create_outbound_call] Enforcing subscription...")
-            print("[DEBUG] Enforcing subscription...", flush=True)
+            logger.debug("[create_outbound_call] Enforcing subscription...")
             enforce_subscription_or_raise(session, request)
-            logger.info("[create_outbound_call] Enforcing compliance...")
-            print(f"[DEBUG] Enforcing compliance with lead={lead_for_compliance.id if lead_for_compliance else None}, quiet_hours_disabled={lead_for_compliance.quiet_hours_disabled if lead_for_compliance else None}", flush=True)
+            logger.debug("[create_outbound_call] Enforcing compliance...")
             enforce_compliance_or_raise(session, request, payload.to, payload.metadata, lead=lead_for_compliance)
-            logger.info("[create_outbound_call] Enforcing budget...")
-            print("[DEBUG] Enforcing budget...", flush=True)
-            enforce_budget_or_raise(session, request)
+            logger.debug("[create_outbound_call] Reserving budget...")
+            reservation_id = reserve_budget_or_raise(
+                session, request, estimate_call_cost_cents(session, campaign_id)
+            )
         
-        logger.info(f"[create_outbound_call] Calling Retell API: {endpoint}")
-        print(f"[DEBUG] Calling Retell API: {endpoint}", flush=True)
+        logger.debug("[create_outbound_call] Calling Retell API: %s", endpoint)
         error_step = "retell_api_call"
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(endpoint, headers=headers, json=body)
-            logger.info(f"[create_outbound_call] Retell API response status: {resp.status_code}")
-            print(f"[DEBUG] Retell API response status: {resp.status_code}", flush=True)
-            if resp.status_code >= 400:
-                error_text = resp.text
-                logger.error(f"[create_outbound_call] Retell API error: {error_text}")
-                print(f"[DEBUG] Retell API error: {error_text}", flush=True)
-                raise HTTPException(status_code=resp.status_code, detail=error_text)
-            data = resp.json()
-            logger.info(f"[create_outbound_call] Retell API success: {data.get('call_id') or data.get('id')}")
-            print(f"[DEBUG] Retell API success: {data.get('call_id') or data.get('id')}", flush=True)
-            error_step = "persist_call"
-            # Persist call
-            tenant_id = extract_tenant_id(request)
-            with Session(engine) as session:
-                rec = CallRecord(
-                    direction="outbound",
-                    provider="retell",
-                    to_number=payload.to,
-                    from_number=from_num,
-                    provider_call_id=str(data.get("call_id") or data.get("id") or ""),
-                    status="created",
-                    raw_response=str(data),
-                    tenant_id=tenant_id,
-                )
-                session.add(rec)
-                session.commit()
-            await ws_manager.broadcast({"type": "call.created", "data": data})
-            return data
+        resp = await retell_request("POST", "/v2/create-phone-call", headers=headers, json=body)
+        logger.debug("[create_outbound_call] Retell API response status: %s", resp.status_code)
+        if resp.status_code >= 400:
+            error_text = resp.text
+            logger.error("[create_outbound_call] Retell API error: %s", error_text)
+            raise HTTPException(status_code=resp.status_code, detail=error_text)
+        data = resp.json()
+        logger.info("[create_outbound_call] Retell API success: %s", data.get("call_id") or data.get("id"))
+        error_step = "persist_call"
+        # Persist call (the reservation is settled when call.finished reports the cost)
+        tenant_id = extract_tenant_id(request)
+        with Session(engine) as session:
+            attach_reservation(session, reservation_id, data.get("call_id") or data.get("id"))
+            reservation_id = None
+            rec = CallRecord(
+                direction="outbound",
+                provider="retell",
+                to_number=payload.to,
+                from_number=from_num,
+                provider_call_id=str(data.get("call_id") or data.get("id") or "") or None,
+                status="created",
+                raw_response=str(data),
+                tenant_id=tenant_id,
+            )
+            session.add(rec)
+            rollup_call_created(session, tenant_id)
+            session.commit()
+        await ws_manager.broadcast({"type": "call.created", "data": data})
+        return data
     except HTTPException as he:
-        logger.error(f"[create_outbound_call] HTTPException at step {error_step}: {he.status_code} - {he.detail}")
-        print(f"[DEBUG] HTTPException at step {error_step}: {he.status_code} - {he.detail}", flush=True)
+        logger.error("[create_outbound_call] HTTPException at step %s: %s - %s", error_step, he.status_code, he.detail)
+        _release_budget_reservation(reservation_id)
         raise
     except Exception as e:
+        _release_budget_reservation(reservation_id)
         error_msg = str(e)
         error_traceback = traceback.format_exc()
-        logger.error(f"[create_outbound_call] Exception at step {error_step}: {error_msg}\n{error_traceback}")
-        print(f"[DEBUG] Exception at step {error_step}: {error_msg}", flush=True)
-        print(f"[DEBUG] Traceback:\n{error_traceback}", flush=True)
+        logger.error("[create_outbound_call] Exception at step %s: %s\n%s", error_step, error_msg, error_traceback)
         # Return full error details for debugging
         exc_type, exc_value, exc_tb = sys.exc_info()
         error_detail = f"Error at {error_step}: {exc_type.__name__}: {error_msg}"
@@ -951,7 +949,7 @@ async def create_web_call(payload: WebCallRequest):
                 provider="retell",
                 to_number=None,
                 from_number=None,
-                provider_call_id=str(data.get("call_id") or data.get("id") or ""),
+                provider_call_id=str(data.get("call_id") or data.get("id") or "") or None,
                 status="created",
                 raw_response=str(data),
                 tenant_id=None,
@@ -1071,12 +1069,13 @@ async def retell_list_calls(request: Request, body: ListCallsRequest):
         # If data is already an array, return it wrapped in our expected format
         # If it's an object with calls array, return as-is
         if isinstance(data, list):
-            # Response is direct array - return it with pagination info if available
-            # Last call_id can be used as pagination_key for next page
+            # Response is direct array - next page starts after the last call_id,
+            # unless this page came back short (last page)
+            calls, next_key = retell_list_calls_page(data, request_body["limit"])
             return {
-                "calls": data,
-                "pagination_key": data[-1].get("call_id") if data and len(data) > 0 else None,
-                "total_calls": len(data),  # We don't know total, so use current page count
+                "calls": calls,
+                "pagination_key": next_key,
+                "total_calls": len(calls),  # We don't know total, so use current page count
             }
         elif isinstance(data, dict) and "calls" in data:
             # Response is already wrapped
@@ -1216,12 +1215,12 @@ async def retell_list_agents(limit: Optional[int] = None, pagination_key: Option
         path += f"?{query_string}"
     
     try:
-        data = await retell_get_json(path)
+        data = await retell_get_cached(path)
         return data
     except HTTPException as e:
         # Try alternative endpoint
         try:
-            data = await retell_get_json(f"/v2{path}" if not path.startswith("/v2") else path)
+            data = await retell_get_cached(f"/v2{path}" if not path.startswith("/v2") else path)
             return data
         except Exception:
             raise e
@@ -1242,7 +1241,7 @@ async def retell_get_agent(agent_id: str, version: Optional[int] = None):
         path += f"?version={version}"
     
     try:
-        data = await retell_get_json(path)
+        data = await retell_get_cached(path)
         return data
     except HTTPException as e:
         # Try v2 endpoint
@@ -1250,7 +1249,7 @@ async def retell_get_agent(agent_id: str, version: Optional[int] = None):
             v2_path = f"/v2/get-agent/{agent_id}"
             if version is not None:
                 v2_path += f"?version={version}"
-            data = await retell_get_json(v2_path)
+            data = await retell_get_cached(v2_path)
             return data
         except Exception:
             raise e
@@ -1269,12 +1268,12 @@ async def retell_publish_agent(agent_id: str):
     logger = logging.getLogger(__name__)
     
     try:
-        logger.info(f"[publish_agent] Attempting to publish agent: {agent_id}")
+        logger.info("[publish_agent] Attempting to publish agent: %s", agent_id)
         print(f"[DEBUG] [publish_agent] Attempting to publish agent: {agent_id}", flush=True)
         
         # Publish agent
         data = await retell_post_json(f"/publish-agent/{agent_id}", {})
-        logger.info(f"[publish_agent] Successfully published agent: {agent_id}, response: {data}")
+        logger.info("[publish_agent] Successfully published agent: %s, response: %s", agent_id, data)
         print(f"[DEBUG] [publish_agent] Successfully published agent: {agent_id}, response: {data}", flush=True)
         
         return {
@@ -1283,16 +1282,16 @@ async def retell_publish_agent(agent_id: str):
             "response": data,
         }
     except HTTPException as e:
-        logger.error(f"[publish_agent] HTTPException publishing agent {agent_id}: {e.status_code} - {e.detail}")
+        logger.error("[publish_agent] HTTPException publishing agent %s: %s - %s", agent_id, e.status_code, e.detail)
         print(f"[DEBUG] [publish_agent] HTTPException publishing agent {agent_id}: {e.status_code} - {e.detail}", flush=True)
         
         # Try v2 endpoint
         try:
-            logger.info(f"[publish_agent] Trying v2 endpoint for agent: {agent_id}")
+            logger.info("[publish_agent] Trying v2 endpoint for agent: %s", agent_id)
             print(f"[DEBUG] [publish_agent] Trying v2 endpoint for agent: {agent_id}", flush=True)
             
             data = await retell_post_json(f"/v2/publish-agent/{agent_id}", {})
-            logger.info(f"[publish_agent] Successfully published agent (v2): {agent_id}, response: {data}")
+            logger.info("[publish_agent] Successfully published agent (v2): %s, response: %s", agent_id, data)
             print(f"[DEBUG] [publish_agent] Successfully published agent (v2): {agent_id}, response: {data}", flush=True)
             
             return {
@@ -1301,12 +1300,12 @@ async def retell_publish_agent(agent_id: str):
                 "response": data,
             }
         except Exception as ex:
-            logger.error(f"[publish_agent] Exception in v2 fallback for agent {agent_id}: {ex}\n{traceback.format_exc()}")
+            logger.error("[publish_agent] Exception in v2 fallback for agent %s: %s\n%s", agent_id, ex, traceback.format_exc())
             print(f"[DEBUG] [publish_agent] Exception in v2 fallback for agent {agent_id}: {ex}", flush=True)
             print(f"[DEBUG] Traceback:\n{traceback.format_exc()}", flush=True)
             raise e
     except Exception as e:
-        logger.error(f"[publish_agent] Unexpected exception publishing agent {agent_id}: {e}\n{traceback.format_exc()}")
+        logger.error("[publish_agent] Unexpected exception publishing agent %s: %s\n%s", agent_id, e, traceback.format_exc())
         print(f"[DEBUG] [publish_agent] Unexpected exception publishing agent {agent_id}: {e}", flush=True)
         print(f"[DEBUG] Traceback:\n{traceback.format_exc()}", flush=True)
         raise HTTPException(status_code=500, detail=f"Error publishing agent: {str(e)}")
@@ -1325,7 +1324,7 @@ async def retell_get_agent_versions(agent_id: str, version: Optional[int] = None
         path += f"?version={version}"
     
     try:
-        data = await retell_get_json(path)
+        data = await retell_get_cached(path)
         return data
     except HTTPException as e:
         # Try v2 endpoint
@@ -1333,7 +1332,7 @@ async def retell_get_agent_versions(agent_id: str, version: Optional[int] = None
             v2_path = f"/v2/get-agent-versions/{agent_id}"
             if version is not None:
                 v2_path += f"?version={version}"
-            data = await retell_get_json(v2_path)
+            data = await retell_get_cached(v2_path)
             return data
         except Exception:
             raise e
@@ -1510,7 +1509,7 @@ async def retell_create_agent(
         import traceback
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error creating Retell agent: {e}\n{traceback.format_exc()}")
+        logger.error("Error creating Retell agent: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error creating agent: {str(e)}")
 
 
@@ -1869,7 +1868,7 @@ async def retell_create_agent_full(request: Request, body: AgentCreateRequest):
         import traceback
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error creating Retell agent: {e}\n{traceback.format_exc()}")
+        logger.error("Error creating Retell agent: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error creating agent: {str(e)}")
 
 
@@ -1948,7 +1947,7 @@ async def retell_test_agent_call(
         import traceback
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error making test call: {e}\n{traceback.format_exc()}")
+        logger.error("Error making test call: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error making test call: {str(e)}")
 
 
@@ -2000,7 +1999,7 @@ async def retell_update_agent(
         import traceback
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error updating Retell agent: {e}\n{traceback.format_exc()}")
+        logger.error("Error updating Retell agent: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error updating agent: {str(e)}")
 
 
@@ -2039,7 +2038,7 @@ async def retell_delete_agent(
         import traceback
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error deleting Retell agent: {e}\n{traceback.format_exc()}")
+        logger.error("Error deleting Retell agent: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error deleting agent: {str(e)}")
 
 
@@ -2087,7 +2086,7 @@ async def get_retell_phone_number(request: Request, phone_number: str):
     
     try:
         # Use path parameter as per official docs
-        data = await retell_get_json(f"/get-phone-number/{urllib.parse.quote(phone_number)}", tenant_id=tenant_id)
+        data = await retell_get_cached(f"/get-phone-number/{urllib.parse.quote(phone_number)}", tenant_id=tenant_id)
         
         # For custom telephony numbers, add SIP inbound URI if not present
         if data.get("phone_number_type") == "custom":
@@ -2100,7 +2099,7 @@ async def get_retell_phone_number(request: Request, phone_number: str):
     except HTTPException as e:
         # Fallback to query param format if path param doesn't work
         try:
-            data = await retell_get_json(f"/get-phone-number?phone_number={urllib.parse.quote(phone_number)}", tenant_id=tenant_id)
+            data = await retell_get_cached(f"/get-phone-number?phone_number={urllib.parse.quote(phone_number)}", tenant_id=tenant_id)
             
             # For custom telephony numbers, add SIP inbound URI if not present
             if data.get("phone_number_type") == "custom":
@@ -2120,12 +2119,12 @@ async def list_retell_phone_numbers():
     - GET /list-phone-numbers lists all phone numbers
     """
     try:
-        data = await retell_get_json("/list-phone-numbers")
+        data = await retell_get_cached("/list-phone-numbers")
         return data
     except HTTPException as e:
         # Try v2 endpoint if available
         try:
-            data = await retell_get_json("/v2/list-phone-numbers")
+            data = await retell_get_cached("/v2/list-phone-numbers")
             return data
         except Exception:
             raise e
@@ -2200,13 +2199,13 @@ async def update_retell_phone_number(
         # Log request for debugging
         import logging
         logger = logging.getLogger(__name__)
-        logger.info(f"[update_retell_phone_number] Updating {phone_number} with: {json.dumps(retell_body)}")
+        logger.info("[update_retell_phone_number] Updating %s with: %s", phone_number, retell_body)
         print(f"[DEBUG] [update_retell_phone_number] Request body: {json.dumps(retell_body)}", flush=True)
         
         # Use path parameter as per official docs
         data = await retell_patch_json(f"/update-phone-number/{urllib.parse.quote(phone_number)}", retell_body, tenant_id=tenant_id)
         
-        logger.info(f"[update_retell_phone_number] RetellAI response: {json.dumps(data)}")
+        logger.info("[update_retell_phone_number] RetellAI response: %s", data)
         print(f"[DEBUG] [update_retell_phone_number] RetellAI response: {json.dumps(data)}", flush=True)
         
         return {
@@ -2218,7 +2217,7 @@ async def update_retell_phone_number(
     except Exception as e:
         import traceback
         logger = logging.getLogger(__name__)
-        logger.error(f"[update_retell_phone_number] Error updating phone number: {e}\n{traceback.format_exc()}")
+        logger.error("[update_retell_phone_number] Error updating phone number: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error updating phone number: {str(e)}")
 
 
@@ -2303,34 +2302,31 @@ async def delete_retell_phone_number(request: Request, phone_number: str):
 
 
 @router.post("/retell/backfill")
-async def retell_backfill(request: Request, limit: int = 100):
-    """Backfill calls from Retell to local database"""
-    lst = await retell_list_calls(limit=limit)
-    items = lst.get("calls") or lst.get("items") or []
-    new_count = 0
-    with Session(engine) as session:
-        tenant_id = extract_tenant_id(request)
-        for c in items:
-            pid = str(c.get("call_id") or c.get("id") or "")
-            if not pid:
-                continue
-            exists = session.query(CallRecord).filter(CallRecord.provider_call_id == pid).one_or_none()
-            if exists:
-                continue
-            rec = CallRecord(
-                direction=str(c.get("direction") or "outbound"),
-                provider="retell",
-                to_number=c.get("to_number"),
-                from_number=c.get("from_number"),
-                provider_call_id=pid,
-                status=str(c.get("status") or "created"),
-                raw_response=json.dumps(c),
-                tenant_id=tenant_id,
-            )
-            session.add(rec)
-            new_count += 1
-        session.commit()
-    return {"backfilled": new_count}
+async def retell_backfill(request: Request, limit: int = 100, max_pages: Optional[int] = None, full: bool = False):
+    """Incrementally sync calls from Retell to local database
+    
+    Pages /v2/list-calls from the account's stored high-water mark and bulk upserts
+    by provider_call_id (see services.call_sync).
+    
+    Args:
+        limit: Page size for list-calls (max 1000)
+        max_pages: Max pages this run (default RETELL_SYNC_MAX_PAGES); re-run to continue
+        full: Ignore the high-water mark and re-sync the initial lookback window
+    """
+    from services.call_sync import sync_retell_calls, retell_account_for_tenant, RETELL_SYNC_INITIAL_LOOKBACK_DAYS
+    
+    tenant_id = extract_tenant_id(request)
+    since_ms = None
+    if full:
+        since = datetime.now(timezone.utc) - timedelta(days=RETELL_SYNC_INITIAL_LOOKBACK_DAYS)
+        since_ms = int(since.timestamp() * 1000)
+    result = await sync_retell_calls(
+        retell_account_for_tenant(tenant_id),
+        page_size=limit,
+        max_pages=max_pages,
+        since_ms=since_ms,
+    )
+    return {"backfilled": result["calls"], **result}
 
 
 # ============================================================================
@@ -2396,7 +2392,7 @@ async def retell_create_knowledge_base(
         # Log form data for debugging
         import logging
         logger = logging.getLogger(__name__)
-        logger.info(f"[retell_create_kb] Form data: {form_data}")
+        logger.info("[retell_create_kb] Form data: %s", form_data)
         print(f"[DEBUG] [retell_create_kb] Form data: {form_data}", flush=True)
         
         # Use multipart helper even without files
@@ -2406,7 +2402,7 @@ async def retell_create_knowledge_base(
             tenant_id=tenant_id
         )
         
-        logger.info(f"[retell_create_kb] Retell response: {data}")
+        logger.info("[retell_create_kb] Retell response: %s", data)
         print(f"[DEBUG] [retell_create_kb] Retell response: {data}", flush=True)
         
         # Extract KB ID
@@ -2420,7 +2416,7 @@ async def retell_create_knowledge_base(
     except HTTPException as e:
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"[retell_create_kb] HTTPException: {e.status_code} - {e.detail}")
+        logger.error("[retell_create_kb] HTTPException: %s - %s", e.status_code, e.detail)
         print(f"[DEBUG] [retell_create_kb] HTTPException: {e.status_code} - {e.detail}", flush=True)
         # Propagate the original error from Retell API
         raise e
@@ -2430,7 +2426,7 @@ async def retell_create_knowledge_base(
         logger = logging.getLogger(__name__)
         error_msg = str(e)
         error_traceback = traceback.format_exc()
-        logger.error(f"[retell_create_kb] Exception: {error_msg}\n{error_traceback}")
+        logger.error("[retell_create_kb] Exception: %s\n%s", error_msg, error_traceback)
         print(f"[DEBUG] [retell_create_kb] Exception: {error_msg}", flush=True)
         print(f"[DEBUG] Traceback:\n{error_traceback}", flush=True)
         # Return more detailed error for debugging
@@ -2455,7 +2451,7 @@ async def retell_get_knowledge_base(request: Request, kb_id: str):
     tenant_id = extract_tenant_id(request)
     
     try:
-        data = await retell_get_json(f"/get-knowledge-base/{urllib.parse.quote(kb_id)}")
+        data = await retell_get_cached(f"/get-knowledge-base/{urllib.parse.quote(kb_id)}")
         return {
             "success": True,
             "response": data,
@@ -2466,7 +2462,7 @@ async def retell_get_knowledge_base(request: Request, kb_id: str):
         import traceback
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error getting Retell KB: {e}\n{traceback.format_exc()}")
+        logger.error("Error getting Retell KB: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error getting knowledge base: {str(e)}")
 
 
@@ -2481,7 +2477,7 @@ async def retell_list_knowledge_bases(request: Request):
     tenant_id = extract_tenant_id(request)
     
     try:
-        data = await retell_get_json("/list-knowledge-bases")
+        data = await retell_get_cached("/list-knowledge-bases")
         # Ensure we return an array
         if isinstance(data, list):
             return data
@@ -2492,7 +2488,7 @@ async def retell_list_knowledge_bases(request: Request):
         import traceback
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error listing Retell KBs: {e}\n{traceback.format_exc()}")
+        logger.error("Error listing Retell KBs: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error listing knowledge bases: {str(e)}")
 
 
@@ -2519,7 +2515,7 @@ async def retell_delete_knowledge_base(request: Request, kb_id: str):
         import traceback
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error deleting Retell KB: {e}\n{traceback.format_exc()}")
+        logger.error("Error deleting Retell KB: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error deleting knowledge base: {str(e)}")
 
 
@@ -2577,7 +2573,7 @@ async def retell_add_knowledge_base_sources(
         import traceback
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error adding sources to Retell KB: {e}\n{traceback.format_exc()}")
+        logger.error("Error adding sources to Retell KB: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error adding sources: {str(e)}")
 
 
@@ -2608,7 +2604,7 @@ async def retell_delete_knowledge_base_source(request: Request, kb_id: str, sour
         import traceback
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error deleting source from Retell KB: {e}\n{traceback.format_exc()}")
+        logger.error("Error deleting source from Retell KB: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error deleting source: {str(e)}")
 
 
@@ -2686,7 +2682,7 @@ async def retell_create_batch_call(request: Request, body: BatchCallCreate):
         import traceback
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error creating batch call: {e}\n{traceback.format_exc()}")
+        logger.error("Error creating batch call: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error creating batch call: {str(e)}")
 
 
@@ -2707,7 +2703,7 @@ async def retell_list_voices(request: Request):
     tenant_id = extract_tenant_id(request)
     
     try:
-        data = await retell_get_json("/list-voices", tenant_id=tenant_id)
+        data = await retell_get_cached("/list-voices", tenant_id=tenant_id)
         # Ensure we return an array
         if isinstance(data, list):
             return data
@@ -2718,7 +2714,7 @@ async def retell_list_voices(request: Request):
         import traceback
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error listing voices: {e}\n{traceback.format_exc()}")
+        logger.error("Error listing voices: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error listing voices: {str(e)}")
 
 
@@ -2738,7 +2734,7 @@ async def retell_get_voice(request: Request, voice_id: str):
     tenant_id = extract_tenant_id(request)
     
     try:
-        data = await retell_get_json(f"/get-voice/{urllib.parse.quote(voice_id)}", tenant_id=tenant_id)
+        data = await retell_get_cached(f"/get-voice/{urllib.parse.quote(voice_id)}", tenant_id=tenant_id)
         return {
             "success": True,
             "response": data,
@@ -2749,7 +2745,7 @@ async def retell_get_voice(request: Request, voice_id: str):
         import traceback
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error getting voice: {e}\n{traceback.format_exc()}")
+        logger.error("Error getting voice: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error getting voice: {str(e)}")
 
 
@@ -2826,7 +2822,7 @@ async def retell_register_phone_call(request: Request, body: RegisterPhoneCallRe
         import traceback
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error registering phone call: {e}\n{traceback.format_exc()}")
+        logger.error("Error registering phone call: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error registering phone call: {str(e)}")
 
 
@@ -2937,13 +2933,13 @@ async def retell_import_phone_number(request: Request, body: ImportPhoneNumberRe
     # Log the request body for debugging
     import logging
     logger = logging.getLogger(__name__)
-    logger.info(f"[retell_import_phone_number] Sending request to RetellAI: {json.dumps(retell_body)}")
+    logger.info("[retell_import_phone_number] Sending request to RetellAI: %s", retell_body)
     print(f"[DEBUG] [retell_import_phone_number] Request body: {json.dumps(retell_body)}", flush=True)
     
     try:
         # Use /import-phone-number endpoint as per RetellAI OpenAPI documentation
         data = await retell_post_json("/import-phone-number", retell_body, tenant_id=tenant_id)
-        logger.info(f"[retell_import_phone_number] RetellAI response: {json.dumps(data)}")
+        logger.info("[retell_import_phone_number] RetellAI response: %s", data)
         print(f"[DEBUG] [retell_import_phone_number] RetellAI response: {json.dumps(data)}", flush=True)
         
         # Save phone number to our database (same logic as purchase)
@@ -3013,7 +3009,7 @@ async def retell_import_phone_number(request: Request, body: ImportPhoneNumberRe
         import traceback
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Error importing phone number: {e}\n{traceback.format_exc()}")
+        logger.error("Error importing phone number: %s\n%s", e, traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error importing phone number: {str(e)}")
 
 
@@ -13,6 +13,8 @@ from models.calls import CallRecord
 from utils.auth import extract_tenant_id
 from utils.tenant import tenant_session
 from utils.helpers import country_iso_from_e164
+from utils.numbering_plan import timezone_for_number
+from services.verdict_cache import invalidate_verdicts
 
 router = APIRouter()
 
@@ -272,6 +274,8 @@ async def update_campaign(request: Request, campaign_id: int, body: CampaignUpda
         c.updated_at = datetime.now(timezone.utc)
         session.commit()
         session.refresh(c)
+        # Campaign quiet hours feed cached compliance verdicts
+        invalidate_verdicts(c.tenant_id)
         return {"ok": True, "id": c.id, "status": c.status}
 
 
@@ -518,6 +522,7 @@ async def list_leads(
                     "company": l.company,
                     "phone": l.phone,
                     "country_iso": l.country_iso,
+                    "timezone": l.timezone,
                     "preferred_lang": l.preferred_lang,
                     "role": l.role,
                     "nature": l.nature,
@@ -553,6 +558,7 @@ async def create_lead(request: Request, body: LeadCreate) -> Dict[str, Any]:
             consent_basis=body.consent_basis,
             consent_status=body.consent_status or "unknown",
             country_iso=country_iso_from_e164(body.phone),
+            timezone=timezone_for_number(body.phone),
             campaign_id=body.campaign_id,
             quiet_hours_disabled=1 if body.quiet_hours_disabled else (0 if body.quiet_hours_disabled is False else None),
         )
@@ -575,6 +581,7 @@ async def update_lead(request: Request, lead_id: int, body: LeadUpdate) -> Dict[
                 setattr(l, field, val)
         if body.phone is not None:
             l.country_iso = country_iso_from_e164(body.phone)
+            l.timezone = timezone_for_number(body.phone)
         # Auto-detect nature from company if not provided but company is set
         if (body.nature is None or l.nature == "unknown") and body.company is not None:
             l.nature = "b2b"
@@ -1,15 +1,22 @@
 """Compliance endpoints"""
-from typing import Dict, Any, Optional
+import os
+import json
+import asyncio
+import tempfile
+from typing import Dict, Any, Optional, List, Iterator
 from datetime import datetime, timezone
-from fastapi import APIRouter, Request, HTTPException, Query
-from pydantic import BaseModel
+from fastapi import APIRouter, Request, HTTPException, Query, UploadFile, File, Form
+from fastapi.responses import StreamingResponse, JSONResponse, Response
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from config.database import engine
 from models.campaigns import Lead
-from models.compliance import CountryRule, DNCEntry
-from services.compliance import get_country_rule, get_country_rule_for_number
-from services.enforcement import check_compliance
+from models.compliance import DNCEntry
+from services.compliance import get_country_rule, get_country_rule_for_number, resolve_country_rules, country_rules_etag
+from services.enforcement import check_compliance, check_compliance_batch
+from services.dnc_index import dnc_index_add, dnc_index_remove
+from services.dnc_bulk import create_import_job, get_import_job, run_dnc_import, iter_dnc_export
 from utils.auth import extract_tenant_id
 from utils.tenant import tenant_session
 from utils.helpers import country_iso_from_e164
@@ -174,62 +181,146 @@ async def compliance_check(
     }
 
 
+COMPLIANCE_BATCH_MAX = 100_000
+
+
+class ComplianceBatchRequest(BaseModel):
+    to_numbers: Optional[List[str]] = Field(None, description="E.164 phone numbers")
+    lead_ids: Optional[List[int]] = Field(None, description="Lead IDs (lead phone, nature, consent and campaign are used)")
+    nature: Optional[str] = Field(None, description="Contact nature for to_numbers: 'b2b' or 'b2c'")
+    campaign_id: Optional[int] = Field(None, description="Campaign context for to_numbers")
+    scheduled_time: Optional[str] = Field(None, description="Scheduled call time (ISO 8601)")
+    legal_accepted: Optional[bool] = None
+    stream: bool = Field(True, description="Stream NDJSON (one verdict per line, summary last)")
+
+
+def _verdict_summary() -> Dict[str, Any]:
+    return {"total": 0, "allowed": 0, "blocked": 0, "errors": 0, "no_country": 0, "by_reason": {}, "by_country": {}}
+
+
+def _add_to_summary(summary: Dict[str, Any], verdict: Dict[str, Any]) -> None:
+    summary["total"] += 1
+    if verdict.get("error"):
+        summary["errors"] += 1
+        return
+    if verdict.get("allowed"):
+        summary["allowed"] += 1
+    else:
+        summary["blocked"] += 1
+        reason = verdict.get("block_reason") or "unknown"
+        summary["by_reason"][reason] = summary["by_reason"].get(reason, 0) + 1
+    country = verdict.get("country_iso")
+    if country:
+        summary["by_country"][country] = summary["by_country"].get(country, 0) + 1
+    else:
+        summary["no_country"] += 1
+
+
+@router.post("/check/batch")
+async def compliance_check_batch(request: Request, body: ComplianceBatchRequest):
+    """
+    Pre-flight compliance for many numbers and/or leads (e.g. a whole campaign).
+    Returns per-number verdicts plus an aggregate summary; streamed as NDJSON by default.
+    """
+    tenant_id = extract_tenant_id(request)
+    count = len(body.to_numbers or []) + len(body.lead_ids or [])
+    if count == 0:
+        raise HTTPException(status_code=400, detail="Provide 'to_numbers' and/or 'lead_ids'")
+    if count > COMPLIANCE_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"Too many entries (max {COMPLIANCE_BATCH_MAX})")
+    
+    scheduled_dt = None
+    if body.scheduled_time:
+        try:
+            scheduled_dt = datetime.fromisoformat(body.scheduled_time.replace("Z", "+00:00"))
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid scheduled_time (expected ISO 8601)")
+    
+    metadata: Dict[str, Any] = {}
+    if body.nature and body.nature != "unknown":
+        metadata["nature"] = body.nature
+    if body.campaign_id:
+        metadata["campaign_id"] = body.campaign_id
+    if body.legal_accepted is not None:
+        metadata["legal_accepted"] = body.legal_accepted
+    
+    def _verdicts(session: Session) -> Iterator[Dict[str, Any]]:
+        return check_compliance_batch(
+            session,
+            tenant_id,
+            to_numbers=body.to_numbers,
+            lead_ids=body.lead_ids,
+            scheduled_time=scheduled_dt,
+            metadata=metadata or None,
+        )
+    
+    if not body.stream:
+        summary = _verdict_summary()
+        items = []
+        with Session(engine) as session:
+            for verdict in _verdicts(session):
+                _add_to_summary(summary, verdict)
+                items.append(verdict)
+        return {"items": items, "summary": summary}
+    
+    def _ndjson() -> Iterator[str]:
+        # Sync generator: Starlette iterates it in a worker thread, keeping DB work off the event loop
+        summary = _verdict_summary()
+        with Session(engine) as session:
+            for verdict in _verdicts(session):
+                _add_to_summary(summary, verdict)
+                yield json.dumps(verdict, default=str) + "\n"
+        yield json.dumps({"summary": summary}) + "\n"
+    
+    return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
+
+
 # ============================================================================
 # Country Rules Management
 # ============================================================================
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header matches etag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in [c[2:] if c.startswith("W/") else c for c in candidates]
+
+
 @router.get("/rules")
 async def list_country_rules(
     request: Request,
     country_iso: Optional[str] = Query(None),
-) -> Dict[str, Any]:
-    """List country rules (tenant overrides or defaults from JSON)"""
-    from services.compliance import _load_compliance_json
+) -> Response:
+    """List country rules (tenant overrides or defaults from JSON)
+    
+    Served from the in-memory rule index; responses carry an ETag so clients can
+    revalidate with If-None-Match and get a 304 while the rules are unchanged.
+    """
     tenant_id = extract_tenant_id(request)
+    etag = f'"{country_rules_etag(tenant_id)}{"-" + country_iso.upper() if country_iso else ""}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
     
-    # Always return list from JSON, not just DB rules
-    json_data = _load_compliance_json()
     items = []
+    for iso, rule_data in resolve_country_rules(tenant_id).items():
+        if country_iso and iso != country_iso.upper():
+            continue
+        items.append({
+            "id": None,  # JSON rules don't have DB ID
+            "tenant_id": None,  # JSON rules are global
+            "country_iso": iso,
+            "regime_b2b": rule_data.get("regime_b2b"),
+            "regime_b2c": rule_data.get("regime_b2c"),
+            "dnc_registry_enabled": rule_data.get("dnc_registry_enabled"),
+            "dnc_registry_name": rule_data.get("dnc_registry_name"),
+            "quiet_hours_enabled": rule_data.get("quiet_hours_enabled"),
+            "quiet_hours_weekdays": rule_data.get("quiet_hours_weekdays"),
+            "ai_disclosure_required": rule_data.get("ai_disclosure_required"),
+        })
     
-    # Get DB rules for tenant overrides
-    with tenant_session(request) as session:
-        db_rules = {}
-        query = session.query(CountryRule)
-        if tenant_id is not None:
-            query = query.filter(
-                (CountryRule.tenant_id == tenant_id) | (CountryRule.tenant_id.is_(None))
-            )
-        if country_iso:
-            query = query.filter(CountryRule.country_iso == country_iso.upper())
-        
-        for r in query.all():
-            db_rules[r.country_iso] = r
-        
-        # Include all countries from JSON
-        for iso, json_rule in json_data.items():
-            if country_iso and iso.upper() != country_iso.upper():
-                continue
-            
-            # Check if tenant has override
-            rule_data = get_country_rule(tenant_id, iso, session)
-            
-            items.append({
-                "id": None,  # JSON rules don't have DB ID
-                "tenant_id": None,  # JSON rules are global
-                "country_iso": iso,
-                "regime_b2b": rule_data.get("regime_b2b"),
-                "regime_b2c": rule_data.get("regime_b2c"),
-                "dnc_registry_enabled": rule_data.get("dnc_registry_enabled"),
-                "dnc_registry_name": rule_data.get("dnc_registry_name"),
-                "quiet_hours_enabled": rule_data.get("quiet_hours_enabled"),
-                "quiet_hours_weekdays": rule_data.get("quiet_hours_weekdays"),
-                "ai_disclosure_required": rule_data.get("ai_disclosure_required"),
-            })
-        
-        # Sort by country_iso
-        items.sort(key=lambda x: x.get("country_iso", ""))
-        
-        return {"items": items}
+    return JSONResponse({"items": items}, headers=headers)
 
 
 @router.get("/rules/{country_iso}")
@@ -241,7 +332,7 @@ async def get_country_rule_endpoint(
     tenant_id = extract_tenant_id(request)
     with Session(engine) as session:
         rule = get_country_rule(tenant_id, country_iso.upper(), session)
-        return rule or {"error": "Country rule not found"}
+        return dict(rule) if rule else {"error": "Country rule not found"}
 
 
 # ============================================================================
@@ -275,6 +366,7 @@ async def add_dnc_entry(request: Request, body: DNCAdd) -> Dict[str, Any]:
         session.add(entry)
         session.commit()
         session.refresh(entry)
+        dnc_index_add(tenant_id, entry.e164)
         return {"ok": True, "id": entry.id}
 
 
@@ -301,6 +393,60 @@ async def list_dnc_entries(request: Request) -> Dict[str, Any]:
         }
 
 
+DNC_UPLOAD_CHUNK = 1024 * 1024
+
+
+@router.post("/dnc/import", status_code=202)
+async def import_dnc_entries(
+    request: Request,
+    file: UploadFile = File(...),
+    source: Optional[str] = Form(None),
+) -> Dict[str, Any]:
+    """Bulk-import a DNC list (CSV or TXT, one number per row)
+    
+    The file is copied to disk in chunks and imported in the background;
+    poll GET /dnc/import/{job_id} for progress.
+    """
+    tenant_id = extract_tenant_id(request)
+    fd, path = tempfile.mkstemp(prefix="dnc_import_", suffix=".csv")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(DNC_UPLOAD_CHUNK)
+                if not chunk:
+                    break
+                out.write(chunk)
+    except Exception:
+        os.remove(path)
+        raise
+    
+    job = create_import_job(tenant_id, file.filename, source or "import")
+    loop = asyncio.get_running_loop()
+    loop.run_in_executor(None, run_dnc_import, job["id"], path)
+    return {"ok": True, "job_id": job["id"], "status": job["status"]}
+
+
+@router.get("/dnc/import/{job_id}")
+async def get_dnc_import_job(request: Request, job_id: str) -> Dict[str, Any]:
+    """Progress of a DNC import job"""
+    tenant_id = extract_tenant_id(request)
+    job = get_import_job(job_id)
+    if not job or (tenant_id is not None and job.get("tenant_id") != tenant_id):
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+@router.get("/dnc/export")
+async def export_dnc_entries(request: Request) -> StreamingResponse:
+    """Export the full DNC list as CSV (streamed)"""
+    tenant_id = extract_tenant_id(request)
+    return StreamingResponse(
+        iter_dnc_export(tenant_id),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="dnc_export.csv"'},
+    )
+
+
 @router.delete("/dnc/{entry_id}")
 async def delete_dnc_entry(request: Request, entry_id: int) -> Dict[str, Any]:
     """Remove number from DNC list"""
@@ -313,7 +459,9 @@ async def delete_dnc_entry(request: Request, entry_id: int) -> Dict[str, Any]:
         if tenant_id is not None and entry.tenant_id != tenant_id:
             raise HTTPException(status_code=403, detail="Not authorized")
         
+        entry_tenant_id, entry_e164 = entry.tenant_id, entry.e164
         session.delete(entry)
         session.commit()
+        dnc_index_remove(entry_tenant_id, entry_e164)
         return {"ok": True}
 
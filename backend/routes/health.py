@@ -60,6 +60,24 @@ async def system_status():
         status["database"] = f"error: {str(e)}"
         status["status"] = "degraded"
     
+    # Retell circuit breakers (open circuits mean dialing is backing off) and catalog cache
+    try:
+        from utils.retell import get_retell_circuit_state, get_retell_coalescing_stats
+        from utils.retell_cache import get_retell_cache_stats
+        status["retell_circuits"] = get_retell_circuit_state()
+        status["retell_cache"] = get_retell_cache_stats()
+        status["retell_coalescing"] = get_retell_coalescing_stats()
+    except Exception:
+        pass
+    
+    # Log pipeline health (records dropped because the queue was full, records sampled out)
+    from config.logging_config import get_logging_stats
+    status["logging"] = get_logging_stats()
+    from services.dnc_index import get_dnc_index_stats
+    status["dnc_index"] = get_dnc_index_stats()
+    from services.verdict_cache import get_verdict_cache_stats
+    status["compliance_cache"] = get_verdict_cache_stats()
+    
     # Check critical env vars
     critical_vars = ["DATABASE_URL", "JWT_SECRET", "RETELL_API_KEY"]
     for var in critical_vars:
@@ -3,14 +3,15 @@ import os
 import json
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone, timedelta
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Query
 from sqlalchemy.orm import Session
 
 from utils.redis_client import get_redis
 from utils.auth import extract_tenant_id
 from config.database import engine
 from models.calls import CallRecord
-from models.compliance import CostEvent
+from services.spend_ledger import cost_breakdown
+from services.usage_rollup import usage_by_day, outcomes_between
 
 router = APIRouter()
 
@@ -85,16 +86,13 @@ async def metrics_daily(days: int = 7) -> Dict[str, Any]:
             if ev.get("type") in finished_types:
                 counts_finished[d] += 1
     else:
-        # Fallback to DB if events list is empty
+        # Fallback to the daily usage rollup if events list is empty
         with Session(engine) as session:
-            cutoff = datetime.combine(start, datetime.min.time()).replace(tzinfo=timezone.utc)
-            rows = session.query(CallRecord).filter(CallRecord.created_at >= cutoff).all()
-            for r in rows:
-                d = r.created_at.date().isoformat()
+            for row in usage_by_day(session, None, start, now):
+                d = row["day"].isoformat() if hasattr(row["day"], "isoformat") else str(row["day"])
                 if d in counts_created:
-                    counts_created[d] += 1
-                if r.status == "ended" and d in counts_finished:
-                    counts_finished[d] += 1
+                    counts_created[d] += row["calls_created"]
+                    counts_finished[d] += row["calls_finished"]
 
     created = [counts_created[d] for d in labels]
     finished = [counts_finished[d] for d in labels]
@@ -109,18 +107,14 @@ async def metrics_outcomes(request: Request, days: int = 7) -> Dict[str, Any]:
     """Get call outcomes metrics"""
     days = max(1, min(days, 60))
     tenant_id = extract_tenant_id(request)
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    today = datetime.now(timezone.utc).date()
     
     with Session(engine) as session:
-        q = session.query(CallRecord).filter(CallRecord.created_at >= cutoff)
-        if tenant_id is not None:
-            q = q.filter(CallRecord.tenant_id == tenant_id)
-        rows = q.all()
-        
-        outcomes_map: Dict[str, int] = {}
-        for r in rows:
-            outcome = r.disposition_outcome or "unknown"
-            outcomes_map[outcome] = outcomes_map.get(outcome, 0) + 1
+        outcomes_map, total = outcomes_between(session, tenant_id, today - timedelta(days=days - 1), today)
+        # Calls without a disposition are reported as "unknown"
+        missing = total - sum(outcomes_map.values())
+        if missing > 0:
+            outcomes_map["unknown"] = outcomes_map.get("unknown", 0) + missing
         
         labels = list(outcomes_map.keys())
         counts = [outcomes_map[k] for k in labels]
@@ -179,23 +173,46 @@ async def metrics_errors_24h() -> Dict[str, Any]:
 
 @router.get("/cost/today")
 async def metrics_cost_today(request: Request) -> Dict[str, Any]:
-    """Get cost for today"""
+    """Get cost for today (UTC), with a per-component breakdown"""
     tenant_id = extract_tenant_id(request)
-    today = datetime.now(timezone.utc).date()
-    total_cents = 0
+    start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
     
     with Session(engine) as session:
-        q = session.query(CostEvent)
-        if tenant_id is not None:
-            # Note: CostEvent might not have tenant_id, so we filter by date only for now
-            pass
-        rows = q.all()
-        for r in rows:
-            dt = (r.ts or datetime.now(timezone.utc)).date()
-            if dt == today:
-                total_cents += int(r.amount or 0)
+        rows = cost_breakdown(session, tenant_id, start, start + timedelta(days=1))
+    
+    by_component: Dict[str, int] = {}
+    for row in rows:
+        by_component[row["component"]] = by_component.get(row["component"], 0) + row["amount_cents"]
+    total_cents = sum(by_component.values())
+    return {
+        "amount": round(total_cents / 100.0, 4),
+        "currency": "EUR",
+        "by_component": {k: round(v / 100.0, 4) for k, v in sorted(by_component.items())},
+    }
+
+
+@router.get("/cost/daily")
+async def metrics_cost_daily(
+    request: Request,
+    days: int = Query(30, ge=1, le=366),
+) -> Dict[str, Any]:
+    """Get cost per day and component for the last `days` days (UTC, today included)"""
+    tenant_id = extract_tenant_id(request)
+    end = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    
+    with Session(engine) as session:
+        rows = cost_breakdown(session, tenant_id, end - timedelta(days=days), end)
     
-    return {"amount": round(total_cents / 100.0, 4), "currency": "EUR"}
+    items: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        item = items.setdefault(row["day"], {"date": row["day"], "amount_cents": 0, "by_component": {}})
+        item["amount_cents"] += row["amount_cents"]
+        item["by_component"][row["component"]] = item["by_component"].get(row["component"], 0) + row["amount_cents"]
+    return {
+        "days": days,
+        "items": list(items.values()),
+        "total_cents": sum(i["amount_cents"] for i in items.values()),
+    }
 
 
 @router.get("/latency/p95")
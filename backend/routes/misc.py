@@ -4,7 +4,7 @@ import csv
 import asyncio
 import importlib
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timezone, timedelta
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Request, HTTPException, UploadFile, File, Form
 from pydantic import BaseModel
@@ -24,7 +24,11 @@ from services.enforcement import (
     enforce_subscription_or_raise,
     enforce_budget_or_raise,
     enforce_compliance_or_raise,
+    reserve_budget_or_raise,
+    estimate_call_cost_cents,
 )
+from services.spend_ledger import attach_reservation, release_reservation
+from services.usage_rollup import rollup_call_created
 router = APIRouter()
 
 # Get backend directory for worker import
@@ -179,11 +183,33 @@ async def start_batch(request: Request, items: List[BatchItem]):
             return None
         return None
 
+    def _reserve(it: BatchItem, dial_delay_ms: int = 0) -> Optional[int]:
+        """Reserve the item's estimated cost; None once the budget cap is reached"""
+        campaign_id = (it.metadata or {}).get("campaign_id")
+        with Session(engine) as session:
+            try:
+                return reserve_budget_or_raise(
+                    session,
+                    request,
+                    estimate_call_cost_cents(session, campaign_id),
+                    dial_delay_ms=dial_delay_ms,
+                )
+            except HTTPException:
+                return None
+
+    def _release(reservation_id: Optional[int]) -> None:
+        with Session(engine) as session:
+            release_reservation(session, reservation_id)
+            session.commit()
+
     actor = _get_dramatiq_actor()
     if actor is not None:
         accepted = 0
         for it in items:
             delay_ms = int(max(0, (it.delay_ms or 0)))
+            reservation_id = _reserve(it, delay_ms)  # held until the delayed dial (plus TTL)
+            if reservation_id is None:
+                break  # budget cap reached: the remaining items are not enqueued
             # Compose knowledge if kb_id present
             kb_payload = None
             if it.kb_id is not None:
@@ -203,19 +229,31 @@ async def start_batch(request: Request, items: List[BatchItem]):
             # from_number will be resolved in worker with priority logic
             actor.send_with_options(
                 args=(it.to, tenant_id, it.from_number, it.agent_id, it.metadata, it.delay_ms, kb_payload),
+                kwargs={"reservation_id": reservation_id},
                 delay=delay_ms,
             )
             accepted += 1
-        return {"accepted": accepted, "mode": "queue"}
+        return {"accepted": accepted, "rejected_budget": len(items) - accepted, "mode": "queue"}
+
+    # Fallback: inline async processing. Budget is reserved up front, like the queue
+    # path, so the response reports what the cap rejected; items dropped later (no
+    # from_number, compliance) are skipped by the loop and their reservation released.
+    reserved: List[Tuple[BatchItem, int]] = []
+    dial_at_ms = 0
+    for it in items:
+        dial_at_ms += int(max(0, (it.delay_ms or 0)))  # items are dialed one after another
+        reservation_id = _reserve(it, dial_at_ms)
+        if reservation_id is None:
+            break  # budget cap reached: the remaining items are not dialed
+        reserved.append((it, reservation_id))
 
-    # Fallback: inline async processing
     async def worker():
         import httpx
         base_url = get_retell_base_url()
         endpoint = f"{base_url}/v2/create-phone-call"
         headers = get_retell_headers()
         async with httpx.AsyncClient(timeout=30) as client:
-            for it in items:
+            for it, reservation_id in reserved:
                 await asyncio.sleep((it.delay_ms or 0) / 1000.0)
                 # Resolve from_number with priority logic
                 campaign_id = (it.metadata or {}).get("campaign_id") if it.metadata else None
@@ -230,6 +268,7 @@ async def start_batch(request: Request, items: List[BatchItem]):
                         tenant_id=tenant_id,
                     )
                 if not effective_from:
+                    _release(reservation_id)
                     continue
                 # Compliance gating per item
                 try:
@@ -242,6 +281,7 @@ async def start_batch(request: Request, items: List[BatchItem]):
                                 lead = None
                         enforce_compliance_or_raise(session, request, it.to, it.metadata, lead=lead)
                 except Exception:
+                    _release(reservation_id)
                     continue
                 body = {"to_number": it.to, "from_number": effective_from}
                 if it.agent_id:
@@ -250,27 +290,33 @@ async def start_batch(request: Request, items: List[BatchItem]):
                     body["metadata"] = it.metadata
                 try:
                     resp = await client.post(endpoint, headers=headers, json=body)
-                    if resp.status_code < 400:
+                    if resp.status_code >= 400:
+                        _release(reservation_id)
+                    else:
                         data = resp.json()
                         with Session(engine) as session:
+                            attach_reservation(session, reservation_id, data.get("call_id") or data.get("id"))
                             rec = CallRecord(
                                 direction="outbound",
                                 provider="retell",
                                 to_number=it.to,
                                 from_number=effective_from,
-                                provider_call_id=str(data.get("call_id") or data.get("id") or ""),
+                                provider_call_id=str(data.get("call_id") or data.get("id") or "") or None,
                                 status="created",
                                 raw_response=str(data),
                                 tenant_id=tenant_id,
                             )
                             session.add(rec)
+                            rollup_call_created(session, tenant_id)
                             session.commit()
+                        reservation_id = None  # settled on call.finished
                         await ws_manager.broadcast({"type": "call.created", "data": data})
                 except Exception:
-                    pass
+                    if reservation_id is not None:
+                        _release(reservation_id)
 
     asyncio.create_task(worker())
-    return {"accepted": len(items), "mode": "inline"}
+    return {"accepted": len(reserved), "rejected_budget": len(items) - len(reserved), "mode": "inline"}
 
 
 @router.post("/batch/import")
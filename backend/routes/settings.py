@@ -8,7 +8,7 @@ from sqlalchemy.orm import Session
 
 from config.database import engine
 from models.settings import AppSettings, AppMeta
-from services.settings import get_settings, get_meta
+from services.settings import get_settings, get_meta, invalidate_settings
 from utils.auth import extract_tenant_id, _decode_token
 from services.effective_settings import get_effective_settings
 from schemas.settings import EffectiveSettings
@@ -119,6 +119,7 @@ async def update_settings(body: SettingsUpdate) -> Dict[str, Any]:
         if body.quiet_hours_timezone is not None:
             row.quiet_hours_timezone = body.quiet_hours_timezone
         session.commit()
+    invalidate_settings()
     return await get_settings_endpoint()
 
 
@@ -160,6 +161,7 @@ async def put_settings_general(body: GeneralUpdate) -> Dict[str, Any]:
         if body.ui_locale is not None:
             s.default_lang = body.ui_locale
         session.commit()
+    invalidate_settings()
     return await get_settings_general()
 
 
@@ -208,6 +210,7 @@ async def put_settings_languages(body: LanguagesUpdate) -> Dict[str, Any]:
         except Exception:
             pass
         session.commit()
+    invalidate_settings()
     return await get_settings_languages()
 
 
@@ -237,6 +240,7 @@ async def put_settings_telephony(body: TelephonyUpdate) -> Dict[str, Any]:
         if body.spacing_ms is not None:
             s.default_spacing_ms = max(0, int(body.spacing_ms or 0))
         session.commit()
+    invalidate_settings()
     return await get_settings_telephony()
 
 
@@ -270,6 +274,7 @@ async def put_settings_compliance(body: ComplianceUpdate) -> Dict[str, Any]:
         if body.country_rules is not None:
             s.legal_defaults_json = json.dumps(body.country_rules or {})
         session.commit()
+    invalidate_settings()
     return await get_settings_compliance()
 
 
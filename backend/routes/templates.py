@@ -6,6 +6,7 @@ from pydantic import BaseModel
 from models.campaigns import Campaign, Lead
 from utils.auth import extract_tenant_id
 from utils.tenant import tenant_session
+from utils.numbering_plan import country_iso_for_number, timezone_for_number
 
 router = APIRouter()
 
@@ -60,6 +61,8 @@ async def apply_template(request: Request, payload: Dict[str, Any] = Body(...)):
                 name=nm,
                 phone=ph,
                 company=co,
+                country_iso=country_iso_for_number(ph),
+                timezone=timezone_for_number(ph),
                 preferred_lang=lang,
                 consent_status="unknown",
                 tenant_id=tenant_id,
@@ -13,6 +13,9 @@ from sqlalchemy.orm import Session
 from config.database import engine
 from models.webhooks import WebhookEvent, WebhookDLQ
 from models.calls import CallRecord, CallSegment
+from services.spend_ledger import settle_reservation
+from services.usage_rollup import rollup_call_created, rollup_call_finished
+from services.stripe_usage import record_call_usage
 from utils.auth import extract_tenant_id
 from utils.tenant import tenant_session
 from utils.redis_client import get_redis
@@ -242,6 +245,7 @@ async def webhooks_retell(
                         raw_response=json.dumps(payload),
                     )
                     session.add(rec)
+                    rollup_call_created(session, final_tenant_id)
                     session.commit()
                     session.refresh(rec)
                     
@@ -284,6 +288,7 @@ async def webhooks_retell(
             rec.last_event_at = datetime.now(timezone.utc)
             
             if event_type and ("finished" in event_type or event_type == "call.finished"):
+                was_ended = rec.status == "ended"
                 rec.status = "ended"
                 rec.updated_at = datetime.now(timezone.utc)
                 
@@ -301,6 +306,9 @@ async def webhooks_retell(
                     else:
                         rec.call_cost_cents = int(cost_value) if cost_value else None
                 
+                # Replace the budget reservation made when dialing with the actual cost
+                settle_reservation(session, rec.provider_call_id, rec.call_cost_cents)
+                
                 # Save transcript/summary/media
                 # Note: data is already set above from payload.get("data") or payload
                 if event_type == "call.transcript.append":
@@ -354,6 +362,9 @@ async def webhooks_retell(
                     outcome = (data.get("outcome") or data.get("disposition") or data.get("status") or "unknown")
                     rec.disposition_outcome = outcome
                     rec.disposition_updated_at = datetime.now(timezone.utc)
+                if not was_ended:
+                    rollup_call_finished(session, rec, rec.disposition_outcome)
+                    record_call_usage(session, rec)
                 session.commit()
                 # Mark webhook processed
                 we = session.query(WebhookEvent).filter(WebhookEvent.event_id == event_id).one_or_none()
@@ -6,11 +6,11 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from config.database import engine
-from models.billing import Subscription
 from models.workflows import WorkflowUsage, WorkflowEmailEvent
 from utils.auth import extract_tenant_id
 from utils.redis_client import get_redis
 from services.enforcement import enforce_subscription_or_raise
+from services.entitlements import get_tenant_entitlements
 
 router = APIRouter()
 
@@ -67,13 +67,7 @@ async def workflows_email_send(request: Request, body: WorkflowEmailSend) -> Dic
 
     # Quota check and record usage
     with Session(engine) as session:
-        sub = (
-            session.query(Subscription)
-            .filter(Subscription.tenant_id == (tenant_id or 0))
-            .order_by(Subscription.id.desc())
-            .first()
-        )
-        plan = sub.plan_code if sub else "free"
+        plan = get_tenant_entitlements(tenant_id).plan_code
         quota = _email_quota_for_plan(plan)
         month = datetime.now(timezone.utc).strftime("%Y-%m")
         usage = (
@@ -103,13 +97,7 @@ async def workflows_usage(request: Request) -> Dict[str, Any]:
     """Get workflow usage stats"""
     tenant_id = extract_tenant_id(request)
     with Session(engine) as session:
-        sub = (
-            session.query(Subscription)
-            .filter(Subscription.tenant_id == (tenant_id or 0))
-            .order_by(Subscription.id.desc())
-            .first()
-        )
-        plan = sub.plan_code if sub else "free"
+        plan = get_tenant_entitlements(tenant_id).plan_code
         quota = _email_quota_for_plan(plan)
         month = datetime.now(timezone.utc).strftime("%Y-%m")
         usage = (
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Generate knowledge/general/data/compliance_pack.v1.bin
+
+Merges the compliance knowledge sources into one record per country and
+compiles it with the same conversion services/compliance.py applies at runtime:
+- compliance.v2.json (fused_by_iso) is the primary source
+- rules.v1.json fills a missing DNC registry name/URL and last_verified date
+- compliance_global.csv fills the same fields plus country and continent
+
+Only values that look valid are taken from the older sources (several CSV rows
+have shifted columns), and a value present in compliance.v2.json is never
+overwritten. The pack layout is described in services/compliance_pack.py; it
+stores a hash of the three source files so a stale pack is detected at startup.
+
+Usage:
+    cd backend
+    python scripts/build_compliance_pack.py
+"""
+import csv
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from services.compliance import (  # noqa: E402
+    COMPLIANCE_JSON_PATH,
+    COMPLIANCE_PACK_PATH,
+    COMPLIANCE_SOURCE_PATHS,
+    RULES_V1_JSON_PATH,
+    COMPLIANCE_CSV_PATH,
+    _json_to_country_rule,
+)
+from services.compliance_pack import write_compliance_pack, sources_hash  # noqa: E402
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_NO_REGISTRY = ("", "none", "n/a", "na", "no", "not specified")
+
+
+def _registry_name(value: Any) -> Optional[str]:
+    value = str(value or "").strip()
+    if value.lower() in _NO_REGISTRY or value.lower().startswith("none"):
+        return None
+    return value
+
+
+def _url(value: Any) -> Optional[str]:
+    value = str(value or "").strip()
+    return value if value.startswith(("http://", "https://")) else None
+
+
+def _date(value: Any) -> Optional[str]:
+    value = str(value or "").strip()
+    return value if _DATE_RE.match(value) else None
+
+
+def _load_json(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("fused_by_iso", {})
+
+
+def _load_csv(path: Path) -> Dict[str, Dict[str, str]]:
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return {row["ISO2"].strip().upper(): row for row in csv.DictReader(f) if row.get("ISO2")}
+
+
+def merge(primary: Dict[str, Any], v1: Dict[str, Any], csv_row: Dict[str, str]) -> Dict[str, Any]:
+    """One country's merged source record (primary values always win)"""
+    data = json.loads(json.dumps(primary))
+    dnc = data.get("dnc")
+    if not isinstance(dnc, dict):
+        dnc = data["dnc"] = {}
+    v1_dnc = v1.get("dnc") or []
+    v1_dnc = v1_dnc[0] if isinstance(v1_dnc, list) and v1_dnc else {}
+
+    if not dnc.get("name"):
+        name = _registry_name(v1_dnc.get("name")) or _registry_name(csv_row.get("DNC_Registry_Name"))
+        if name:
+            dnc["name"] = name
+    if not dnc.get("url"):
+        url = _url(v1_dnc.get("url")) or _url(csv_row.get("DNC_Registry_URL"))
+        if url:
+            dnc["url"] = url
+    if not _date(data.get("last_verified")):
+        verified = _date(v1.get("last_verified")) or _date(csv_row.get("Last_Verified"))
+        if verified:
+            data["last_verified"] = verified
+    if not data.get("country") and csv_row.get("Country"):
+        data["country"] = csv_row["Country"].strip()
+    if not data.get("continent") and csv_row.get("Continent"):
+        data["continent"] = csv_row["Continent"].strip()
+    return data
+
+
+def build() -> Dict[str, Dict[str, Any]]:
+    """Merged source record per ISO code (countries present in compliance.v2.json)"""
+    v2 = _load_json(COMPLIANCE_JSON_PATH)
+    v1 = _load_json(RULES_V1_JSON_PATH)
+    rows = _load_csv(COMPLIANCE_CSV_PATH)
+    merged = {}
+    for iso, data in v2.items():
+        iso = iso.upper()
+        if len(iso) != 2:
+            continue
+        merged[iso] = merge(data, v1.get(iso) or {}, rows.get(iso) or {})
+    return dict(sorted(merged.items()))
+
+
+def main() -> int:
+    merged = build()
+    records = []
+    for iso, data in merged.items():
+        record = _json_to_country_rule(iso, data)
+        record.pop("timezone", None)  # resolved from the numbering plan at load time
+        record["source_json"] = json.dumps(data, separators=(",", ":"), ensure_ascii=False, sort_keys=True)
+        records.append(record)
+    size = write_compliance_pack(COMPLIANCE_PACK_PATH, records, sources_hash(COMPLIANCE_SOURCE_PATHS))
+    print(f"Wrote {len(records)} countries ({size} bytes) to {COMPLIANCE_PACK_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Generate knowledge/general/data/numbering_plan.v1.json
+
+Merges the ITU-T E.164 country calling codes (table below, including the shared
+codes split by area: NANP area codes, +7 Kazakhstan, UK Crown Dependencies, ...)
+with the dialCode of every country in knowledge/general/telnyx_complete.json.
+For the same prefix the ITU table wins (telnyx lists e.g. CA/DO/PR as "1" and
+KZ as "7"); telnyx prefixes that are missing here are added.
+
+The output maps digit prefixes (without "+") to ISO 3166 alpha-2 codes, and
+prefixes to IANA timezones: every country gets its main zone (pytz country
+zones, overridden below for countries spanning several zones) and area codes of
+multi-zone countries get their own. Both are loaded into a prefix trie by
+utils/numbering_plan.py.
+
+Usage:
+    cd backend
+    python scripts/build_numbering_plan.py
+"""
+import json
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Dict
+
+import pytz
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+KNOWLEDGE_DIR = BACKEND_DIR.parent / "knowledge" / "general"
+TELNYX_PATH = KNOWLEDGE_DIR / "telnyx_complete.json"
+OUTPUT_PATH = KNOWLEDGE_DIR / "data" / "numbering_plan.v1.json"
+
+# Country calling code -> ISO alpha-2 (ITU-T E.164 assignments, geographic codes only)
+ITU_COUNTRY_CODES: Dict[str, str] = {
+    # Zone 1 (NANP): "1" defaults to US, other members are listed by area code below
+    "1": "US",
+    # Zone 2
+    "20": "EG", "211": "SS", "212": "MA", "213": "DZ", "216": "TN", "218": "LY",
+    "220": "GM", "221": "SN", "222": "MR", "223": "ML", "224": "GN", "225": "CI",
+    "226": "BF", "227": "NE", "228": "TG", "229": "BJ", "230": "MU", "231": "LR",
+    "232": "SL", "233": "GH", "234": "NG", "235": "TD", "236": "CF", "237": "CM",
+    "238": "CV", "239": "ST", "240": "GQ", "241": "GA", "242": "CG", "243": "CD",
+    "244": "AO", "245": "GW", "246": "IO", "247": "SH", "248": "SC", "249": "SD",
+    "250": "RW", "251": "ET", "252": "SO", "253": "DJ", "254": "KE", "255": "TZ",
+    "256": "UG", "257": "BI", "258": "MZ", "260": "ZM", "261": "MG", "262": "RE",
+    "263": "ZW", "264": "NA", "265": "MW", "266": "LS", "267": "BW", "268": "SZ",
+    "269": "KM", "27": "ZA", "290": "SH", "291": "ER", "297": "AW", "298": "FO",
+    "299": "GL",
+    # Zone 3
+    "30": "GR", "31": "NL", "32": "BE", "33": "FR", "34": "ES", "350": "GI",
+    "351": "PT", "352": "LU", "353": "IE", "354": "IS", "355": "AL", "356": "MT",
+    "357": "CY", "358": "FI", "359": "BG", "36": "HU", "370": "LT", "371": "LV",
+    "372": "EE", "373": "MD", "374": "AM", "375": "BY", "376": "AD", "377": "MC",
+    "378": "SM", "379": "VA", "380": "UA", "381": "RS", "382": "ME", "383": "XK",
+    "385": "HR", "386": "SI", "387": "BA", "389": "MK", "39": "IT",
+    # Zone 4
+    "40": "RO", "41": "CH", "420": "CZ", "421": "SK", "423": "LI", "43": "AT",
+    "44": "GB", "45": "DK", "46": "SE", "47": "NO", "48": "PL", "49": "DE",
+    # Zone 5
+    "500": "FK", "501": "BZ", "502": "GT", "503": "SV", "504": "HN", "505": "NI",
+    "506": "CR", "507": "PA", "508": "PM", "509": "HT", "51": "PE", "52": "MX",
+    "53": "CU", "54": "AR", "55": "BR", "56": "CL", "57": "CO", "58": "VE",
+    "590": "GP", "591": "BO", "592": "GY", "593": "EC", "594": "GF", "595": "PY",
+    "596": "MQ", "597": "SR", "598": "UY", "599": "CW",
+    # Zone 6
+    "60": "MY", "61": "AU", "62": "ID", "63": "PH", "64": "NZ", "65": "SG",
+    "66": "TH", "670": "TL", "672": "NF", "673": "BN", "674": "NR", "675": "PG",
+    "676": "TO", "677": "SB", "678": "VU", "679": "FJ", "680": "PW", "681": "WF",
+    "682": "CK", "683": "NU", "685": "WS", "686": "KI", "687": "NC", "688": "TV",
+    "689": "PF", "690": "TK", "691": "FM", "692": "MH",
+    # Zone 7
+    "7": "RU",
+    # Zone 8
+    "81": "JP", "82": "KR", "84": "VN", "850": "KP", "852": "HK", "853": "MO",
+    "855": "KH", "856": "LA", "86": "CN", "880": "BD", "886": "TW",
+    # Zone 9
+    "90": "TR", "91": "IN", "92": "PK", "93": "AF", "94": "LK", "95": "MM",
+    "960": "MV", "961": "LB", "962": "JO", "963": "SY", "964": "IQ", "965": "KW",
+    "966": "SA", "967": "YE", "968": "OM", "970": "PS", "971": "AE", "972": "IL",
+    "973": "BH", "974": "QA", "975": "BT", "976": "MN", "977": "NP", "98": "IR",
+    "992": "TJ", "993": "TM", "994": "AZ", "995": "GE", "996": "KG", "998": "UZ",
+}
+
+# Areas of shared calling codes that belong to another country/territory
+SHARED_CODE_AREAS: Dict[str, str] = {
+    # NANP: Canada
+    **{f"1{npa}": "CA" for npa in (
+        "204", "226", "236", "249", "250", "257", "263", "289", "306", "343", "354",
+        "365", "367", "368", "382", "403", "416", "418", "428", "431", "437", "438",
+        "450", "468", "474", "506", "514", "519", "548", "579", "581", "584", "587",
+        "604", "613", "639", "647", "672", "683", "705", "709", "742", "753", "778",
+        "780", "782", "807", "819", "825", "867", "873", "879", "902", "905", "942",
+    )},
+    # NANP: Caribbean and Pacific members
+    "1242": "BS", "1246": "BB", "1264": "AI", "1268": "AG", "1284": "VG",
+    "1340": "VI", "1345": "KY", "1441": "BM", "1473": "GD", "1649": "TC",
+    "1658": "JM", "1664": "MS", "1670": "MP", "1671": "GU", "1684": "AS",
+    "1721": "SX", "1758": "LC", "1767": "DM", "1784": "VC", "1787": "PR",
+    "1809": "DO", "1829": "DO", "1849": "DO", "1868": "TT", "1869": "KN",
+    "1876": "JM", "1939": "PR",
+    # +7
+    "76": "KZ", "77": "KZ",
+    # +44 Crown Dependencies
+    "441481": "GG", "441534": "JE", "441624": "IM",
+    # Others
+    "262269": "YT", "262639": "YT",
+    "35818": "AX",
+    "3906698": "VA",
+    "4779": "SJ",
+    "5997": "BQ",
+    "6189162": "CC", "6189164": "CX",
+}
+
+
+# Main zone for countries spanning several zones (pytz lists them in no useful order)
+COUNTRY_DEFAULT_TIMEZONES: Dict[str, str] = {
+    "US": "America/New_York", "CA": "America/Toronto", "MX": "America/Mexico_City",
+    "BR": "America/Sao_Paulo", "AR": "America/Argentina/Buenos_Aires", "CL": "America/Santiago",
+    "EC": "America/Guayaquil", "RU": "Europe/Moscow", "KZ": "Asia/Almaty", "UA": "Europe/Kyiv",
+    "AU": "Australia/Sydney", "NZ": "Pacific/Auckland", "ID": "Asia/Jakarta", "MY": "Asia/Kuala_Lumpur",
+    "CN": "Asia/Shanghai", "MN": "Asia/Ulaanbaatar", "ES": "Europe/Madrid", "PT": "Europe/Lisbon",
+    "DE": "Europe/Berlin", "FR": "Europe/Paris", "GB": "Europe/London", "NL": "Europe/Amsterdam",
+    "DK": "Europe/Copenhagen", "CD": "Africa/Kinshasa", "KI": "Pacific/Tarawa", "FM": "Pacific/Pohnpei",
+    "PF": "Pacific/Tahiti", "PG": "Pacific/Port_Moresby", "UZ": "Asia/Tashkent", "GL": "America/Nuuk",
+    "CY": "Asia/Nicosia", "EH": "Africa/El_Aaiun", "XK": "Europe/Belgrade", "AQ": "Antarctica/McMurdo",
+}
+
+# Area codes of multi-zone countries (prefixes including the country code)
+AREA_TIMEZONES: Dict[str, str] = {
+    **{f"1{npa}": "America/Los_Angeles" for npa in (
+        "209", "213", "279", "310", "323", "341", "350", "408", "415", "424", "442", "510",
+        "530", "559", "562", "619", "626", "628", "650", "657", "661", "669", "707", "714",
+        "747", "760", "805", "818", "820", "831", "840", "858", "909", "916", "925", "949",
+        "951", "206", "253", "360", "425", "509", "564", "458", "503", "541", "971", "702",
+        "725", "775",
+    )},
+    **{f"1{npa}": "America/Denver" for npa in (
+        "303", "719", "720", "970", "983", "385", "435", "801", "505", "575", "406", "307",
+        "208", "986", "915",
+    )},
+    **{f"1{npa}": "America/Phoenix" for npa in ("480", "520", "602", "623", "928")},
+    **{f"1{npa}": "America/Chicago" for npa in (
+        "210", "214", "254", "281", "325", "346", "361", "409", "430", "432", "469", "512",
+        "682", "713", "726", "737", "806", "817", "830", "832", "903", "936", "940", "945",
+        "956", "972", "979", "217", "224", "309", "312", "331", "447", "464", "618", "630",
+        "708", "730", "773", "779", "815", "847", "872", "218", "320", "507", "612", "651",
+        "763", "952", "262", "274", "414", "534", "608", "715", "920", "314", "417", "557",
+        "573", "636", "660", "816", "975", "319", "515", "563", "641", "712", "316", "620",
+        "785", "913", "308", "402", "531", "405", "539", "572", "580", "918", "327", "479",
+        "501", "870", "225", "318", "337", "504", "985", "228", "601", "662", "769", "205",
+        "251", "256", "334", "659", "938", "615", "629", "731", "901", "701", "605", "219",
+        "270", "364",
+    )},
+    "1907": "America/Anchorage",
+    "1808": "Pacific/Honolulu",
+    # Canada (the country default covers Ontario/Quebec)
+    **{f"1{npa}": "America/Vancouver" for npa in ("236", "250", "257", "604", "672", "778")},
+    **{f"1{npa}": "America/Edmonton" for npa in ("368", "403", "587", "780", "825", "867")},
+    **{f"1{npa}": "America/Winnipeg" for npa in ("204", "431", "584")},
+    **{f"1{npa}": "America/Regina" for npa in ("306", "474", "639")},
+    **{f"1{npa}": "America/Halifax" for npa in ("428", "506", "782", "902")},
+    **{f"1{npa}": "America/St_Johns" for npa in ("709", "879")},
+    # Mexico
+    "52664": "America/Tijuana", "52686": "America/Tijuana", "52665": "America/Tijuana",
+    "52646": "America/Tijuana", "52662": "America/Hermosillo", "52612": "America/Mazatlan",
+    "52669": "America/Mazatlan", "52998": "America/Cancun",
+    # Brazil (DDD)
+    "5565": "America/Cuiaba", "5566": "America/Cuiaba", "5567": "America/Campo_Grande",
+    "5568": "America/Rio_Branco", "5569": "America/Porto_Velho", "5591": "America/Belem",
+    "5592": "America/Manaus", "5597": "America/Manaus", "5595": "America/Boa_Vista",
+    "5593": "America/Santarem", "5594": "America/Belem", "5596": "America/Belem",
+    "5581": "America/Recife", "5583": "America/Fortaleza", "5585": "America/Fortaleza",
+    "5571": "America/Bahia", "5579": "America/Maceio", "5582": "America/Maceio",
+    # Russia (geographic codes; mobiles keep the Moscow default)
+    "7343": "Asia/Yekaterinburg", "7351": "Asia/Yekaterinburg", "7345": "Asia/Yekaterinburg",
+    "7381": "Asia/Omsk", "7383": "Asia/Novosibirsk", "7384": "Asia/Novokuznetsk",
+    "7391": "Asia/Krasnoyarsk", "7395": "Asia/Irkutsk", "7416": "Asia/Yakutsk",
+    "7423": "Asia/Vladivostok", "7421": "Asia/Vladivostok", "7413": "Asia/Magadan",
+    "7415": "Asia/Kamchatka", "7401": "Europe/Kaliningrad", "7846": "Europe/Samara",
+    "7347": "Asia/Yekaterinburg", "7342": "Asia/Yekaterinburg",
+    # Australia (area code digit after +61)
+    "612": "Australia/Sydney", "613": "Australia/Melbourne", "617": "Australia/Brisbane",
+    "618": "Australia/Perth", "6188": "Australia/Adelaide", "6189": "Australia/Perth",
+    # Indonesia
+    "6261": "Asia/Jakarta", "62361": "Asia/Makassar", "62411": "Asia/Makassar",
+    "62967": "Asia/Jayapura",
+    # Kazakhstan west
+    "77122": "Asia/Atyrau", "77292": "Asia/Aqtau", "77132": "Asia/Aqtobe",
+    # Spain: Canary Islands; Portugal: Azores
+    "34928": "Atlantic/Canary", "34922": "Atlantic/Canary", "35129": "Atlantic/Azores",
+}
+
+
+def build_timezones(prefixes: Dict[str, str]) -> Dict[str, str]:
+    timezones: Dict[str, str] = {}
+    for prefix, iso in prefixes.items():
+        tz = COUNTRY_DEFAULT_TIMEZONES.get(iso) or next(iter(pytz.country_timezones.get(iso, [])), None)
+        if tz:
+            timezones[prefix] = tz
+    timezones.update(AREA_TIMEZONES)
+    for prefix, tz in timezones.items():
+        pytz.timezone(tz)  # fail the build on unknown zone names
+    return dict(sorted(timezones.items()))
+
+
+def build() -> Dict[str, str]:
+    prefixes: Dict[str, str] = {}
+    with open(TELNYX_PATH, "r", encoding="utf-8") as f:
+        for item in json.load(f).get("countries", []):
+            country = item.get("country") or {}
+            dial_code = str(country.get("dialCode") or "").strip().lstrip("+")
+            iso = str(country.get("alpha2") or "").strip().upper()
+            if dial_code.isdigit() and len(iso) == 2:
+                prefixes.setdefault(dial_code, iso)
+    prefixes.update(ITU_COUNTRY_CODES)
+    prefixes.update(SHARED_CODE_AREAS)
+    return dict(sorted(prefixes.items()))
+
+
+def main() -> int:
+    prefixes = build()
+    timezones = build_timezones(prefixes)
+    payload = {
+        "version": 1,
+        "generated_at": date.today().isoformat(),
+        "source": "ITU-T E.164 country codes + telnyx_complete.json dialCode (scripts/build_numbering_plan.py)",
+        "prefixes": prefixes,
+        "timezones": timezones,
+    }
+    OUTPUT_PATH.write_text(json.dumps(payload, separators=(",", ":"), ensure_ascii=False) + "\n", encoding="utf-8")
+    print(
+        f"Wrote {len(prefixes)} prefixes ({len(set(prefixes.values()))} countries), "
+        f"{len(timezones)} timezone prefixes to {OUTPUT_PATH}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
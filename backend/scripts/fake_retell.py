@@ -0,0 +1,600 @@
+#!/usr/bin/env python3
+"""Local Retell API stand-in for load testing and offline development
+
+Implements the subset of the Retell API the backend calls (phone calls, list-calls,
+batch calls, knowledge bases, agents/LLMs, phone numbers, voices) with in-memory
+state, plus configurable latency, 5xx and 429 injection. Created calls can emit a
+realistic webhook sequence (call.started -> transcript -> summary -> call.finished)
+back to the backend's /webhooks/retell.
+
+Usage:
+    cd backend
+    uvicorn scripts.fake_retell:app --port 8090
+    # then start the backend with
+    RETELL_BASE_URL=http://127.0.0.1:8090 RETELL_API_KEY=fake ...
+
+Env config (all optional, also changeable at runtime via POST /__fake/config):
+    FAKE_RETELL_LATENCY_MS          Base latency added to every request (default 0)
+    FAKE_RETELL_JITTER_MS           Uniform random extra latency (default 0)
+    FAKE_RETELL_ERROR_RATE          Probability of a 500 response (default 0)
+    FAKE_RETELL_429_RATE            Probability of a 429 response (default 0)
+    FAKE_RETELL_RETRY_AFTER_S       Retry-After header value sent with 429s (default 1)
+    FAKE_RETELL_WEBHOOK_URL         Where to send webhooks (e.g. http://127.0.0.1:8000/webhooks/retell)
+    FAKE_RETELL_WEBHOOK_SECRET      Signs webhooks like Retell (X-Signature, HMAC-SHA256 hex)
+    FAKE_RETELL_CALL_DURATION_S     Simulated call duration before call.finished (default 5)
+    FAKE_RETELL_TRANSCRIPT_TURNS    Transcript segments per call (default 4)
+"""
+import os
+import json
+import hmac
+import time
+import uuid
+import random
+import asyncio
+import hashlib
+from typing import Dict, Any, List, Optional
+
+import httpx
+from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import JSONResponse, Response
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+CONFIG: Dict[str, Any] = {
+    "latency_ms": _env_float("FAKE_RETELL_LATENCY_MS", 0),
+    "jitter_ms": _env_float("FAKE_RETELL_JITTER_MS", 0),
+    "error_rate": _env_float("FAKE_RETELL_ERROR_RATE", 0),
+    "rate_limit_rate": _env_float("FAKE_RETELL_429_RATE", 0),
+    "retry_after_s": _env_float("FAKE_RETELL_RETRY_AFTER_S", 1),
+    "webhook_url": os.getenv("FAKE_RETELL_WEBHOOK_URL"),
+    "webhook_secret": os.getenv("FAKE_RETELL_WEBHOOK_SECRET"),
+    "call_duration_s": _env_float("FAKE_RETELL_CALL_DURATION_S", 5),
+    "transcript_turns": int(_env_float("FAKE_RETELL_TRANSCRIPT_TURNS", 4)),
+}
+
+# In-memory state
+CALLS: Dict[str, Dict[str, Any]] = {}
+BATCHES: Dict[str, Dict[str, Any]] = {}
+KBS: Dict[str, Dict[str, Any]] = {}
+AGENTS: Dict[str, List[Dict[str, Any]]] = {}  # agent_id -> versions (last = latest)
+LLMS: Dict[str, Dict[str, Any]] = {}
+NUMBERS: Dict[str, Dict[str, Any]] = {}
+STATS: Dict[str, int] = {"requests": 0, "injected_errors": 0, "injected_429": 0, "webhooks_sent": 0, "webhooks_failed": 0}
+
+VOICES: List[Dict[str, Any]] = [
+    {"voice_id": "11labs-Adrian", "voice_name": "Adrian", "provider": "elevenlabs", "gender": "male", "accent": "American", "age": "Young", "preview_audio_url": None},
+    {"voice_id": "11labs-Giulia", "voice_name": "Giulia", "provider": "elevenlabs", "gender": "female", "accent": "Italian", "age": "Middle Aged", "preview_audio_url": None},
+    {"voice_id": "openai-Alloy", "voice_name": "Alloy", "provider": "openai", "gender": "female", "accent": "American", "age": "Young", "preview_audio_url": None},
+    {"voice_id": "deepgram-Marco", "voice_name": "Marco", "provider": "deepgram", "gender": "male", "accent": "Italian", "age": "Young", "preview_audio_url": None},
+]
+
+OUTCOMES = ["qualified", "not_interested", "callback", "voicemail", "no_answer"]
+
+app = FastAPI(title="Fake Retell API", version="0.1.0")
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _new_id(prefix: str) -> str:
+    return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+
+@app.middleware("http")
+async def inject_faults(request: Request, call_next):
+    """Apply configured latency, 5xx and 429 injection (admin routes are exempt)"""
+    if request.url.path.startswith("/__fake"):
+        return await call_next(request)
+    STATS["requests"] += 1
+    delay_ms = CONFIG["latency_ms"] + random.uniform(0, CONFIG["jitter_ms"])
+    if delay_ms > 0:
+        await asyncio.sleep(delay_ms / 1000.0)
+    roll = random.random()
+    if roll < CONFIG["rate_limit_rate"]:
+        STATS["injected_429"] += 1
+        return JSONResponse(
+            status_code=429,
+            content={"message": "Rate limit exceeded (injected)"},
+            headers={"Retry-After": str(int(CONFIG["retry_after_s"]))},
+        )
+    if roll < CONFIG["rate_limit_rate"] + CONFIG["error_rate"]:
+        STATS["injected_errors"] += 1
+        return JSONResponse(status_code=500, content={"message": "Internal server error (injected)"})
+    return await call_next(request)
+
+
+# ============================================================================
+# Admin
+# ============================================================================
+
+@app.get("/__fake/config")
+async def get_config():
+    return {"config": CONFIG, "stats": STATS, "counts": {
+        "calls": len(CALLS), "batches": len(BATCHES), "kbs": len(KBS),
+        "agents": len(AGENTS), "numbers": len(NUMBERS),
+    }}
+
+
+@app.post("/__fake/config")
+async def update_config(body: Dict[str, Any]):
+    for key, value in body.items():
+        if key in CONFIG:
+            CONFIG[key] = value
+    return {"config": CONFIG}
+
+
+@app.post("/__fake/reset")
+async def reset_state():
+    for store in (CALLS, BATCHES, KBS, AGENTS, LLMS, NUMBERS):
+        store.clear()
+    for key in STATS:
+        STATS[key] = 0
+    return {"ok": True}
+
+
+# ============================================================================
+# Webhook emission
+# ============================================================================
+
+async def _send_webhook(client: httpx.AsyncClient, url: str, payload: Dict[str, Any]) -> None:
+    raw = json.dumps(payload).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    secret = CONFIG.get("webhook_secret")
+    if secret:
+        headers["X-Signature"] = hmac.new(secret.encode("utf-8"), raw, hashlib.sha256).hexdigest()
+    try:
+        resp = await client.post(url, content=raw, headers=headers)
+        STATS["webhooks_sent" if resp.status_code < 400 else "webhooks_failed"] += 1
+    except Exception:
+        STATS["webhooks_failed"] += 1
+
+
+async def _emit_call_lifecycle(call: Dict[str, Any]) -> None:
+    """Emit call.started -> call.transcript.append xN -> call.summary -> call.finished"""
+    url = CONFIG.get("webhook_url")
+    if not url:
+        return
+    call_id = call["call_id"]
+    duration_s = float(CONFIG["call_duration_s"])
+    turns = max(0, int(CONFIG["transcript_turns"]))
+    step = duration_s / (turns + 2) if duration_s > 0 else 0
+
+    def _event(event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "type": event_type,
+            "event_id": _new_id("evt"),
+            "call_id": call_id,
+            "direction": call.get("direction", "outbound"),
+            "from_number": call.get("from_number"),
+            "to_number": call.get("to_number"),
+            "metadata": call.get("metadata") or {},
+            "timestamp": _now_ms(),
+            "data": {"call_id": call_id, **data},
+        }
+
+    async with httpx.AsyncClient(timeout=10) as client:
+        call["call_status"] = "ongoing"
+        call["start_timestamp"] = _now_ms()
+        await _send_webhook(client, url, _event("call.started", {}))
+        for i in range(turns):
+            await asyncio.sleep(step)
+            speaker = "agent" if i % 2 == 0 else "user"
+            await _send_webhook(client, url, _event("call.transcript.append", {
+                "index": i,
+                "speaker": speaker,
+                "start_ms": int(i * step * 1000),
+                "end_ms": int((i + 1) * step * 1000),
+                "text": f"[{speaker}] simulated turn {i + 1}",
+            }))
+        await asyncio.sleep(step)
+        await _send_webhook(client, url, _event("call.summary", {
+            "summary": "Simulated call summary",
+            "bant": {"budget": "unknown", "authority": "unknown", "need": "medium", "timeline": "Q3"},
+        }))
+        await asyncio.sleep(step)
+        outcome = random.choice(OUTCOMES)
+        cost = round(random.uniform(0.05, 0.9), 2)
+        call.update({
+            "call_status": "ended",
+            "end_timestamp": _now_ms(),
+            "duration_ms": int(duration_s * 1000),
+            "disconnection_reason": "agent_hangup",
+            "call_cost": {"combined_cost": cost * 100},
+            "call_analysis": {"call_successful": outcome == "qualified", "custom_analysis_data": {"outcome": outcome}},
+        })
+        await _send_webhook(client, url, _event("call.finished", {
+            "duration_seconds": int(duration_s),
+            "cost": cost,
+            "outcome": outcome,
+        }))
+
+
+def _create_call(body: Dict[str, Any], call_type: str = "phone_call") -> Dict[str, Any]:
+    call_id = _new_id("call")
+    call = {
+        "call_id": call_id,
+        "call_type": call_type,
+        "agent_id": body.get("override_agent_id") or body.get("agent_id") or "agent_fake",
+        "agent_version": body.get("override_agent_version") or 0,
+        "call_status": "registered",
+        "direction": body.get("direction") or "outbound",
+        "from_number": body.get("from_number"),
+        "to_number": body.get("to_number"),
+        "metadata": body.get("metadata") or {},
+        "retell_llm_dynamic_variables": body.get("retell_llm_dynamic_variables") or {},
+        "start_timestamp": None,
+        "end_timestamp": None,
+        "created_at": _now_ms(),
+    }
+    CALLS[call_id] = call
+    if CONFIG.get("webhook_url"):
+        asyncio.get_running_loop().create_task(_emit_call_lifecycle(call))
+    return call
+
+
+# ============================================================================
+# Calls
+# ============================================================================
+
+@app.post("/v2/create-phone-call")
+async def create_phone_call(body: Dict[str, Any]):
+    if not body.get("from_number") or not body.get("to_number"):
+        raise HTTPException(status_code=400, detail="from_number and to_number are required")
+    return _create_call(body)
+
+
+@app.post("/v2/register-phone-call")
+@app.post("/register-phone-call")
+async def register_phone_call(body: Dict[str, Any]):
+    return _create_call(body)
+
+
+@app.get("/v2/get-call/{call_id}")
+async def get_call(call_id: str):
+    call = CALLS.get(call_id)
+    if not call:
+        raise HTTPException(status_code=404, detail="Call not found")
+    return call
+
+
+@app.patch("/v2/update-call/{call_id}")
+async def update_call(call_id: str, body: Dict[str, Any]):
+    call = CALLS.get(call_id)
+    if not call:
+        raise HTTPException(status_code=404, detail="Call not found")
+    if "metadata" in body:
+        call["metadata"] = body["metadata"]
+    return call
+
+
+@app.delete("/v2/delete-call/{call_id}")
+async def delete_call(call_id: str):
+    if CALLS.pop(call_id, None) is None:
+        raise HTTPException(status_code=404, detail="Call not found")
+    return Response(status_code=204)
+
+
+@app.post("/v2/list-calls")
+async def list_calls(body: Optional[Dict[str, Any]] = None):
+    """Newest first by default; pagination_key is the last call_id of the previous page"""
+    body = body or {}
+    limit = max(1, min(int(body.get("limit") or 50), 1000))
+    ascending = (body.get("sort_order") or "descending") == "ascending"
+    items = sorted(CALLS.values(), key=lambda c: (c["created_at"], c["call_id"]), reverse=not ascending)
+    filters = body.get("filter_criteria") or {}
+    ts_filter = filters.get("start_timestamp") or {}
+    if ts_filter.get("lower_threshold") is not None:
+        items = [c for c in items if c["created_at"] >= int(ts_filter["lower_threshold"])]
+    if ts_filter.get("upper_threshold") is not None:
+        items = [c for c in items if c["created_at"] <= int(ts_filter["upper_threshold"])]
+    pagination_key = body.get("pagination_key")
+    if pagination_key:
+        ids = [c["call_id"] for c in items]
+        items = items[ids.index(pagination_key) + 1:] if pagination_key in ids else []
+    return items[:limit]
+
+
+@app.post("/create-batch-call")
+async def create_batch_call(body: Dict[str, Any]):
+    tasks = body.get("tasks") or []
+    if not body.get("from_number") or not tasks:
+        raise HTTPException(status_code=400, detail="from_number and tasks are required")
+    batch_id = _new_id("batch_call")
+    for task in tasks:
+        _create_call({
+            "from_number": body["from_number"],
+            "to_number": task.get("to_number"),
+            "metadata": {**(task.get("metadata") or {}), "batch_call_id": batch_id},
+            "retell_llm_dynamic_variables": task.get("dynamic_variables"),
+        })
+    batch = {
+        "batch_call_id": batch_id,
+        "name": body.get("name") or batch_id,
+        "from_number": body["from_number"],
+        "scheduled_timestamp": body.get("trigger_timestamp") or _now_ms(),
+        "total_task_count": len(tasks),
+    }
+    BATCHES[batch_id] = batch
+    return batch
+
+
+# ============================================================================
+# Knowledge bases
+# ============================================================================
+
+async def _kb_sources_from_form(request: Request) -> List[Dict[str, Any]]:
+    form = await request.form()
+    sources: List[Dict[str, Any]] = []
+    texts = form.get("knowledge_base_texts")
+    if texts:
+        for item in json.loads(texts):
+            sources.append({"type": "text", "source_id": _new_id("source"), "title": item.get("title"), "content_url": None})
+    urls = form.get("knowledge_base_urls")
+    if urls:
+        for url in json.loads(urls):
+            sources.append({"type": "url", "source_id": _new_id("source"), "url": url})
+    for upload in form.getlist("knowledge_base_files"):
+        filename = getattr(upload, "filename", None) or "file"
+        sources.append({"type": "document", "source_id": _new_id("source"), "filename": filename})
+    return sources
+
+
+@app.post("/create-knowledge-base")
+async def create_knowledge_base(request: Request):
+    form = await request.form()
+    name = form.get("knowledge_base_name")
+    if not name:
+        raise HTTPException(status_code=400, detail="knowledge_base_name is required")
+    kb_id = _new_id("knowledge_base")
+    kb = {
+        "knowledge_base_id": kb_id,
+        "knowledge_base_name": name,
+        "status": "in_progress",
+        "knowledge_base_sources": await _kb_sources_from_form(request),
+        "enable_auto_refresh": form.get("enable_auto_refresh") == "true",
+        "last_refreshed_timestamp": _now_ms(),
+    }
+    KBS[kb_id] = kb
+
+    async def _finish_processing() -> None:
+        await asyncio.sleep(1.0)
+        if kb_id in KBS:
+            KBS[kb_id]["status"] = "complete"
+
+    asyncio.get_running_loop().create_task(_finish_processing())
+    return kb
+
+
+@app.get("/get-knowledge-base/{kb_id}")
+async def get_knowledge_base(kb_id: str):
+    kb = KBS.get(kb_id)
+    if not kb:
+        raise HTTPException(status_code=404, detail="Knowledge base not found")
+    return kb
+
+
+@app.get("/list-knowledge-bases")
+async def list_knowledge_bases():
+    return list(KBS.values())
+
+
+@app.delete("/delete-knowledge-base/{kb_id}")
+async def delete_knowledge_base(kb_id: str):
+    if KBS.pop(kb_id, None) is None:
+        raise HTTPException(status_code=404, detail="Knowledge base not found")
+    return Response(status_code=204)
+
+
+@app.post("/add-knowledge-base-sources/{kb_id}")
+async def add_knowledge_base_sources(kb_id: str, request: Request):
+    kb = KBS.get(kb_id)
+    if not kb:
+        raise HTTPException(status_code=404, detail="Knowledge base not found")
+    kb["knowledge_base_sources"].extend(await _kb_sources_from_form(request))
+    return kb
+
+
+@app.delete("/delete-knowledge-base-source/{kb_id}/source/{source_id}")
+async def delete_knowledge_base_source(kb_id: str, source_id: str):
+    kb = KBS.get(kb_id)
+    if not kb:
+        raise HTTPException(status_code=404, detail="Knowledge base not found")
+    kb["knowledge_base_sources"] = [s for s in kb["knowledge_base_sources"] if s.get("source_id") != source_id]
+    return kb
+
+
+# ============================================================================
+# Agents / LLMs
+# ============================================================================
+
+@app.post("/create-retell-llm")
+@app.post("/v2/create-retell-llm")
+async def create_retell_llm(body: Dict[str, Any]):
+    llm_id = _new_id("llm")
+    llm = {**body, "llm_id": llm_id, "version": 0, "last_modification_timestamp": _now_ms()}
+    LLMS[llm_id] = llm
+    return llm
+
+
+@app.patch("/update-retell-llm/{llm_id}")
+async def update_retell_llm(llm_id: str, body: Dict[str, Any]):
+    llm = LLMS.get(llm_id)
+    if not llm:
+        raise HTTPException(status_code=404, detail="LLM not found")
+    llm.update(body)
+    llm["last_modification_timestamp"] = _now_ms()
+    return llm
+
+
+@app.post("/create-agent")
+@app.post("/v2/create-agent")
+async def create_agent(body: Dict[str, Any]):
+    agent_id = _new_id("agent")
+    agent = {**body, "agent_id": agent_id, "version": 0, "is_published": False, "last_modification_timestamp": _now_ms()}
+    AGENTS[agent_id] = [agent]
+    return agent
+
+
+def _latest_agent(agent_id: str) -> Dict[str, Any]:
+    versions = AGENTS.get(agent_id)
+    if not versions:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    return versions[-1]
+
+
+@app.get("/get-agent/{agent_id}")
+@app.get("/v2/get-agent/{agent_id}")
+async def get_agent(agent_id: str, version: Optional[int] = None):
+    if version is not None:
+        for v in AGENTS.get(agent_id, []):
+            if v["version"] == version:
+                return v
+        raise HTTPException(status_code=404, detail="Agent version not found")
+    return _latest_agent(agent_id)
+
+
+@app.get("/get-agent-versions/{agent_id}")
+@app.get("/v2/get-agent-versions/{agent_id}")
+async def get_agent_versions(agent_id: str):
+    if agent_id not in AGENTS:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    return AGENTS[agent_id]
+
+
+@app.get("/list-agents")
+@app.get("/v2/list-agents")
+async def list_agents(limit: int = 1000, pagination_key: Optional[str] = None):
+    items = [versions[-1] for versions in AGENTS.values()]
+    if pagination_key:
+        ids = [a["agent_id"] for a in items]
+        items = items[ids.index(pagination_key) + 1:] if pagination_key in ids else []
+    return items[:limit]
+
+
+@app.patch("/update-agent/{agent_id}")
+@app.patch("/v2/update-agent/{agent_id}")
+async def update_agent(agent_id: str, body: Dict[str, Any]):
+    latest = _latest_agent(agent_id)
+    if latest.get("is_published"):
+        # Editing a published agent creates a new draft version
+        latest = {**latest, "version": latest["version"] + 1, "is_published": False}
+        AGENTS[agent_id].append(latest)
+    latest.update(body)
+    latest["last_modification_timestamp"] = _now_ms()
+    return latest
+
+
+@app.post("/publish-agent/{agent_id}")
+@app.post("/v2/publish-agent/{agent_id}")
+async def publish_agent(agent_id: str):
+    latest = _latest_agent(agent_id)
+    latest["is_published"] = True
+    AGENTS[agent_id].append({**latest, "version": latest["version"] + 1, "is_published": False})
+    return Response(status_code=200)
+
+
+@app.delete("/delete-agent/{agent_id}")
+@app.delete("/v2/delete-agent/{agent_id}")
+async def delete_agent(agent_id: str):
+    if AGENTS.pop(agent_id, None) is None:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    return Response(status_code=204)
+
+
+# ============================================================================
+# Phone numbers
+# ============================================================================
+
+def _number_record(phone_number: str, body: Dict[str, Any], number_type: str) -> Dict[str, Any]:
+    return {
+        "phone_number": phone_number,
+        "phone_number_type": number_type,
+        "phone_number_pretty": phone_number,
+        "inbound_agent_id": body.get("inbound_agent_id"),
+        "outbound_agent_id": body.get("outbound_agent_id"),
+        "inbound_agent_version": body.get("inbound_agent_version"),
+        "outbound_agent_version": body.get("outbound_agent_version"),
+        "area_code": body.get("area_code"),
+        "nickname": body.get("nickname"),
+        "inbound_webhook_url": body.get("inbound_webhook_url"),
+        "last_modification_timestamp": _now_ms(),
+    }
+
+
+@app.post("/create-phone-number")
+async def create_phone_number(body: Dict[str, Any]):
+    area_code = str(body.get("area_code") or "415")
+    number = body.get("phone_number") or f"+1{area_code}{random.randint(1000000, 9999999)}"
+    if number in NUMBERS:
+        raise HTTPException(status_code=409, detail="Phone number already exists")
+    NUMBERS[number] = _number_record(number, body, "retell-twilio")
+    return NUMBERS[number]
+
+
+@app.post("/import-phone-number")
+async def import_phone_number(body: Dict[str, Any]):
+    number = body.get("phone_number")
+    if not number or not body.get("termination_uri"):
+        raise HTTPException(status_code=400, detail="phone_number and termination_uri are required")
+    NUMBERS[number] = _number_record(number, body, "custom")
+    return NUMBERS[number]
+
+
+@app.get("/list-phone-numbers")
+@app.get("/v2/list-phone-numbers")
+async def list_phone_numbers():
+    return list(NUMBERS.values())
+
+
+@app.get("/get-phone-number/{phone_number}")
+async def get_phone_number(phone_number: str):
+    number = NUMBERS.get(phone_number)
+    if not number:
+        raise HTTPException(status_code=404, detail="Phone number not found")
+    return number
+
+
+@app.patch("/update-phone-number/{phone_number}")
+async def update_phone_number(phone_number: str, body: Dict[str, Any]):
+    number = NUMBERS.get(phone_number)
+    if not number:
+        raise HTTPException(status_code=404, detail="Phone number not found")
+    number.update(body)
+    number["last_modification_timestamp"] = _now_ms()
+    return number
+
+
+@app.delete("/delete-phone-number/{phone_number}")
+async def delete_phone_number(phone_number: str):
+    if NUMBERS.pop(phone_number, None) is None:
+        raise HTTPException(status_code=404, detail="Phone number not found")
+    return Response(status_code=204)
+
+
+# ============================================================================
+# Voices
+# ============================================================================
+
+@app.get("/list-voices")
+async def list_voices():
+    return VOICES
+
+
+@app.get("/get-voice/{voice_id}")
+async def get_voice(voice_id: str):
+    for voice in VOICES:
+        if voice["voice_id"] == voice_id:
+            return voice
+    raise HTTPException(status_code=404, detail="Voice not found")
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=int(os.getenv("FAKE_RETELL_PORT", "8090")))
@@ -1,23 +1,47 @@
 """Services module"""
-from .settings import get_settings, get_meta
+from .settings import get_settings, get_meta, invalidate_settings
+from .entitlements import get_tenant_entitlements, invalidate_entitlements
 from .enforcement import (
     enforce_subscription_or_raise,
     enforce_compliance_or_raise,
     enforce_budget_or_raise,
+    reserve_budget_or_raise,
+    estimate_call_cost_cents,
     check_compliance,
 )
 from .compliance import (
     get_country_rule,
     get_country_rule_for_number,
+    resolve_country_rules,
+    load_country_rule_index,
+    invalidate_country_rules,
+)
+from .dnc_index import (
+    dnc_might_contain,
+    dnc_index_add,
+    dnc_index_remove,
+    invalidate_dnc_index,
 )
 
 __all__ = [
     "get_settings",
     "get_meta",
+    "invalidate_settings",
+    "get_tenant_entitlements",
+    "invalidate_entitlements",
     "enforce_subscription_or_raise",
     "enforce_compliance_or_raise",
     "enforce_budget_or_raise",
+    "reserve_budget_or_raise",
+    "estimate_call_cost_cents",
     "check_compliance",
     "get_country_rule",
     "get_country_rule_for_number",
+    "resolve_country_rules",
+    "load_country_rule_index",
+    "invalidate_country_rules",
+    "dnc_might_contain",
+    "dnc_index_add",
+    "dnc_index_remove",
+    "invalidate_dnc_index",
 ]
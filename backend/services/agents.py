@@ -1,42 +1,27 @@
 """Agent management utilities"""
+import logging
 from typing import Optional, Dict, Any
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from models.agents import Agent
-from models.billing import Subscription
+from services.entitlements import get_tenant_entitlements
 from utils.retell import (
     retell_post_json,
     retell_patch_json,
     retell_delete_json,
 )
 
+logger = logging.getLogger(__name__)
+
 
 def check_agent_limit(session: Session, tenant_id: Optional[int]) -> None:
     """Check if tenant can create more agents based on plan"""
     if tenant_id is None:
         return  # No limit for system/admin
     
-    # Get subscription
-    sub = (
-        session.query(Subscription)
-        .filter(Subscription.tenant_id == tenant_id)
-        .order_by(Subscription.id.desc())
-        .first()
-    )
-    plan_code = sub.plan_code if sub else "free"
-    
-    # Get entitlements (we'll need to call the route function, or extract the logic)
-    # For now, inline the logic
-    def _get_agent_limit(plan_code: str) -> Optional[int]:
-        if plan_code == "enterprise":
-            return None  # Unlimited
-        if plan_code == "pro":
-            return 20
-        if plan_code == "core":
-            return 5
-        return 1  # free
-    
-    limit = _get_agent_limit(plan_code)
+    plan = get_tenant_entitlements(tenant_id)
+    plan_code = plan.plan_code
+    limit = plan.entitlements.get("agents_limit")
     if limit is None:
         return  # Unlimited
     
@@ -76,29 +61,23 @@ async def create_retell_agent(
         "begin_message": f"Ciao, sono l'assistente virtuale {name}. Come posso aiutarti?",
     }
     
-    import logging
-    logging.info(f"Creating Retell LLM first: {retell_llm_body}")
-    print(f"[DEBUG] Creating Retell LLM first: {retell_llm_body}", flush=True)
+    logger.debug("Creating Retell LLM first: %s", retell_llm_body)
     
     retell_llm_id = None
     try:
         # Create Retell LLM (response engine)
         llm_response = await retell_post_json("/create-retell-llm", retell_llm_body)
-        logging.info(f"Retell LLM created: {llm_response}")
-        print(f"[DEBUG] Retell LLM created: {llm_response}", flush=True)
+        logger.debug("Retell LLM created: %s", llm_response)
         retell_llm_id = llm_response.get("retell_llm_id") or llm_response.get("llm_id") or llm_response.get("id")
     except HTTPException as e:
-        logging.warning(f"Failed to create Retell LLM: {e.detail}")
-        print(f"[DEBUG] Failed to create Retell LLM: {e.detail}", flush=True)
+        logger.warning("Failed to create Retell LLM: %s", e.detail)
         # Try v2 endpoint
         try:
             llm_response = await retell_post_json("/v2/create-retell-llm", retell_llm_body)
-            logging.info(f"Retell LLM created (v2): {llm_response}")
-            print(f"[DEBUG] Retell LLM created (v2): {llm_response}", flush=True)
+            logger.debug("Retell LLM created (v2): %s", llm_response)
             retell_llm_id = llm_response.get("retell_llm_id") or llm_response.get("llm_id") or llm_response.get("id")
         except Exception as ex:
-            logging.error(f"Both Retell LLM endpoints failed: {ex}")
-            print(f"[DEBUG] Both Retell LLM endpoints failed: {ex}", flush=True)
+            logger.error("Both Retell LLM endpoints failed: %s", ex)
             raise HTTPException(status_code=500, detail=f"Failed to create Retell LLM: {ex}")
     
     if not retell_llm_id:
@@ -128,31 +107,26 @@ async def create_retell_agent(
     if webhook_url:
         agent_body["webhook_url"] = webhook_url
     
-    logging.info(f"Creating Retell Agent with body: {agent_body}")
-    print(f"[DEBUG] Creating Retell Agent with body: {agent_body}", flush=True)
+    logger.debug("Creating Retell Agent with body: %s", agent_body)
     
     try:
         # Create Agent (this is the correct endpoint according to docs)
         agent_response = await retell_post_json("/create-agent", agent_body)
-        logging.info(f"Retell Agent created: {agent_response}")
-        print(f"[DEBUG] Retell Agent created: {agent_response}", flush=True)
+        logger.debug("Retell Agent created: %s", agent_response)
         
         # Verify we got agent_id
         agent_id = agent_response.get("agent_id")
         if not agent_id:
-            logging.error(f"No agent_id in response! Response: {agent_response}")
-            print(f"[DEBUG] ERROR: No agent_id in response! Response: {agent_response}", flush=True)
+            logger.error("No agent_id in response! Response: %s", agent_response)
             # Return response anyway, let caller handle it
         else:
-            logging.info(f"Agent ID extracted: {agent_id}")
-            print(f"[DEBUG] Agent ID extracted: {agent_id}", flush=True)
+            logger.info("Retell agent created: %s", agent_id)
         
         # Return agent_id, not retell_llm_id
         # The agent_id is what we need to save for making calls
         return agent_response
     except HTTPException as e:
-        logging.error(f"Failed to create Retell Agent: {e.detail}")
-        print(f"[DEBUG] Failed to create Retell Agent: {e.detail}", flush=True)
+        logger.error("Failed to create Retell Agent: %s", e.detail)
         raise e
 
 
@@ -0,0 +1,381 @@
+"""Incremental call sync: Retell /v2/list-calls → calls table
+
+Recovers call state that webhooks missed. Each Retell account (the global key,
+or a tenant's BYO key) keeps a high-water mark in call_sync_state; a run pages
+list-calls in ascending start_timestamp order from that mark (minus an overlap
+window) and upserts each page with a single INSERT ... ON CONFLICT on
+provider_call_id. The mark is persisted together with each page, so an
+interrupted run resumes where it stopped. The mark never passes a call that is
+still running, unless that call started more than RETELL_SYNC_OPEN_MAX_AGE_S ago:
+a call stuck in registered/ongoing would otherwise pin every run to the same
+RETELL_SYNC_MAX_PAGES pages forever.
+"""
+import os
+import json
+import asyncio
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, Optional, List
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from config.database import engine
+from models.agents import PhoneNumber
+from models.calls import CallRecord, CallSyncState
+from models.compliance import BudgetReservation, CostEvent
+from services.spend_ledger import settle_reservation
+from utils.retell import (
+    get_retell_api_key,
+    init_retell_credentials,
+    retell_iter_call_pages,
+)
+
+logger = logging.getLogger(__name__)
+
+
+RETELL_SYNC_PAGE_SIZE = int(os.getenv("RETELL_SYNC_PAGE_SIZE", "200"))
+RETELL_SYNC_MAX_PAGES = int(os.getenv("RETELL_SYNC_MAX_PAGES", "50"))
+RETELL_SYNC_OVERLAP_S = int(os.getenv("RETELL_SYNC_OVERLAP_S", "3600"))
+RETELL_SYNC_INITIAL_LOOKBACK_DAYS = int(os.getenv("RETELL_SYNC_INITIAL_LOOKBACK_DAYS", "7"))
+RETELL_SYNC_CONCURRENCY = int(os.getenv("RETELL_SYNC_CONCURRENCY", "4"))
+# Calls still registered/ongoing after this long don't hold the mark back (stuck in Retell)
+RETELL_SYNC_OPEN_MAX_AGE_S = int(os.getenv("RETELL_SYNC_OPEN_MAX_AGE_S", "21600"))
+
+GLOBAL_ACCOUNT = 0  # call_sync_state.tenant_id for the shared RETELL_API_KEY account
+
+# Retell call_status -> CallRecord.status (same vocabulary the webhook handler writes)
+_STATUS_MAP = {
+    "registered": "created",
+    "ongoing": "in_progress",
+    "ended": "ended",
+    "error": "failed",
+}
+
+
+def retell_account_for_tenant(tenant_id: Optional[int]) -> int:
+    """Sync scope for a tenant: its own id if it has a BYO Retell key, else the global account"""
+    if tenant_id is None:
+        return GLOBAL_ACCOUNT
+    try:
+        if get_retell_api_key(tenant_id) != os.getenv("RETELL_API_KEY"):
+            return int(tenant_id)
+    except Exception:
+        pass
+    return GLOBAL_ACCOUNT
+
+
+def list_retell_accounts() -> List[int]:
+    """All sync scopes: the global account (if configured) plus every BYO tenant"""
+    accounts: List[int] = [GLOBAL_ACCOUNT] if os.getenv("RETELL_API_KEY") else []
+    caps = init_retell_credentials()
+    with Session(engine) as session:
+        tenant_ids = set()
+        if caps.get("tenants_retell_api_key"):
+            rows = session.execute(text("SELECT id FROM tenants WHERE retell_api_key IS NOT NULL"))
+            tenant_ids.update(int(r[0]) for r in rows)
+        if caps.get("workspace_retell_api_key"):
+            rows = session.execute(
+                text("SELECT tenant_id FROM workspace_settings WHERE retell_api_key_encrypted IS NOT NULL")
+            )
+            tenant_ids.update(int(r[0]) for r in rows)
+    accounts.extend(sorted(t for t in tenant_ids if t != GLOBAL_ACCOUNT))
+    return accounts
+
+
+def _number_tenant_map(session: Session) -> Dict[str, int]:
+    """e164 -> tenant_id for attributing calls made on the shared account"""
+    rows = session.execute(
+        select(PhoneNumber.e164, PhoneNumber.tenant_id).where(PhoneNumber.tenant_id.isnot(None))
+    )
+    return {e164: int(tid) for e164, tid in rows if e164}
+
+
+def _call_timestamp_ms(call: Dict[str, Any]) -> Optional[int]:
+    ts = call.get("start_timestamp") or call.get("created_at")
+    try:
+        return int(ts) if ts is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _call_to_row(
+    call: Dict[str, Any],
+    account: int,
+    numbers: Dict[str, int],
+    now: datetime,
+) -> Optional[Dict[str, Any]]:
+    """Map a Retell v2 call object to a calls row (None if it has no call_id)"""
+    provider_call_id = str(call.get("call_id") or call.get("id") or "")
+    if not provider_call_id:
+        return None
+
+    direction = str(call.get("direction") or "outbound")
+    from_number = call.get("from_number")
+    to_number = call.get("to_number")
+
+    if account != GLOBAL_ACCOUNT:
+        tenant_id: Optional[int] = account
+    else:
+        # Same precedence as the webhook handler: our number first, metadata only as a hint
+        own_number = to_number if direction == "inbound" else from_number
+        tenant_id = numbers.get(own_number or "") or numbers.get(to_number or "") or numbers.get(from_number or "")
+        if tenant_id is None:
+            hint = (call.get("metadata") or {}).get("tenant_id")
+            try:
+                tenant_id = int(hint) if hint is not None else None
+            except (TypeError, ValueError):
+                tenant_id = None
+
+    call_status = str(call.get("call_status") or call.get("status") or "")
+    status = _STATUS_MAP.get(call_status, call_status or "created")
+
+    duration_seconds: Optional[int] = None
+    if call.get("duration_ms") is not None:
+        duration_seconds = int(round(float(call["duration_ms"]) / 1000))
+    elif call.get("start_timestamp") and call.get("end_timestamp"):
+        duration_seconds = int(round((int(call["end_timestamp"]) - int(call["start_timestamp"])) / 1000))
+
+    # Retell reports call_cost.combined_cost in cents
+    call_cost_cents: Optional[int] = None
+    combined_cost = (call.get("call_cost") or {}).get("combined_cost")
+    if combined_cost is not None:
+        call_cost_cents = int(round(float(combined_cost)))
+
+    outcome: Optional[str] = None
+    if status == "ended":
+        analysis = call.get("call_analysis") or {}
+        outcome = (
+            (analysis.get("custom_analysis_data") or {}).get("outcome")
+            or call.get("disconnection_reason")
+            or "unknown"
+        )
+
+    return {
+        "provider_call_id": provider_call_id,
+        "tenant_id": tenant_id,
+        "created_at": now,
+        "updated_at": now,
+        "direction": direction[:16],
+        "provider": "retell",
+        "to_number": to_number,
+        "from_number": from_number,
+        "status": status[:32],
+        "raw_response": json.dumps(call),
+        "audio_url": call.get("recording_url"),
+        "duration_seconds": duration_seconds,
+        "call_cost_cents": call_cost_cents,
+        "disposition_outcome": outcome,
+        "disposition_updated_at": now if outcome else None,
+    }
+
+
+def _upsert_stmt(rows: List[Dict[str, Any]]):
+    """INSERT ... ON CONFLICT (provider_call_id) DO UPDATE for the current dialect"""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    table = CallRecord.__table__
+    stmt = insert(table).values(rows)
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.provider_call_id],
+        index_where=table.c.provider_call_id.isnot(None),
+        set_={
+            # Retell is authoritative for lifecycle, billing and raw payload
+            "status": excluded.status,
+            "raw_response": excluded.raw_response,
+            "updated_at": excluded.updated_at,
+            "duration_seconds": func.coalesce(excluded.duration_seconds, table.c.duration_seconds),
+            "call_cost_cents": func.coalesce(excluded.call_cost_cents, table.c.call_cost_cents),
+            # Local data wins: tenant attribution, user-set dispositions, mirrored recordings
+            "tenant_id": func.coalesce(table.c.tenant_id, excluded.tenant_id),
+            "disposition_outcome": func.coalesce(table.c.disposition_outcome, excluded.disposition_outcome),
+            "disposition_updated_at": func.coalesce(table.c.disposition_updated_at, excluded.disposition_updated_at),
+            "audio_url": func.coalesce(table.c.audio_url, excluded.audio_url),
+            "to_number": func.coalesce(table.c.to_number, excluded.to_number),
+            "from_number": func.coalesce(table.c.from_number, excluded.from_number),
+        },
+    )
+
+
+def upsert_retell_calls(
+    session: Session,
+    calls: List[Dict[str, Any]],
+    account: int = GLOBAL_ACCOUNT,
+    numbers: Optional[Dict[str, int]] = None,
+) -> int:
+    """Bulk upsert Retell call objects into calls (caller commits)
+
+    Args:
+        session: Database session
+        calls: Retell v2 call objects (one list-calls page)
+        account: Sync scope (tenant id for BYO accounts, GLOBAL_ACCOUNT otherwise)
+        numbers: e164 -> tenant_id map used to attribute global-account calls
+
+    Returns:
+        Number of rows inserted or updated
+    """
+    now = datetime.now(timezone.utc)
+    rows: Dict[str, Dict[str, Any]] = {}
+    for call in calls:
+        row = _call_to_row(call, account, numbers or {}, now)
+        if row is not None:
+            rows[row["provider_call_id"]] = row  # ON CONFLICT can't touch the same row twice per statement
+    if not rows:
+        return 0
+    session.execute(_upsert_stmt(list(rows.values())))
+    _settle_finished_calls(session, rows)
+    return len(rows)
+
+
+def _settle_finished_calls(session: Session, rows: Dict[str, Dict[str, Any]]) -> None:
+    """Cost finished calls the webhook didn't (settling their reservation if they have one)"""
+    finished = {
+        cid: row for cid, row in rows.items()
+        if row["status"] in ("ended", "failed") and row.get("call_cost_cents") is not None
+    }
+    if not finished:
+        return
+    ids = list(finished)
+    # Skip (in bulk) calls whose cost is already recorded; settle_reservation re-checks under a lock
+    costed = set(session.execute(
+        select(CallRecord.provider_call_id)
+        .join(CostEvent, CostEvent.call_id == CallRecord.id)
+        .where(CallRecord.provider_call_id.in_(ids), CostEvent.component == "call")
+    ).scalars())
+    costed |= set(session.execute(
+        select(BudgetReservation.provider_call_id).where(
+            BudgetReservation.provider_call_id.in_(ids),
+            BudgetReservation.status == "settled",
+            BudgetReservation.actual_cents > 0,
+        )
+    ).scalars())
+    for provider_call_id, row in finished.items():
+        if provider_call_id not in costed:
+            settle_reservation(session, provider_call_id, row["call_cost_cents"])
+
+
+def _store_page(account: int, calls: List[Dict[str, Any]], numbers: Dict[str, int], high_water_ms: int) -> int:
+    """Upsert one list-calls page and advance the account's mark in one transaction"""
+    with Session(engine) as session:
+        synced = upsert_retell_calls(session, calls, account, numbers)
+        state = session.get(CallSyncState, account)
+        state.high_water_ms = high_water_ms
+        state.updated_at = datetime.now(timezone.utc)
+        session.commit()
+    return synced
+
+
+async def sync_retell_calls(
+    account: int = GLOBAL_ACCOUNT,
+    page_size: Optional[int] = None,
+    max_pages: Optional[int] = None,
+    since_ms: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Incrementally sync one Retell account's calls into the calls table
+
+    Args:
+        account: Sync scope (tenant id with BYO key, or GLOBAL_ACCOUNT)
+        page_size: list-calls page size (default RETELL_SYNC_PAGE_SIZE, max 1000)
+        max_pages: Stop after this many pages; the next run resumes from the mark
+        since_ms: Override the stored high-water mark (e.g. full re-sync)
+
+    Returns:
+        Dict with account, pages, calls synced, high_water_ms and whether more pages remain
+    """
+    page_size = max(1, min(int(page_size or RETELL_SYNC_PAGE_SIZE), 1000))
+    max_pages = max(1, int(max_pages or RETELL_SYNC_MAX_PAGES))
+    tenant_for_key = None if account == GLOBAL_ACCOUNT else account
+
+    with Session(engine) as session:
+        state = session.get(CallSyncState, account)
+        if state is None:
+            state = CallSyncState(tenant_id=account, last_run_calls=0)
+            session.add(state)
+            session.commit()
+        numbers = _number_tenant_map(session) if account == GLOBAL_ACCOUNT else {}
+        mark = since_ms if since_ms is not None else state.high_water_ms
+
+    if mark is None:
+        start = datetime.now(timezone.utc) - timedelta(days=RETELL_SYNC_INITIAL_LOOKBACK_DAYS)
+        lower_ms = int(start.timestamp() * 1000)
+    else:
+        # Re-read the overlap window so calls that were still running get their final state
+        lower_ms = max(0, int(mark) - RETELL_SYNC_OVERLAP_S * 1000)
+    start_mark = int(mark) if mark is not None else lower_ms
+    high_water = start_mark
+    max_seen = start_mark
+    min_open: Optional[int] = None
+    stuck_before_ms = int((datetime.now(timezone.utc).timestamp() - RETELL_SYNC_OPEN_MAX_AGE_S) * 1000)
+
+    pages = 0
+    synced = 0
+    has_more = False
+    error: Optional[str] = None
+    call_pages = retell_iter_call_pages(
+        filter_criteria={"start_timestamp": {"lower_threshold": lower_ms}},
+        sort_order="ascending",
+        page_size=page_size,
+        tenant_id=tenant_for_key,
+        max_pages=max_pages,
+    )
+    try:
+        async for items in call_pages:
+            pages += 1
+
+            # Advance the mark, but not past a call that hasn't ended yet (unless it's stuck)
+            for c in items:
+                ts = _call_timestamp_ms(c)
+                if ts is None:
+                    continue
+                max_seen = max(max_seen, ts)
+                if (c.get("call_status") or c.get("status")) in ("registered", "ongoing") and ts >= stuck_before_ms:
+                    min_open = ts if min_open is None else min(min_open, ts)
+            high_water = max(start_mark, max_seen if min_open is None else min(max_seen, min_open))
+
+            # Off the event loop, so the prefetch of the next page overlaps the upsert
+            synced += await asyncio.to_thread(_store_page, account, items, numbers, high_water)
+
+            has_more = pages >= max_pages and len(items) >= page_size
+    except Exception as e:
+        error = str(e)[:1000]
+        logger.error("[call_sync] account=%s failed after %s pages: %s", account, pages, e)
+        raise
+    finally:
+        await call_pages.aclose()
+        with Session(engine) as session:
+            state = session.get(CallSyncState, account)
+            state.last_error = error
+            state.last_synced_at = datetime.now(timezone.utc)
+            state.last_run_calls = synced
+            session.commit()
+
+    logger.info("[call_sync] account=%s pages=%s calls=%s high_water_ms=%s", account, pages, synced, high_water)
+    return {
+        "account": account,
+        "pages": pages,
+        "calls": synced,
+        "high_water_ms": high_water,
+        "has_more": has_more,
+    }
+
+
+async def sync_all_retell_calls(concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Sync every Retell account, at most `concurrency` accounts at a time
+
+    Returns:
+        One result per account (failures are reported with an "error" key)
+    """
+    semaphore = asyncio.Semaphore(max(1, int(concurrency or RETELL_SYNC_CONCURRENCY)))
+
+    async def _run(account: int) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await sync_retell_calls(account)
+            except Exception as e:
+                return {"account": account, "error": str(e)}
+
+    return list(await asyncio.gather(*(_run(a) for a in list_retell_accounts())))
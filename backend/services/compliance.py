@@ -1,29 +1,76 @@
 """Country compliance rules service"""
 import json
 import os
+import hashlib
+import logging
+import time
+import threading
 from pathlib import Path
-from typing import Optional, Dict, Any
-from sqlalchemy.orm import Session
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping, NamedTuple, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
 
 from config.database import engine
 from models.compliance import CountryRule
 from utils.helpers import country_iso_from_e164
+from utils.numbering_plan import default_timezone_for_country
+from utils.redis_client import get_redis
+from services.compliance_pack import CompliancePack, open_compliance_pack, sources_hash
 
+logger = logging.getLogger(__name__)
 
-# Path to compliance JSON file
+
+# Compliance knowledge sources
 BACKEND_DIR = Path(__file__).resolve().parent.parent
-COMPLIANCE_JSON_PATH = BACKEND_DIR.parent / "knowledge" / "general" / "data" / "compliance.v2.json"
+KNOWLEDGE_DATA_DIR = BACKEND_DIR.parent / "knowledge" / "general" / "data"
+COMPLIANCE_JSON_PATH = KNOWLEDGE_DATA_DIR / "compliance.v2.json"
+RULES_V1_JSON_PATH = KNOWLEDGE_DATA_DIR / "rules.v1.json"
+COMPLIANCE_CSV_PATH = KNOWLEDGE_DATA_DIR / "compliance_global.csv"
+COMPLIANCE_SOURCE_PATHS = (COMPLIANCE_JSON_PATH, RULES_V1_JSON_PATH, COMPLIANCE_CSV_PATH)
+
+# Precompiled knowledge pack (scripts/build_compliance_pack.py), memory-mapped at startup.
+# Without it (or when it is older than the sources) rules are compiled from compliance.v2.json.
+COMPLIANCE_PACK_PATH = Path(os.getenv("COMPLIANCE_PACK_PATH") or KNOWLEDGE_DATA_DIR / "compliance_pack.v1.bin")
+COMPLIANCE_PACK_ENABLED = os.getenv("COMPLIANCE_PACK_ENABLED", "1") == "1"
 
 # Cache for loaded JSON data
 _COMPLIANCE_CACHE: Optional[Dict[str, Any]] = None
+_COMPLIANCE_PACK: Optional[CompliancePack] = None
+_COMPLIANCE_PACK_CHECKED = False
+_JSON_RULES: Optional[Dict[str, Mapping[str, Any]]] = None
+
+
+def _load_compliance_pack() -> Optional[CompliancePack]:
+    """Map the knowledge pack once per process; None if missing, unreadable or stale"""
+    global _COMPLIANCE_PACK, _COMPLIANCE_PACK_CHECKED
+    if _COMPLIANCE_PACK_CHECKED:
+        return _COMPLIANCE_PACK
+    _COMPLIANCE_PACK_CHECKED = True
+    if not COMPLIANCE_PACK_ENABLED or not COMPLIANCE_PACK_PATH.exists():
+        return None
+    pack = open_compliance_pack(COMPLIANCE_PACK_PATH)
+    if pack is not None and COMPLIANCE_JSON_PATH.exists() and pack.source_hash != sources_hash(COMPLIANCE_SOURCE_PATHS):
+        logger.warning(
+            "[compliance] %s is older than the knowledge sources; run scripts/build_compliance_pack.py",
+            COMPLIANCE_PACK_PATH,
+        )
+        pack = None
+    _COMPLIANCE_PACK = pack
+    return pack
 
 
 def _load_compliance_json() -> Dict[str, Any]:
-    """Load compliance rules from JSON file"""
+    """Load compliance rules from JSON file (merged records from the knowledge pack when available)"""
     global _COMPLIANCE_CACHE
     if _COMPLIANCE_CACHE is not None:
         return _COMPLIANCE_CACHE
     
+    pack = _load_compliance_pack()
+    if pack is not None:
+        _COMPLIANCE_CACHE = {iso: pack.source(iso) for iso in pack.isos()}
+        return _COMPLIANCE_CACHE
+    
     try:
         if COMPLIANCE_JSON_PATH.exists():
             with open(COMPLIANCE_JSON_PATH, "r", encoding="utf-8") as f:
@@ -84,8 +131,8 @@ def _json_to_country_rule(country_iso: str, data: Dict[str, Any]) -> Dict[str, A
     recording = data.get("recording", {})
     recording_basis = recording.get("basis", "consent")
     
-    # Determine timezone (default to UTC, can be improved)
-    timezone = "UTC"  # TODO: Map country to timezone
+    # Country main zone (leads carry their own, refined by area code)
+    timezone = default_timezone_for_country(country_iso) or "UTC"
     
     # Store full metadata
     metadata = {
@@ -118,77 +165,31 @@ def _json_to_country_rule(country_iso: str, data: Dict[str, Any]) -> Dict[str, A
     }
 
 
-def get_country_rule(tenant_id: Optional[int], country_iso: str, session: Optional[Session] = None) -> Optional[Dict[str, Any]]:
-    """
-    Get country rule for tenant and country.
-    Priority: 1) Tenant override, 2) Global from DB, 3) JSON defaults
-    
-    Returns: Dict with CountryRule fields or None
-    """
-    country_iso = country_iso.upper()
-    
-    # 1. Check tenant override in DB
-    if session is not None:
-        rule = (
-            session.query(CountryRule)
-            .filter(CountryRule.tenant_id == tenant_id, CountryRule.country_iso == country_iso)
-            .first()
-        )
-        if rule:
-            return {
-                "country_iso": rule.country_iso,
-                "regime_b2b": rule.regime_b2b,
-                "regime_b2c": rule.regime_b2c,
-                "dnc_registry_enabled": bool(rule.dnc_registry_enabled),
-                "dnc_registry_name": rule.dnc_registry_name,
-                "dnc_registry_url": rule.dnc_registry_url,
-                "dnc_check_required": bool(rule.dnc_check_required),
-                "dnc_api_available": bool(rule.dnc_api_available),
-                "quiet_hours_enabled": bool(rule.quiet_hours_enabled),
-                "quiet_hours_weekdays": rule.quiet_hours_weekdays,
-                "quiet_hours_saturday": rule.quiet_hours_saturday,
-                "quiet_hours_sunday": rule.quiet_hours_sunday,
-                "timezone": rule.timezone or "UTC",
-                "ai_disclosure_required": bool(rule.ai_disclosure_required),
-                "ai_disclosure_note": rule.ai_disclosure_note,
-                "recording_basis": rule.recording_basis or "consent",
-                "metadata_json": rule.metadata_json,
-            }
-    
-    # 2. Check global (tenant_id=NULL) in DB
-    if session is not None:
-        rule = (
-            session.query(CountryRule)
-            .filter(CountryRule.tenant_id.is_(None), CountryRule.country_iso == country_iso)
-            .first()
-        )
-        if rule:
-            return {
-                "country_iso": rule.country_iso,
-                "regime_b2b": rule.regime_b2b,
-                "regime_b2c": rule.regime_b2c,
-                "dnc_registry_enabled": bool(rule.dnc_registry_enabled),
-                "dnc_registry_name": rule.dnc_registry_name,
-                "dnc_registry_url": rule.dnc_registry_url,
-                "dnc_check_required": bool(rule.dnc_check_required),
-                "dnc_api_available": bool(rule.dnc_api_available),
-                "quiet_hours_enabled": bool(rule.quiet_hours_enabled),
-                "quiet_hours_weekdays": rule.quiet_hours_weekdays,
-                "quiet_hours_saturday": rule.quiet_hours_saturday,
-                "quiet_hours_sunday": rule.quiet_hours_sunday,
-                "timezone": rule.timezone or "UTC",
-                "ai_disclosure_required": bool(rule.ai_disclosure_required),
-                "ai_disclosure_note": rule.ai_disclosure_note,
-                "recording_basis": rule.recording_basis or "consent",
-                "metadata_json": rule.metadata_json,
-            }
-    
-    # 3. Fallback to JSON defaults
-    json_data = _load_compliance_json()
-    if country_iso in json_data:
-        return _json_to_country_rule(country_iso, json_data[country_iso])
-    
-    # 4. Default permissive rule if nothing found
+def _db_rule_to_dict(rule: CountryRule) -> Dict[str, Any]:
+    """Convert a CountryRule row to the rule dict shape"""
+    return {
+        "country_iso": rule.country_iso,
+        "regime_b2b": rule.regime_b2b,
+        "regime_b2c": rule.regime_b2c,
+        "dnc_registry_enabled": bool(rule.dnc_registry_enabled),
+        "dnc_registry_name": rule.dnc_registry_name,
+        "dnc_registry_url": rule.dnc_registry_url,
+        "dnc_check_required": bool(rule.dnc_check_required),
+        "dnc_api_available": bool(rule.dnc_api_available),
+        "quiet_hours_enabled": bool(rule.quiet_hours_enabled),
+        "quiet_hours_weekdays": rule.quiet_hours_weekdays,
+        "quiet_hours_saturday": rule.quiet_hours_saturday,
+        "quiet_hours_sunday": rule.quiet_hours_sunday,
+        "timezone": rule.timezone or "UTC",
+        "ai_disclosure_required": bool(rule.ai_disclosure_required),
+        "ai_disclosure_note": rule.ai_disclosure_note,
+        "recording_basis": rule.recording_basis or "consent",
+        "metadata_json": rule.metadata_json,
+    }
+
+
+def _default_rule(country_iso: str) -> Dict[str, Any]:
+    """Permissive rule for countries with no DB or JSON entry"""
     return {
         "country_iso": country_iso,
         "regime_b2b": "opt_out",
@@ -210,7 +211,219 @@ def get_country_rule(tenant_id: Optional[int], country_iso: str, session: Option
     }
 
 
-def get_country_rule_for_number(tenant_id: Optional[int], to_number: str, session: Optional[Session] = None) -> Optional[Dict[str, Any]]:
+# Compiled rule index
+# All CountryRule rows plus the JSON defaults are compiled once into read-only mappings
+# keyed by (tenant_id, ISO) so compliance checks never query the DB for rules. The index
+# is rebuilt when the rules version changes (invalidate_country_rules, shared via Redis
+# when available) and every COMPLIANCE_RULES_RELOAD_S as a safety net for direct DB edits.
+COMPLIANCE_RULES_CHECK_S = float(os.getenv("COMPLIANCE_RULES_CHECK_S", "5"))
+COMPLIANCE_RULES_RELOAD_S = float(os.getenv("COMPLIANCE_RULES_RELOAD_S", "300"))
+_RULES_VERSION_KEY = "compliance:rules:version"
+
+
+class _RuleIndex(NamedTuple):
+    version: str
+    loaded_at: float
+    db_rules: Dict[Tuple[Optional[int], str], Mapping[str, Any]]
+    json_rules: Dict[str, Mapping[str, Any]]
+    resolved: Dict[Optional[int], Tuple[Dict[str, Mapping[str, Any]], str]]  # per-tenant views, filled lazily
+
+
+_RULE_INDEX: Optional[_RuleIndex] = None
+_RULE_INDEX_LOCK = threading.Lock()
+_RULES_LOCAL_VERSION = 0
+_RULES_LAST_CHECK = 0.0
+
+
+def _rules_version() -> str:
+    """Current rules version (Redis counter shared by all processes, plus local bumps)"""
+    shared = "0"
+    r = get_redis()
+    if r is not None:
+        try:
+            shared = str(r.get(_RULES_VERSION_KEY) or "0")
+        except Exception:
+            pass
+    return f"{shared}.{_RULES_LOCAL_VERSION}"
+
+
+def _compiled_json_rules() -> Dict[str, Mapping[str, Any]]:
+    """Default rule per ISO from the knowledge pack (or compiled from JSON); built once per process"""
+    global _JSON_RULES
+    if _JSON_RULES is not None:
+        return _JSON_RULES
+    pack = _load_compliance_pack()
+    if pack is not None:
+        rules = {}
+        for iso in pack.isos():
+            rule = pack.rule(iso)
+            rule["timezone"] = default_timezone_for_country(iso) or "UTC"
+            rules[iso] = MappingProxyType(rule)
+    else:
+        rules = {
+            iso.upper(): MappingProxyType(_json_to_country_rule(iso, data))
+            for iso, data in _load_compliance_json().items()
+        }
+    _JSON_RULES = rules
+    return rules
+
+
+def _build_rule_index(version: str) -> _RuleIndex:
+    json_rules = _compiled_json_rules()
+    db_rules: Dict[Tuple[Optional[int], str], Mapping[str, Any]] = {}
+    with Session(engine) as session:
+        # Newest first, so on duplicate (tenant, ISO) rows the oldest one wins
+        for rule in session.query(CountryRule).order_by(CountryRule.id.desc()).all():
+            db_rules[(rule.tenant_id, rule.country_iso.upper())] = MappingProxyType(_db_rule_to_dict(rule))
+    return _RuleIndex(version, time.monotonic(), db_rules, json_rules, {})
+
+
+def load_country_rule_index(force: bool = False) -> None:
+    """(Re)build the rule index (called at startup; later refreshes happen on demand)"""
+    global _RULE_INDEX, _RULES_LAST_CHECK
+    with _RULE_INDEX_LOCK:
+        if _RULE_INDEX is not None and not force:
+            return
+        version = _rules_version()
+        try:
+            _RULE_INDEX = _build_rule_index(version)
+        except Exception:
+            # DB unavailable: keep the previous index, or start with JSON defaults only
+            if _RULE_INDEX is None:
+                _RULE_INDEX = _RuleIndex("", time.monotonic(), {}, _compiled_json_rules(), {})
+        _RULES_LAST_CHECK = time.monotonic()
+
+
+def _get_rule_index() -> _RuleIndex:
+    global _RULES_LAST_CHECK
+    index = _RULE_INDEX
+    if index is None:
+        load_country_rule_index()
+        return _RULE_INDEX  # type: ignore[return-value]
+    now = time.monotonic()
+    if now - _RULES_LAST_CHECK >= COMPLIANCE_RULES_CHECK_S:
+        _RULES_LAST_CHECK = now
+        if _rules_version() != index.version or now - index.loaded_at >= COMPLIANCE_RULES_RELOAD_S:
+            load_country_rule_index(force=True)
+            return _RULE_INDEX  # type: ignore[return-value]
+    return index
+
+
+def country_rules_version() -> str:
+    """Version of the rule index currently served (changes whenever rules are reloaded after a write)"""
+    return _get_rule_index().version
+
+
+def invalidate_country_rules() -> None:
+    """Signal that CountryRule rows changed; all processes reload
+
+    Called automatically after a commit that wrote CountryRule through the ORM;
+    call it directly after raw SQL or bulk writes.
+    """
+    global _RULES_LOCAL_VERSION
+    _RULES_LOCAL_VERSION += 1
+    r = get_redis()
+    if r is not None:
+        try:
+            r.incr(_RULES_VERSION_KEY)
+        except Exception:
+            pass
+    load_country_rule_index(force=True)
+
+
+# Any ORM write to CountryRule (insert, update, delete through a Session) invalidates the
+# index once the transaction commits. Writes that bypass the ORM unit of work (raw SQL,
+# bulk query.update()/delete()) must call invalidate_country_rules() themselves.
+def _mark_country_rules_changed(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info["country_rules_changed"] = True
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(CountryRule, _event_name, _mark_country_rules_changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop("country_rules_changed", False):
+        invalidate_country_rules()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop("country_rules_changed", None)
+
+
+def get_country_rule(tenant_id: Optional[int], country_iso: str, session: Optional[Session] = None) -> Optional[Mapping[str, Any]]:
+    """
+    Get country rule for tenant and country.
+    Priority: 1) Tenant override, 2) Global from DB, 3) JSON defaults
+    
+    Served from the in-memory rule index (no DB queries); `session` is accepted for
+    backward compatibility and ignored.
+    
+    Returns: Read-only mapping with CountryRule fields (use dict(rule) for a mutable copy)
+    """
+    country_iso = country_iso.upper()
+    index = _get_rule_index()
+    
+    # 1. Tenant override
+    if tenant_id is not None:
+        rule = index.db_rules.get((tenant_id, country_iso))
+        if rule is not None:
+            return rule
+    
+    # 2. Global (tenant_id=NULL) in DB
+    rule = index.db_rules.get((None, country_iso))
+    if rule is not None:
+        return rule
+    
+    # 3. Fallback to JSON defaults
+    rule = index.json_rules.get(country_iso)
+    if rule is not None:
+        return rule
+    
+    # 4. Default permissive rule if nothing found
+    return MappingProxyType(_default_rule(country_iso))
+
+
+def _resolved_rules(tenant_id: Optional[int]) -> Tuple[Dict[str, Mapping[str, Any]], str]:
+    index = _get_rule_index()
+    cached = index.resolved.get(tenant_id)
+    if cached is not None:
+        return cached
+    rules: Dict[str, Mapping[str, Any]] = dict(index.json_rules)
+    # Same priority as get_country_rule: global DB rows over JSON, tenant rows over both
+    for (rule_tenant, iso), rule in index.db_rules.items():
+        if rule_tenant is None and (tenant_id is None or (tenant_id, iso) not in index.db_rules):
+            rules[iso] = rule
+        elif rule_tenant is not None and rule_tenant == tenant_id:
+            rules[iso] = rule
+    rules = dict(sorted(rules.items()))
+    payload = json.dumps([dict(r) for r in rules.values()], sort_keys=True, default=str)
+    etag = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+    index.resolved[tenant_id] = (rules, etag)
+    return rules, etag
+
+
+def resolve_country_rules(tenant_id: Optional[int]) -> Dict[str, Mapping[str, Any]]:
+    """
+    Effective rule of every known country for a tenant (same priority as get_country_rule).
+    
+    Built from the in-memory rule index (no DB queries) and cached until the index reloads.
+    
+    Returns: ISO code -> read-only rule mapping, sorted by ISO code
+    """
+    return _resolved_rules(tenant_id)[0]
+
+
+def country_rules_etag(tenant_id: Optional[int]) -> str:
+    """Content hash of resolve_country_rules(tenant_id), for HTTP caching"""
+    return _resolved_rules(tenant_id)[1]
+
+
+def get_country_rule_for_number(tenant_id: Optional[int], to_number: str, session: Optional[Session] = None) -> Optional[Mapping[str, Any]]:
     """Get country rule for a phone number"""
     country_iso = country_iso_from_e164(to_number)
     if not country_iso:
@@ -0,0 +1,193 @@
+"""Precompiled compliance knowledge pack (knowledge/general/data/compliance_pack.v1.bin)
+
+scripts/build_compliance_pack.py merges compliance.v2.json, rules.v1.json and
+compliance_global.csv and compiles every country into the rule fields served by
+services.compliance. The result is a small binary file that is memory-mapped at
+startup, so no JSON is parsed on the request path and all worker processes share
+the same pages.
+
+Layout (little endian):
+    header   magic "AGCP", format version (H), record count (I), table offset (I),
+             pool offset (I), pool size (I), sha256 of the source files (32s)
+    table    one record per country: ISO alpha-2 (2s), flags (H), then an
+             (offset, length) pair (II) into the string pool for every string field
+    pool     UTF-8 strings, deduplicated; offset 0xFFFFFFFF means None
+"""
+import json
+import mmap
+import struct
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+PACK_MAGIC = b"AGCP"
+PACK_FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sHIIII32s")
+_NULL = 0xFFFFFFFF
+
+# Compiled rule fields (see services.compliance._json_to_country_rule); timezone is resolved at runtime
+FLAG_FIELDS = (
+    "dnc_registry_enabled",
+    "dnc_check_required",
+    "dnc_api_available",
+    "quiet_hours_enabled",
+    "ai_disclosure_required",
+)
+STRING_FIELDS = (
+    "regime_b2b",
+    "regime_b2c",
+    "dnc_registry_name",
+    "dnc_registry_url",
+    "quiet_hours_weekdays",
+    "quiet_hours_saturday",
+    "quiet_hours_sunday",
+    "ai_disclosure_note",
+    "recording_basis",
+    "metadata_json",
+    "source_json",  # merged source record, for callers that need the raw knowledge
+)
+_RECORD = struct.Struct("<2sH" + "II" * len(STRING_FIELDS))
+
+
+class CompliancePackError(Exception):
+    """Pack file missing, truncated or of an unknown format"""
+
+
+def sources_hash(paths: Iterable[Path]) -> bytes:
+    """sha256 over the contents of the source files (missing files hash as empty)"""
+    digest = hashlib.sha256()
+    for path in paths:
+        path = Path(path)
+        digest.update(path.name.encode("utf-8"))
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.digest()
+
+
+def write_compliance_pack(path: Path, records: Iterable[Dict[str, Any]], source_hash: bytes) -> int:
+    """Serialize compiled country records into a pack file
+
+    Args:
+        path: Output file
+        records: Dicts with country_iso, FLAG_FIELDS and STRING_FIELDS
+        source_hash: sha256 digest of the source files (stored for staleness checks)
+
+    Returns:
+        Size of the written file in bytes
+    """
+    pool = bytearray()
+    interned: Dict[str, tuple] = {}
+
+    def _ref(value: Optional[str]) -> tuple:
+        if value is None:
+            return (_NULL, 0)
+        if value not in interned:
+            data = value.encode("utf-8")
+            interned[value] = (len(pool), len(data))
+            pool.extend(data)
+        return interned[value]
+
+    table = bytearray()
+    count = 0
+    for record in sorted(records, key=lambda r: r["country_iso"]):
+        iso = record["country_iso"].upper().encode("ascii")
+        if len(iso) != 2:
+            raise ValueError(f"Not an ISO alpha-2 code: {record['country_iso']!r}")
+        flags = sum(1 << i for i, name in enumerate(FLAG_FIELDS) if record.get(name))
+        refs: List[int] = []
+        for name in STRING_FIELDS:
+            refs.extend(_ref(record.get(name)))
+        table.extend(_RECORD.pack(iso, flags, *refs))
+        count += 1
+
+    table_offset = _HEADER.size
+    pool_offset = table_offset + len(table)
+    header = _HEADER.pack(PACK_MAGIC, PACK_FORMAT_VERSION, count, table_offset, pool_offset, len(pool), source_hash)
+    payload = header + bytes(table) + bytes(pool)
+    Path(path).write_bytes(payload)
+    return len(payload)
+
+
+class CompliancePack:
+    """Read-only, memory-mapped view of a compliance pack"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        try:
+            with open(self.path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise CompliancePackError(f"Cannot map {self.path}: {e}") from e
+        if len(self._mm) < _HEADER.size:
+            raise CompliancePackError(f"{self.path} is truncated")
+        magic, version, count, table_offset, pool_offset, pool_size, source_hash = _HEADER.unpack_from(self._mm, 0)
+        if magic != PACK_MAGIC or version != PACK_FORMAT_VERSION:
+            raise CompliancePackError(f"{self.path} is not a v{PACK_FORMAT_VERSION} compliance pack")
+        if pool_offset + pool_size > len(self._mm) or table_offset + count * _RECORD.size > pool_offset:
+            raise CompliancePackError(f"{self.path} is truncated")
+        self.source_hash = source_hash
+        self._table_offset = table_offset
+        self._pool_offset = pool_offset
+        self._index: Dict[str, int] = {}
+        for i in range(count):
+            iso = self._mm[table_offset + i * _RECORD.size:table_offset + i * _RECORD.size + 2]
+            self._index[iso.decode("ascii")] = i
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, country_iso: str) -> bool:
+        return (country_iso or "").upper() in self._index
+
+    def isos(self) -> List[str]:
+        """ISO codes in the pack (sorted)"""
+        return list(self._index)
+
+    def _string(self, offset: int, length: int) -> Optional[str]:
+        if offset == _NULL:
+            return None
+        start = self._pool_offset + offset
+        return self._mm[start:start + length].decode("utf-8")
+
+    def _fields(self, country_iso: str) -> Optional[tuple]:
+        i = self._index.get((country_iso or "").upper())
+        if i is None:
+            return None
+        return _RECORD.unpack_from(self._mm, self._table_offset + i * _RECORD.size)
+
+    def rule(self, country_iso: str) -> Optional[Dict[str, Any]]:
+        """Compiled rule fields for a country (without timezone), or None"""
+        fields = self._fields(country_iso)
+        if fields is None:
+            return None
+        iso, flags, *refs = fields
+        rule: Dict[str, Any] = {"country_iso": iso.decode("ascii")}
+        for i, name in enumerate(FLAG_FIELDS):
+            rule[name] = 1 if flags & (1 << i) else 0
+        for i, name in enumerate(STRING_FIELDS):
+            if name != "source_json":
+                rule[name] = self._string(refs[2 * i], refs[2 * i + 1])
+        return rule
+
+    def source(self, country_iso: str) -> Optional[Dict[str, Any]]:
+        """Merged source record of a country (parsed on demand), or None"""
+        fields = self._fields(country_iso)
+        if fields is None:
+            return None
+        i = STRING_FIELDS.index("source_json")
+        raw = self._string(fields[2 + 2 * i], fields[3 + 2 * i])
+        return json.loads(raw) if raw else {}
+
+
+def open_compliance_pack(path: Path) -> Optional[CompliancePack]:
+    """Map the pack at path; None (with a warning) if it is missing or unreadable"""
+    try:
+        return CompliancePack(path)
+    except CompliancePackError as e:
+        logger.warning("[compliance_pack] %s; falling back to compliance.v2.json", e)
+        return None
@@ -0,0 +1,224 @@
+"""Bulk DNC import/export in bounded memory
+
+Imports read an uploaded CSV/TXT file line by line (the upload is spooled to a
+temp file first), normalize numbers to E.164, drop numbers already listed for
+the tenant and insert the rest in batches with a single executemany per batch.
+Only one batch is held in memory; duplicates across batches are caught by the
+DB check because earlier batches are already committed. Progress is tracked in
+a job record (in-process, mirrored to Redis when available so any process can
+report it). Exports stream the tenant's entries with keyset pagination.
+
+Env config:
+    DNC_IMPORT_BATCH   Numbers per insert batch (default 5000)
+"""
+import os
+import io
+import csv
+import json
+import uuid
+import logging
+from itertools import chain
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from config.database import engine
+from models.compliance import DNCEntry
+from services.dnc_index import invalidate_dnc_index
+from utils.helpers import normalize_e164
+from utils.redis_client import get_redis
+from utils.tenant import _set_tenant_session
+
+logger = logging.getLogger(__name__)
+
+
+DNC_IMPORT_BATCH = int(os.getenv("DNC_IMPORT_BATCH", "5000"))
+DNC_EXPORT_BATCH = 5000
+
+_JOB_KEY = "dnc:import:job:{}"
+_JOB_TTL_S = 24 * 3600
+_PHONE_COLUMNS = ("e164", "phone", "number", "phone_number", "to", "to_number", "telefono", "numero")
+_JOBS_KEEP = 200
+_JOBS: Dict[str, Dict[str, Any]] = {}
+
+
+def _save_job(job: Dict[str, Any]) -> None:
+    _JOBS[job["id"]] = job
+    while len(_JOBS) > _JOBS_KEEP:
+        _JOBS.pop(next(iter(_JOBS)))
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        r.setex(_JOB_KEY.format(job["id"]), _JOB_TTL_S, json.dumps(job))
+    except Exception:
+        pass
+
+
+def create_import_job(tenant_id: Optional[int], filename: Optional[str], source: str) -> Dict[str, Any]:
+    """Register a pending import job and return it"""
+    job = {
+        "id": uuid.uuid4().hex,
+        "tenant_id": tenant_id,
+        "filename": filename,
+        "source": source,
+        "status": "pending",
+        "rows": 0,
+        "inserted": 0,
+        "duplicates": 0,
+        "invalid": 0,
+        "error": None,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "finished_at": None,
+    }
+    _save_job(job)
+    return job
+
+
+def get_import_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Current state of an import job (None if unknown or expired)"""
+    r = get_redis()
+    if r is not None:
+        try:
+            raw = r.get(_JOB_KEY.format(job_id))
+            if raw:
+                return json.loads(raw)
+        except Exception:
+            pass
+    job = _JOBS.get(job_id)
+    return dict(job) if job else None
+
+
+def iter_dnc_file(stream: io.TextIOBase) -> Iterator[Tuple[Optional[str], str]]:
+    """Yield (normalized_e164 or None, raw_value) for every data row of a CSV/TXT file
+
+    Plain text files have one number per line. CSV files (',' ';' or tab) use the
+    first column named like a phone column if there is a header, else the first column.
+    """
+    first = stream.readline()
+    if not first:
+        return
+    delimiter = max((",", ";", "\t"), key=first.count) if any(d in first for d in ",;\t") else ","
+    reader = csv.reader(chain([first], stream), delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+    col = 0
+    lowered = [h.strip().lower() for h in header]
+    phone_cols = [i for i, h in enumerate(lowered) if h in _PHONE_COLUMNS]
+    if phone_cols:
+        col = phone_cols[0]
+        rows: Iterator[List[str]] = reader
+    else:
+        rows = chain([header], reader)
+    for row in rows:
+        if col >= len(row):
+            continue
+        raw = row[col].strip()
+        if raw:
+            yield normalize_e164(raw), raw
+
+
+def _existing_numbers(session: Session, tenant_id: Optional[int], numbers: List[str]) -> set:
+    q = select(DNCEntry.e164).where(DNCEntry.e164.in_(numbers))
+    if tenant_id is not None:
+        q = q.where(DNCEntry.tenant_id == tenant_id)
+    else:
+        q = q.where(DNCEntry.tenant_id.is_(None))
+    return set(session.execute(q).scalars())
+
+
+def run_dnc_import(job_id: str, path: str) -> Dict[str, Any]:
+    """Import the numbers in `path` for the job's tenant, updating job progress per batch
+
+    Args:
+        job_id: Job created by create_import_job
+        path: Uploaded file on local disk (removed when done)
+
+    Returns:
+        Final job state
+    """
+    job = get_import_job(job_id) or {}
+    if not job:
+        raise ValueError(f"Unknown DNC import job {job_id}")
+    tenant_id = job.get("tenant_id")
+    job["status"] = "running"
+    _save_job(job)
+
+    def _flush(session: Session, batch: Dict[str, None]) -> None:
+        numbers = list(batch)
+        existing = _existing_numbers(session, tenant_id, numbers)
+        now = datetime.now(timezone.utc)
+        rows = [
+            {"tenant_id": tenant_id, "e164": n, "source": job["source"], "created_at": now}
+            for n in numbers
+            if n not in existing
+        ]
+        if rows:
+            session.execute(insert(DNCEntry), rows)
+        session.commit()
+        job["inserted"] += len(rows)
+        job["duplicates"] += len(numbers) - len(rows)
+        _save_job(job)
+
+    try:
+        with open(path, "r", encoding="utf-8-sig", errors="replace", newline="") as fh, Session(engine) as session:
+            _set_tenant_session(session, tenant_id)
+            batch: Dict[str, None] = {}  # insertion-ordered set
+            for e164, _raw in iter_dnc_file(fh):
+                job["rows"] += 1
+                if not e164:
+                    job["invalid"] += 1
+                    continue
+                if e164 in batch:
+                    job["duplicates"] += 1
+                    continue
+                batch[e164] = None
+                if len(batch) >= DNC_IMPORT_BATCH:
+                    _flush(session, batch)
+                    batch = {}
+            if batch:
+                _flush(session, batch)
+        job["status"] = "completed"
+    except Exception as e:
+        logger.exception("[dnc_import] job %s failed", job_id)
+        job["status"] = "failed"
+        job["error"] = str(e)
+    finally:
+        job["finished_at"] = datetime.now(timezone.utc).isoformat()
+        _save_job(job)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        if job.get("inserted"):
+            # One rebuild is cheaper than replaying every inserted number
+            invalidate_dnc_index(tenant_id)
+    logger.info(
+        "[dnc_import] job %s %s: %d rows, %d inserted, %d duplicates, %d invalid",
+        job_id, job["status"], job["rows"], job["inserted"], job["duplicates"], job["invalid"],
+    )
+    return job
+
+
+def iter_dnc_export(tenant_id: Optional[int]) -> Iterator[str]:
+    """Stream the tenant's DNC entries as CSV lines (header first), keyset-paginated by id"""
+    yield "e164,source,created_at\n"
+    last_id = 0
+    while True:
+        with Session(engine) as session:
+            _set_tenant_session(session, tenant_id)
+            q = select(DNCEntry.id, DNCEntry.e164, DNCEntry.source, DNCEntry.created_at).where(DNCEntry.id > last_id)
+            if tenant_id is not None:
+                q = q.where(DNCEntry.tenant_id == tenant_id)
+            rows = session.execute(q.order_by(DNCEntry.id).limit(DNC_EXPORT_BATCH)).all()
+        if not rows:
+            return
+        out = io.StringIO()
+        writer = csv.writer(out)
+        for _id, e164, source, created_at in rows:
+            writer.writerow([e164, source or "", created_at.isoformat() if created_at else ""])
+        yield out.getvalue()
+        last_id = rows[-1][0]
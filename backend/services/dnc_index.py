@@ -0,0 +1,284 @@
+"""In-memory DNC index: per-tenant Bloom filters in front of dnc_numbers
+
+Every dial used to run an EXISTS query against dnc_numbers. The index keeps one
+Bloom filter per tenant (plus one for tenant-less lookups, which match any
+tenant's entries) keyed by the digits of the E.164 number. A negative answer is
+final; a positive is confirmed against the DB, so the filter never changes the
+outcome, it only skips queries for numbers that are certainly not listed.
+
+Filters are built lazily on first use by streaming the tenant's numbers and are
+then kept up to date incrementally:
+- additions set bits in place (dnc_index_add)
+- removals can't be undone in a Bloom filter; they are counted and the filter is
+  rebuilt once they exceed DNC_INDEX_REBUILD_RATIO of its entries
+- with Redis (REDIS_URL), every change bumps a per-filter version and is appended
+  to a change log, so other processes apply the same changes before their next
+  lookup; if the log no longer covers a gap, the filter is rebuilt
+
+Env config:
+    DNC_INDEX_ENABLED         "0" disables the filters (every lookup hits the DB)
+    DNC_BLOOM_FP_RATE         Target false-positive rate (default 0.001)
+    DNC_INDEX_REBUILD_RATIO   Removed/added ratio that triggers a rebuild (default 0.1)
+"""
+import os
+import math
+import hashlib
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from config.database import engine
+from models.compliance import DNCEntry
+from services.verdict_cache import invalidate_verdicts, clear_verdicts
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+DNC_INDEX_ENABLED = os.getenv("DNC_INDEX_ENABLED", "1") == "1"
+DNC_BLOOM_FP_RATE = float(os.getenv("DNC_BLOOM_FP_RATE", "0.001"))
+DNC_INDEX_REBUILD_RATIO = float(os.getenv("DNC_INDEX_REBUILD_RATIO", "0.1"))
+
+_ALL_TENANTS = "all"  # filter used when tenant_id is None (matches every tenant's entries)
+_REDIS_VERSION_KEY = "dnc:index:version:{}"
+_REDIS_CHANGES_KEY = "dnc:index:changes:{}"
+_REDIS_CHANGES_KEEP = 50_000
+_MIN_CAPACITY = 1024
+_BUILD_BATCH = 10_000
+
+
+def dnc_key(e164: str) -> Optional[int]:
+    """Numeric key for a phone number (its digits); None if it has none"""
+    digits = "".join(ch for ch in e164 or "" if ch.isdigit())
+    return int(digits) if digits else None
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over integer keys (double hashing on blake2b)"""
+
+    __slots__ = ("capacity", "num_bits", "num_hashes", "bits")
+
+    def __init__(self, capacity: int, fp_rate: float = DNC_BLOOM_FP_RATE) -> None:
+        self.capacity = max(_MIN_CAPACITY, int(capacity))
+        fp_rate = min(max(fp_rate, 1e-9), 0.5)
+        self.num_bits = max(8, int(math.ceil(-self.capacity * math.log(fp_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: int) -> Iterable[int]:
+        digest = hashlib.blake2b(key.to_bytes(16, "big"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, key: int) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: int) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class _TenantFilter:
+    __slots__ = ("bloom", "entries", "removed", "version")
+
+    def __init__(self, bloom: BloomFilter, entries: int, version: int) -> None:
+        self.bloom = bloom
+        self.entries = entries
+        self.removed = 0
+        self.version = version
+
+    def needs_rebuild(self) -> bool:
+        return self.entries > self.bloom.capacity or self.removed > max(100, self.entries * DNC_INDEX_REBUILD_RATIO)
+
+
+_FILTERS: Dict[str, _TenantFilter] = {}
+_LOCK = threading.Lock()
+_STATS: Dict[str, int] = {"lookups": 0, "filtered": 0, "db_checks": 0, "rebuilds": 0}
+
+
+def _filter_name(tenant_id: Optional[int]) -> str:
+    return _ALL_TENANTS if tenant_id is None else str(int(tenant_id))
+
+
+def _remote_version(name: str) -> Optional[int]:
+    r = get_redis()
+    if r is None:
+        return None
+    try:
+        return int(r.get(_REDIS_VERSION_KEY.format(name)) or 0)
+    except Exception:
+        return None
+
+
+def _build(name: str) -> _TenantFilter:
+    """Stream the tenant's numbers from the DB into a fresh filter"""
+    version = _remote_version(name) or 0  # read first: changes made during the build are replayed
+    stmt = select(DNCEntry.e164)
+    if name != _ALL_TENANTS:
+        stmt = stmt.where(DNCEntry.tenant_id == int(name))
+    keys: List[int] = []
+    with Session(engine) as session:
+        for batch in session.execute(stmt.execution_options(yield_per=_BUILD_BATCH)).scalars().partitions():
+            keys.extend(k for k in (dnc_key(e) for e in batch) if k is not None)
+    bloom = BloomFilter(int(len(keys) * 1.5))
+    for key in keys:
+        bloom.add(key)
+    _STATS["rebuilds"] += 1
+    logger.info("[dnc_index] built filter %s: %d entries, %d bytes", name, len(keys), len(bloom.bits))
+    return _TenantFilter(bloom, len(keys), version)
+
+
+def _sync_remote_changes(name: str, flt: _TenantFilter) -> bool:
+    """Apply changes other processes logged in Redis; False if a rebuild is required"""
+    remote = _remote_version(name)
+    if remote is None or remote <= flt.version:
+        return True
+    r = get_redis()
+    try:
+        changes = r.zrangebyscore(_REDIS_CHANGES_KEY.format(name), flt.version + 1, remote, withscores=True)
+    except Exception:
+        return False
+    if len(changes) < remote - flt.version:
+        return False  # log trimmed past our version
+    for member, _score in changes:
+        _version, op, key = member.split(":", 2)
+        if op == "add":
+            flt.bloom.add(int(key))
+            flt.entries += 1
+        else:
+            flt.removed += 1
+    flt.version = remote
+    return True
+
+
+def _get_filter(tenant_id: Optional[int]) -> _TenantFilter:
+    name = _filter_name(tenant_id)
+    flt = _FILTERS.get(name)
+    if flt is not None and _sync_remote_changes(name, flt) and not flt.needs_rebuild():
+        return flt
+    with _LOCK:
+        current = _FILTERS.get(name)
+        if current is flt or current is None:
+            current = _build(name)
+            _FILTERS[name] = current
+    return current
+
+
+def dnc_might_contain(tenant_id: Optional[int], e164: str) -> bool:
+    """Bloom check: False means the number is certainly not in the tenant's DNC list"""
+    _STATS["lookups"] += 1
+    if not DNC_INDEX_ENABLED:
+        return True
+    key = dnc_key(e164)
+    if key is None:
+        return True
+    try:
+        if key in _get_filter(tenant_id).bloom:
+            return True
+    except Exception as e:
+        logger.warning("[dnc_index] filter unavailable, falling back to DB: %s", e)
+        return True
+    _STATS["filtered"] += 1
+    return False
+
+
+def dnc_filter_candidates(tenant_id: Optional[int], numbers: Iterable[str]) -> Set[str]:
+    """Subset of `numbers` that may be listed (only these need a DB check)"""
+    return {n for n in numbers if dnc_might_contain(tenant_id, n)}
+
+
+def is_dnc_number(session: Session, tenant_id: Optional[int], e164: str) -> bool:
+    """DNC membership: Bloom filter first, DB confirmation only on a positive"""
+    if not dnc_might_contain(tenant_id, e164):
+        return False
+    _STATS["db_checks"] += 1
+    q = session.query(DNCEntry).filter(DNCEntry.e164 == e164)
+    if tenant_id is not None:
+        q = q.filter(DNCEntry.tenant_id == tenant_id)
+    return session.query(q.exists()).scalar() or False
+
+
+def _record_change(tenant_id: Optional[int], e164: str, op: str) -> None:
+    invalidate_verdicts(tenant_id)
+    key = dnc_key(e164)
+    if key is None:
+        return
+    names = [_ALL_TENANTS] if tenant_id is None else [str(int(tenant_id)), _ALL_TENANTS]
+    r = get_redis()
+    for name in names:
+        flt = _FILTERS.get(name)
+        if flt is not None:
+            if op == "add":
+                flt.bloom.add(key)
+                flt.entries += 1
+            else:
+                flt.removed += 1
+        if r is None:
+            continue
+        try:
+            version = r.incr(_REDIS_VERSION_KEY.format(name))
+            changes_key = _REDIS_CHANGES_KEY.format(name)
+            r.zadd(changes_key, {f"{version}:{op}:{key}": version})
+            r.zremrangebyrank(changes_key, 0, -_REDIS_CHANGES_KEEP - 1)
+            if flt is not None and flt.version == version - 1:
+                flt.version = version  # already applied locally
+        except Exception:
+            # Other processes can't see this change incrementally; force them to rebuild
+            invalidate_dnc_index(tenant_id)
+            return
+
+
+def dnc_index_add(tenant_id: Optional[int], e164: str) -> None:
+    """Record a committed DNC insert (call after commit)"""
+    _record_change(tenant_id, e164, "add")
+
+
+def dnc_index_remove(tenant_id: Optional[int], e164: str) -> None:
+    """Record a committed DNC delete (call after commit)"""
+    _record_change(tenant_id, e164, "remove")
+
+
+def invalidate_dnc_index(tenant_id: Optional[int] = None) -> None:
+    """Drop filters so they are rebuilt from the DB (e.g. after bulk imports)
+
+    Args:
+        tenant_id: Tenant whose filter to drop (the all-tenants filter is always dropped);
+                   None drops every filter
+    """
+    invalidate_verdicts(tenant_id)
+    if tenant_id is None:
+        clear_verdicts()
+    with _LOCK:
+        if tenant_id is None:
+            _FILTERS.clear()
+        else:
+            _FILTERS.pop(str(int(tenant_id)), None)
+            _FILTERS.pop(_ALL_TENANTS, None)
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        names = [_ALL_TENANTS] if tenant_id is None else [str(int(tenant_id)), _ALL_TENANTS]
+        for name in names:
+            # Jump the version past the change log so every process rebuilds
+            r.incrby(_REDIS_VERSION_KEY.format(name), _REDIS_CHANGES_KEEP + 1)
+        if tenant_id is None:
+            for key in r.scan_iter(match=_REDIS_VERSION_KEY.format("*"), count=500):
+                r.incrby(key, _REDIS_CHANGES_KEEP + 1)
+    except Exception:
+        pass
+
+
+def get_dnc_index_stats() -> Dict[str, int]:
+    """Lookup counters plus number of filters and their total size in bytes"""
+    filters = list(_FILTERS.values())
+    return {
+        **_STATS,
+        "filters": len(filters),
+        "entries": sum(f.entries for f in filters),
+        "bytes": sum(len(f.bloom.bits) for f in filters),
+    }
@@ -1,157 +1,188 @@
 """Business logic enforcement functions"""
+import os
 import asyncio
-import pytz
-from typing import Optional, Dict, Any, Tuple
-from datetime import datetime, timezone, timedelta
+from typing import Optional, Dict, Any, Tuple, List, Mapping, Iterator
+from datetime import datetime
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from fastapi import Request, HTTPException
 
-from models.compliance import DNCEntry, CostEvent
+from config.database import engine
+from models.compliance import DNCEntry
 from models.billing import Subscription
-from models.campaigns import Lead
+from models.campaigns import Campaign, Lead
 from services.settings import get_settings
-from services.compliance import get_country_rule, get_country_rule_for_number
+from services.compliance import get_country_rule, get_country_rule_for_number, country_rules_version
+from services.verdict_cache import verdict_key, get_verdict, put_verdict
+from services.quiet_hours import QuietHoursSchedule, compile_quiet_hours
+from services.dnc_index import is_dnc_number, dnc_filter_candidates
+from services.spend_ledger import tenant_monthly_spend_cents, reserve_budget
+from services.entitlements import get_tenant_entitlements, invalidate_entitlements
 from utils.auth import extract_tenant_id
 from utils.helpers import country_iso_from_e164
+from utils.numbering_plan import country_isos_for_numbers, timezone_for_number, timezones_for_numbers
 from utils.websocket import manager as ws_manager
 
 
+# Reserved per call when its campaign has no cost_per_call_cents (same default as Campaign)
+BUDGET_CALL_RESERVE_CENTS = int(os.getenv("BUDGET_CALL_RESERVE_CENTS", "100"))
+
+
 def _is_dnc_number(session: Session, tenant_id: Optional[int], to_number: str) -> bool:
-    """Check if number is in DNC list"""
-    q = session.query(DNCEntry).filter(DNCEntry.e164 == to_number)
-    if tenant_id is not None:
-        q = q.filter(DNCEntry.tenant_id == tenant_id)
-    return session.query(q.exists()).scalar() or False
+    """Check if number is in DNC list (Bloom filter first, DB only on a possible hit)"""
+    return is_dnc_number(session, tenant_id, to_number)
 
 
 def _tenant_monthly_spend_cents(session: Session, tenant_id: Optional[int]) -> int:
-    """Calculate tenant monthly spend in cents"""
+    """Calculate tenant monthly spend in cents (one row of the spend ledger)"""
     try:
-        start_month = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        q = session.query(CostEvent)
-        # Note: CostEvent filtering by tenant_id can be added when call_id joins are available
-        rows = q.all()
-        total = 0
-        for r in rows:
-            ts = r.ts or datetime.now(timezone.utc)
-            if ts >= start_month:
-                total += int(r.amount or 0)
-        return total
+        return tenant_monthly_spend_cents(session, tenant_id)
     except Exception:
         return 0
 
 
-def _is_quiet_hours(rule: Dict[str, Any], scheduled_time: Optional[datetime] = None) -> Tuple[bool, Optional[str]]:
+def _quiet_hours_schedule(rule: Mapping[str, Any]) -> QuietHoursSchedule:
+    """Compiled schedule for a quiet hours rule (cached per definition)"""
+    return compile_quiet_hours(
+        rule.get("quiet_hours_weekdays"),
+        rule.get("quiet_hours_saturday"),
+        rule.get("quiet_hours_sunday"),
+        rule.get("timezone") or "UTC",
+    )
+
+
+def _is_quiet_hours(rule: Mapping[str, Any], scheduled_time: Optional[datetime] = None) -> Tuple[bool, Optional[str]]:
     """Check if scheduled_time is within quiet hours for country rule"""
     if not rule.get("quiet_hours_enabled"):
         return (False, None)
+    return _quiet_hours_schedule(rule).is_quiet(scheduled_time)
+
+
+def _callee_timezone(lead: Optional[Lead], to_number: Optional[str] = None) -> Optional[str]:
+    """IANA zone of the callee: the lead's stored zone, else derived from the dialed number"""
+    if lead and lead.timezone:
+        return lead.timezone
+    return timezone_for_number(to_number or (lead.phone if lead else None))
+
+
+def backfill_lead_timezones(batch_size: int = 1000) -> int:
+    """Store the IANA zone of leads ingested before leads.timezone existed
+
+    Leads whose number has no known zone stay NULL (they keep the country's main zone).
+
+    Returns:
+        Number of leads updated
+    """
+    updated = 0
+    last_id = 0
+    with Session(engine) as session:
+        while True:
+            rows = (
+                session.query(Lead.id, Lead.phone)
+                .filter(Lead.timezone.is_(None), Lead.id > last_id)
+                .order_by(Lead.id)
+                .limit(max(1, int(batch_size)))
+                .all()
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            by_zone: Dict[str, List[int]] = {}
+            for (lead_id, _), tz in zip(rows, timezones_for_numbers(phone for _, phone in rows)):
+                if tz:
+                    by_zone.setdefault(tz, []).append(lead_id)
+            for tz, ids in by_zone.items():
+                result = session.execute(
+                    update(Lead)
+                    .where(Lead.id.in_(ids), Lead.timezone.is_(None))
+                    .values(timezone=tz)
+                    .execution_options(synchronize_session=False)
+                )
+                updated += int(result.rowcount or 0)
+            session.commit()
+    return updated
+
+
+def _quiet_hours_policy(
+    rule: Mapping[str, Any],
+    lead: Optional[Lead],
+    campaign: Optional[Any],
+    settings: Optional[Any],
+    to_number: Optional[str] = None,
+) -> Tuple[Dict[str, Any], str]:
+    """Resolve effective quiet hours - Priority: Lead (bypass) > Campaign > Default Settings > Country
     
-    check_time = scheduled_time or datetime.now(timezone.utc)
-    tz_str = rule.get("timezone", "UTC")
+    Country quiet hours apply in the callee's zone (lead, else dialed number), falling
+    back to the country's main zone.
     
-    try:
-        tz = pytz.timezone(tz_str)
-    except Exception:
-        tz = pytz.UTC
+    Returns:
+        (quiet_hours_rule, source)
+    """
+    # First check if lead has quiet hours disabled (highest priority - bypass all)
+    if lead and lead.quiet_hours_disabled == 1:
+        # Lead explicitly has quiet hours disabled - bypass all quiet hours checks
+        return {"quiet_hours_enabled": False}, "lead_override"
     
-    # Convert to country timezone
-    local_time = check_time.astimezone(tz)
-    weekday = local_time.weekday()  # 0=Monday, 6=Sunday
+    settings_qh_enabled = bool(settings.quiet_hours_enabled or 0) if settings else False
     
-    # Check quiet hours based on day
-    if weekday < 5:  # Monday-Friday
-        hours = rule.get("quiet_hours_weekdays")
-        if hours and hours != "forbidden":
-            start_str, end_str = hours.split("-")
-            start_h, start_m = map(int, start_str.split(":"))
-            end_h, end_m = map(int, end_str.split(":"))
-            now_minutes = local_time.hour * 60 + local_time.minute
-            start_minutes = start_h * 60 + start_m
-            end_minutes = end_h * 60 + end_m
-            # Handle wrap-around (e.g., 21:00-08:00)
-            if start_minutes > end_minutes:
-                if now_minutes >= start_minutes or now_minutes < end_minutes:
-                    return (True, f"Quiet hours: {hours}")
-            else:
-                if start_minutes <= now_minutes < end_minutes:
-                    return (True, f"Quiet hours: {hours}")
-    elif weekday == 5:  # Saturday
-        hours = rule.get("quiet_hours_saturday")
-        if hours == "forbidden":
-            return (True, "Saturday calls forbidden")
-        elif hours:
-            start_str, end_str = hours.split("-")
-            start_h, start_m = map(int, start_str.split(":"))
-            end_h, end_m = map(int, end_str.split(":"))
-            now_minutes = local_time.hour * 60 + local_time.minute
-            start_minutes = start_h * 60 + start_m
-            end_minutes = end_h * 60 + end_m
-            if start_minutes > end_minutes:
-                if now_minutes >= start_minutes or now_minutes < end_minutes:
-                    return (True, f"Quiet hours: {hours}")
-            else:
-                if start_minutes <= now_minutes < end_minutes:
-                    return (True, f"Quiet hours: {hours}")
-    else:  # Sunday
-        hours = rule.get("quiet_hours_sunday")
-        if hours == "forbidden":
-            return (True, "Sunday calls forbidden")
-        elif hours:
-            start_str, end_str = hours.split("-")
-            start_h, start_m = map(int, start_str.split(":"))
-            end_h, end_m = map(int, end_str.split(":"))
-            now_minutes = local_time.hour * 60 + local_time.minute
-            start_minutes = start_h * 60 + start_m
-            end_minutes = end_h * 60 + end_m
-            if start_minutes > end_minutes:
-                if now_minutes >= start_minutes or now_minutes < end_minutes:
-                    return (True, f"Quiet hours: {hours}")
-            else:
-                if start_minutes <= now_minutes < end_minutes:
-                    return (True, f"Quiet hours: {hours}")
+    # Check campaign quiet hours first (highest priority after lead override)
+    if campaign and campaign.quiet_hours_enabled is not None:
+        if campaign.quiet_hours_enabled == 1:
+            quiet_hours_rule = {
+                "quiet_hours_enabled": True,
+                "quiet_hours_weekdays": campaign.quiet_hours_weekdays,
+                "quiet_hours_saturday": campaign.quiet_hours_saturday,
+                "quiet_hours_sunday": campaign.quiet_hours_sunday,
+                "timezone": campaign.quiet_hours_timezone or campaign.timezone or "UTC",
+            }
+        else:
+            # Campaign explicitly disabled quiet hours
+            quiet_hours_rule = {"quiet_hours_enabled": False}
+    # Check default settings (second priority)
+    elif settings_qh_enabled:
+        quiet_hours_rule = {
+            "quiet_hours_enabled": True,
+            "quiet_hours_weekdays": settings.quiet_hours_weekdays,
+            "quiet_hours_saturday": settings.quiet_hours_saturday,
+            "quiet_hours_sunday": settings.quiet_hours_sunday,
+            "timezone": settings.quiet_hours_timezone or "UTC",
+        }
+    # Check country rule (lowest priority), in the callee's own zone when known
+    elif rule.get("quiet_hours_enabled"):
+        quiet_hours_rule = {
+            "quiet_hours_enabled": True,
+            "quiet_hours_weekdays": rule.get("quiet_hours_weekdays"),
+            "quiet_hours_saturday": rule.get("quiet_hours_saturday"),
+            "quiet_hours_sunday": rule.get("quiet_hours_sunday"),
+            "timezone": _callee_timezone(lead, to_number) or rule.get("timezone", "UTC"),
+        }
+    else:
+        quiet_hours_rule = {"quiet_hours_enabled": False}
     
-    return (False, None)
+    # Determine source for quiet hours (for reporting)
+    if campaign and campaign.quiet_hours_enabled == 1:
+        quiet_hours_source = "campaign"
+    elif settings_qh_enabled:
+        quiet_hours_source = "default"
+    elif rule.get("quiet_hours_enabled"):
+        quiet_hours_source = "country"
+    else:
+        quiet_hours_source = "none"
+    return quiet_hours_rule, quiet_hours_source
 
 
-def check_compliance(
-    session: Session,
-    tenant_id: Optional[int],
-    to_number: str,
-    lead: Optional[Lead] = None,
+def _evaluate_compliance(
+    country_iso: str,
+    rule: Mapping[str, Any],
+    is_dnc: bool,
+    lead: Optional[Lead],
+    campaign: Optional[Any],
+    settings: Optional[Any],
     scheduled_time: Optional[datetime] = None,
     metadata: Optional[dict] = None,
+    to_number: Optional[str] = None,
 ) -> Dict[str, Any]:
-    """
-    Comprehensive compliance check for a call.
-    Returns dict with check results and warnings.
-    """
-    from models.campaigns import Campaign
-    from models.settings import AppSettings
-    
-    country_iso = country_iso_from_e164(to_number)
-    if not country_iso:
-        # No country detected - allow with warning
-        return {
-            "allowed": True,
-            "country_iso": None,
-            "warnings": ["Country could not be detected from phone number"],
-            "checks": {},
-        }
-    
-    # Load country rule
-    rule = get_country_rule(tenant_id, country_iso, session)
-    
-    # Load campaign if available (from lead or metadata)
-    campaign = None
-    if lead and lead.campaign_id:
-        campaign = session.get(Campaign, lead.campaign_id)
-        if campaign and tenant_id is not None and campaign.tenant_id != tenant_id:
-            campaign = None
-    elif metadata and metadata.get("campaign_id"):
-        campaign = session.get(Campaign, metadata.get("campaign_id"))
-        if campaign and tenant_id is not None and campaign.tenant_id != tenant_id:
-            campaign = None
-    
+    """Evaluate compliance for one number from preloaded context (no DB access)"""
     nature = (lead.nature if lead and lead.nature else (metadata or {}).get("nature", "unknown")) or "unknown"
     regime = rule.get("regime_b2c") if nature == "b2c" else rule.get("regime_b2b", "opt_out")
     
@@ -161,7 +192,7 @@ def check_compliance(
     block_reason: Optional[str] = None
     
     # 1. DNC Check (local)
-    if _is_dnc_number(session, tenant_id, to_number):
+    if is_dnc:
         checks["dnc_local"] = {"passed": False, "message": "Number in local DNC list"}
         blocked = True
         block_reason = "DNC"
@@ -174,66 +205,18 @@ def check_compliance(
             checks["dnc_registry"] = {"passed": None, "message": "Public DNC check not yet implemented"}
             warnings.append(f"DNC registry check required for {country_iso} but API not implemented")
     
-    # 2. Quiet Hours Check - Priority: Lead (bypass) > Campaign > Default Settings > Country
-    # First check if lead has quiet hours disabled (highest priority - bypass all)
-    if lead and lead.quiet_hours_disabled == 1:
-        # Lead explicitly has quiet hours disabled - bypass all quiet hours checks
-        quiet_hours_rule = {"quiet_hours_enabled": False}
-        quiet_hours_source = "lead_override"
-    else:
-        quiet_hours_rule: Dict[str, Any] = {}
-        settings = get_settings()  # Load settings once for priority check
-        settings_qh_enabled = bool(settings.quiet_hours_enabled or 0) if settings else False
-        
-        # Check campaign quiet hours first (highest priority after lead override)
-        if campaign and campaign.quiet_hours_enabled is not None:
-            if campaign.quiet_hours_enabled == 1:
-                quiet_hours_rule = {
-                    "quiet_hours_enabled": True,
-                    "quiet_hours_weekdays": campaign.quiet_hours_weekdays,
-                    "quiet_hours_saturday": campaign.quiet_hours_saturday,
-                    "quiet_hours_sunday": campaign.quiet_hours_sunday,
-                    "timezone": campaign.quiet_hours_timezone or campaign.timezone or "UTC",
-                }
-            else:
-                # Campaign explicitly disabled quiet hours
-                quiet_hours_rule = {"quiet_hours_enabled": False}
-        # Check default settings (second priority)
-        elif settings_qh_enabled:
-            quiet_hours_rule = {
-                "quiet_hours_enabled": True,
-                "quiet_hours_weekdays": settings.quiet_hours_weekdays,
-                "quiet_hours_saturday": settings.quiet_hours_saturday,
-                "quiet_hours_sunday": settings.quiet_hours_sunday,
-                "timezone": settings.quiet_hours_timezone or "UTC",
-            }
-        # Check country rule (lowest priority)
-        elif rule.get("quiet_hours_enabled"):
-            quiet_hours_rule = {
-                "quiet_hours_enabled": True,
-                "quiet_hours_weekdays": rule.get("quiet_hours_weekdays"),
-                "quiet_hours_saturday": rule.get("quiet_hours_saturday"),
-                "quiet_hours_sunday": rule.get("quiet_hours_sunday"),
-                "timezone": rule.get("timezone", "UTC"),
-            }
-        else:
-            quiet_hours_rule = {"quiet_hours_enabled": False}
-        
-        # Determine source for quiet hours (for reporting)
-        if campaign and campaign.quiet_hours_enabled == 1:
-            quiet_hours_source = "campaign"
-        elif settings_qh_enabled:
-            quiet_hours_source = "default"
-        elif rule.get("quiet_hours_enabled"):
-            quiet_hours_source = "country"
-        else:
-            quiet_hours_source = "none"
-    
-    # Apply quiet hours check
+    # 2. Quiet Hours Check
+    quiet_hours_rule, quiet_hours_source = _quiet_hours_policy(rule, lead, campaign, settings, to_number)
     if quiet_hours_rule.get("quiet_hours_enabled"):
         in_quiet, reason = _is_quiet_hours(quiet_hours_rule, scheduled_time)
         if in_quiet:
-            checks["quiet_hours"] = {"passed": False, "message": reason or "In quiet hours", "source": quiet_hours_source}
+            next_allowed = _quiet_hours_schedule(quiet_hours_rule).next_allowed(scheduled_time)
+            checks["quiet_hours"] = {
+                "passed": False,
+                "message": reason or "In quiet hours",
+                "source": quiet_hours_source,
+                "next_allowed_at": next_allowed.isoformat() if next_allowed else None,
+            }
             blocked = True
             block_reason = block_reason or "Quiet hours"
         else:
@@ -269,8 +252,7 @@ def check_compliance(
         checks["ai_disclosure"] = {"passed": True, "required": False}
     
     # 5. Legal Review Check (global setting)
-    s = get_settings()
-    require_legal = bool(s.require_legal_review or 0)
+    require_legal = bool(settings.require_legal_review or 0) if settings else False
     if require_legal:
         accepted = bool((metadata or {}).get("legal_accepted", False))
         if not accepted:
@@ -294,6 +276,177 @@ def check_compliance(
     }
 
 
+def check_compliance(
+    session: Session,
+    tenant_id: Optional[int],
+    to_number: str,
+    lead: Optional[Lead] = None,
+    scheduled_time: Optional[datetime] = None,
+    metadata: Optional[dict] = None,
+) -> Dict[str, Any]:
+    """
+    Comprehensive compliance check for a call.
+    Returns dict with check results and warnings.
+    """
+    from models.campaigns import Campaign
+    
+    country_iso = country_iso_from_e164(to_number)
+    if not country_iso:
+        # No country detected - allow with warning
+        return {
+            "allowed": True,
+            "country_iso": None,
+            "warnings": ["Country could not be detected from phone number"],
+            "checks": {},
+        }
+    
+    # Load country rule
+    rule = get_country_rule(tenant_id, country_iso, session)
+    settings = get_settings()
+    
+    key = verdict_key(tenant_id, to_number, lead, settings, country_rules_version(), scheduled_time, metadata)
+    cached = get_verdict(key)
+    if cached is not None:
+        return cached
+    
+    # Load campaign if available (from lead or metadata)
+    campaign = None
+    if lead and lead.campaign_id:
+        campaign = session.get(Campaign, lead.campaign_id)
+        if campaign and tenant_id is not None and campaign.tenant_id != tenant_id:
+            campaign = None
+    elif metadata and metadata.get("campaign_id"):
+        campaign = session.get(Campaign, metadata.get("campaign_id"))
+        if campaign and tenant_id is not None and campaign.tenant_id != tenant_id:
+            campaign = None
+    
+    result = _evaluate_compliance(
+        country_iso,
+        rule,
+        _is_dnc_number(session, tenant_id, to_number),
+        lead,
+        campaign,
+        settings,
+        scheduled_time,
+        metadata,
+        to_number,
+    )
+    put_verdict(key, result)
+    return result
+
+
+COMPLIANCE_BATCH_CHUNK = 1000  # numbers per DNC/lead IN (...) query
+
+
+def check_compliance_batch(
+    session: Session,
+    tenant_id: Optional[int],
+    to_numbers: Optional[List[str]] = None,
+    lead_ids: Optional[List[int]] = None,
+    scheduled_time: Optional[datetime] = None,
+    metadata: Optional[dict] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Evaluate compliance for many numbers and/or leads
+    
+    Settings, campaigns and country rules are loaded once; leads and DNC membership
+    are loaded with one IN (...) query per chunk of COMPLIANCE_BATCH_CHUNK entries.
+    Each verdict matches check_compliance() for the same input.
+    
+    Args:
+        session: Database session
+        tenant_id: Tenant ID
+        to_numbers: E.164 numbers to check (no lead context)
+        lead_ids: Lead IDs to check (lead phone, nature, consent and campaign are used)
+        scheduled_time: Time to evaluate quiet hours at (default: now)
+        metadata: Shared metadata (nature, campaign_id, legal_accepted) as in check_compliance
+    
+    Yields:
+        Dicts with to_number, lead_id and the check_compliance result (without the rule)
+    """
+    from models.campaigns import Campaign
+    
+    settings = get_settings()
+    campaigns: Dict[int, Optional[Any]] = {}
+    
+    def _campaign(campaign_id: Optional[int]) -> Optional[Any]:
+        if not campaign_id:
+            return None
+        if campaign_id not in campaigns:
+            campaign = session.get(Campaign, campaign_id)
+            if campaign and tenant_id is not None and campaign.tenant_id != tenant_id:
+                campaign = None
+            campaigns[campaign_id] = campaign
+        return campaigns[campaign_id]
+    
+    metadata_campaign = _campaign((metadata or {}).get("campaign_id"))
+    
+    def _dnc_set(numbers: List[str]) -> set:
+        numbers = list(dnc_filter_candidates(tenant_id, numbers))
+        if not numbers:
+            return set()
+        q = session.query(DNCEntry.e164).filter(DNCEntry.e164.in_(numbers))
+        if tenant_id is not None:
+            q = q.filter(DNCEntry.tenant_id == tenant_id)
+        return {row[0] for row in q.all()}
+    
+    def _verdicts(entries: List[Tuple[str, Optional[Lead]]]) -> Iterator[Dict[str, Any]]:
+        rules_version = country_rules_version()
+        keys = [
+            verdict_key(tenant_id, number, lead, settings, rules_version, scheduled_time, metadata)
+            for number, lead in entries
+        ]
+        cached = [get_verdict(key) for key in keys]
+        dnc = _dnc_set(list({number for (number, _), hit in zip(entries, cached) if number and hit is None}))
+        countries = country_isos_for_numbers(number for number, _ in entries)
+        for (number, lead), country_iso, key, hit in zip(entries, countries, keys, cached):
+            if not country_iso:
+                result: Dict[str, Any] = {
+                    "allowed": True,
+                    "country_iso": None,
+                    "warnings": ["Country could not be detected from phone number"],
+                    "checks": {},
+                }
+            elif hit is not None:
+                result = hit
+                result.pop("rule", None)
+            else:
+                campaign = _campaign(lead.campaign_id) if lead and lead.campaign_id else metadata_campaign
+                result = _evaluate_compliance(
+                    country_iso,
+                    get_country_rule(tenant_id, country_iso),
+                    number in dnc,
+                    lead,
+                    campaign,
+                    settings,
+                    scheduled_time,
+                    metadata,
+                    number,
+                )
+                put_verdict(key, result)
+                result.pop("rule", None)
+            yield {"to_number": number, "lead_id": lead.id if lead else None, **result}
+    
+    numbers = list(to_numbers or [])
+    for i in range(0, len(numbers), COMPLIANCE_BATCH_CHUNK):
+        yield from _verdicts([(n, None) for n in numbers[i:i + COMPLIANCE_BATCH_CHUNK]])
+    
+    ids = list(lead_ids or [])
+    for i in range(0, len(ids), COMPLIANCE_BATCH_CHUNK):
+        chunk = ids[i:i + COMPLIANCE_BATCH_CHUNK]
+        q = session.query(Lead).filter(Lead.id.in_(chunk))
+        if tenant_id is not None:
+            q = q.filter(Lead.tenant_id == tenant_id)
+        leads = {lead.id: lead for lead in q.all()}
+        entries: List[Tuple[str, Optional[Lead]]] = []
+        for lead_id in chunk:
+            lead = leads.get(lead_id)
+            if lead is None:
+                yield {"to_number": None, "lead_id": lead_id, "allowed": False, "error": "Lead not found"}
+                continue
+            entries.append((lead.phone, lead))
+        yield from _verdicts(entries)
+
+
 def enforce_compliance_or_raise(
     session: Session,
     request: Request,
@@ -311,60 +464,108 @@ def enforce_compliance_or_raise(
         raise HTTPException(status_code=403, detail=f"Blocked: {reason}")
 
 
-def enforce_budget_or_raise(session: Session, request: Request) -> None:
-    """Enforce budget limits"""
-    s = get_settings()
-    tenant_id = extract_tenant_id(request)
-    monthly_cap = int(s.budget_monthly_cents or 0)
-    if monthly_cap <= 0:
-        return
-    spent = _tenant_monthly_spend_cents(session, tenant_id)
-    warn_pct = int(s.budget_warn_percent or 80)
-    stop_enabled = bool(s.budget_stop_enabled or 0)
-    # Broadcast warn if over threshold
+def _broadcast_budget_warn(spent: int, monthly_cap: int, warn_pct: int) -> None:
+    """Non-blocking budget.warn event once committed spend passes the warn threshold"""
     try:
         if spent >= monthly_cap * warn_pct / 100.0:
-            # Non-blocking warning event
             asyncio.create_task(ws_manager.broadcast({
                 "type": "budget.warn",
                 "data": {"spent": spent/100.0, "cap": monthly_cap/100.0}
             }))
     except Exception:
         pass
+
+
+def enforce_budget_or_raise(session: Session, request: Request) -> None:
+    """Enforce budget limits (spend plus calls in flight)"""
+    s = get_settings()
+    tenant_id = extract_tenant_id(request)
+    monthly_cap = int(s.budget_monthly_cents or 0)
+    if monthly_cap <= 0:
+        return
+    try:
+        spent = tenant_monthly_spend_cents(session, tenant_id, include_reserved=True)
+    except Exception:
+        spent = 0
+    warn_pct = int(s.budget_warn_percent or 80)
+    stop_enabled = bool(s.budget_stop_enabled or 0)
+    _broadcast_budget_warn(spent, monthly_cap, warn_pct)
     if stop_enabled and spent >= monthly_cap:
         raise HTTPException(status_code=403, detail="Budget cap reached for this tenant")
 
 
+def estimate_call_cost_cents(session: Session, campaign_id: Optional[int] = None) -> int:
+    """Cost to reserve for a call: the campaign's cost_per_call_cents, else BUDGET_CALL_RESERVE_CENTS"""
+    if campaign_id:
+        try:
+            campaign = session.get(Campaign, int(campaign_id))
+            if campaign is not None and campaign.cost_per_call_cents is not None:
+                return int(campaign.cost_per_call_cents)
+        except (TypeError, ValueError):
+            pass
+    return BUDGET_CALL_RESERVE_CENTS
+
+
+def reserve_budget_or_raise(
+    session: Session,
+    request: Optional[Request],
+    amount_cents: int,
+    tenant_id: Optional[int] = None,
+    dial_delay_ms: int = 0,
+) -> int:
+    """Reserve a call's estimated cost against the monthly budget - raises HTTPException if the cap is reached
+
+    The check and the reservation are one atomic update, so concurrent dials can't
+    overshoot the cap. Commits the session.
+
+    Args:
+        session: DB session
+        request: Request to take the tenant from (None: use tenant_id)
+        amount_cents: Estimated cost (see estimate_call_cost_cents)
+        tenant_id: Tenant when there is no request (worker)
+        dial_delay_ms: Delay before the call is dialed (queued batch items), extends the reservation's expiry
+
+    Returns:
+        Reservation id (pass to release_reservation if the call is not placed, attach_reservation once it is)
+    """
+    s = get_settings()
+    if request is not None:
+        tenant_id = extract_tenant_id(request)
+    monthly_cap = int(s.budget_monthly_cents or 0)
+    enforce_cap = monthly_cap > 0 and bool(s.budget_stop_enabled or 0)
+    reservation = reserve_budget(
+        session, tenant_id, amount_cents, monthly_cap if enforce_cap else None, dial_delay_s=dial_delay_ms / 1000.0
+    )
+    if reservation is None:
+        session.rollback()
+        raise HTTPException(status_code=403, detail="Budget cap reached for this tenant")
+    session.commit()
+    if monthly_cap > 0:
+        _broadcast_budget_warn(
+            tenant_monthly_spend_cents(session, tenant_id, include_reserved=True),
+            monthly_cap,
+            int(s.budget_warn_percent or 80),
+        )
+    return reservation.id
+
+
 def enforce_subscription_or_raise(session: Session, request: Request) -> None:
-    """Enforce subscription status"""
+    """Enforce subscription status (reads the cached tenant snapshot)"""
     tenant_id = extract_tenant_id(request)
     if tenant_id is None:
         return
-    sub = (
-        session.query(Subscription)
-        .filter(Subscription.tenant_id == tenant_id)
-        .order_by(Subscription.id.desc())
-        .first()
-    )
+    plan = get_tenant_entitlements(tenant_id)
     # Bootstrap Free 14-day trial if missing
-    if not sub:
-        sub = Subscription(tenant_id=tenant_id, plan_code="free", status="trialing")
-        session.add(sub)
+    if plan.subscription_id is None:
+        session.add(Subscription(tenant_id=tenant_id, plan_code="free", status="trialing"))
         session.commit()
-        session.refresh(sub)
-    status = sub.status or "trialing"
-    if status in {"active", "trialing"}:
+        invalidate_entitlements(tenant_id)
+        plan = get_tenant_entitlements(tenant_id)
+    if plan.status in {"active", "trialing"}:
         # Enforce 14-day trial for Free
-        try:
-            if (sub.plan_code or "free") == "free" and status == "trialing":
-                start = sub.created_at or datetime.now(timezone.utc)
-                if datetime.now(timezone.utc) - start > timedelta(days=14):
-                    raise HTTPException(status_code=402, detail="Free trial expired. Please upgrade in Billing")
-            return
-        except HTTPException:
-            raise
-        except Exception:
-            pass
+        if plan.trial_expired():
+            raise HTTPException(status_code=402, detail="Free trial expired. Please upgrade in Billing")
+        return
     # Not active or trial expired
     raise HTTPException(status_code=402, detail="Subscription required")
 
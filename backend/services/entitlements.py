@@ -0,0 +1,234 @@
+"""Per-tenant plan, subscription state and entitlements
+
+Subscription gating (every dial, batch, workflow email, agent creation) and
+/billing/entitlements used to query subscriptions, addons and entitlements on
+every request. get_tenant_entitlements() serves a per-process snapshot per
+tenant: plan, subscription status, trial expiry, addons and the resolved
+entitlements (plan defaults + addons + per-tenant overrides).
+
+Writers (Stripe webhooks, addon updates, the trial bootstrap) call
+invalidate_entitlements(tenant_id) after commit: the local snapshot is dropped
+and, with Redis, a message on the entitlements channel makes every other process
+drop theirs. ENTITLEMENTS_CACHE_TTL_S bounds staleness if a message is missed
+(or without Redis).
+
+Env config:
+    ENTITLEMENTS_CACHE_TTL_S   Max age of a tenant snapshot in seconds (default 60)
+"""
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config.database import engine
+from models.billing import Subscription, Addon, Entitlement
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+ENTITLEMENTS_CACHE_TTL_S = float(os.getenv("ENTITLEMENTS_CACHE_TTL_S", "60"))
+FREE_TRIAL_DAYS = 14
+_ENTITLEMENTS_CHANNEL = "entitlements:changed"
+
+_PLAN_ENTITLEMENTS: Dict[str, Dict[str, Any]] = {
+    "enterprise": {
+        "calendar_full": True,
+        "calendar_week_day": True,
+        "workflows_limit": None,
+        "languages_allowance": None,
+        "agents_limit": None,  # Unlimited
+        "integrations": ["hubspot", "zoho", "odoo", "csv"],
+        "analytics_advanced": True,
+        "roles_enabled": True,
+        "sso": True,
+        "sla": True,
+        "data_residency": "EU",
+        "retention_custom": True,
+        "premium_models": True,
+        "byo_telephony": True,
+        "custom_integrations": True,
+        "success_manager": True,
+    },
+    "pro": {
+        "calendar_full": True,
+        "calendar_week_day": True,
+        "workflows_limit": None,
+        "languages_allowance": None,
+        "agents_limit": 20,  # 20 agents max
+        "integrations": ["hubspot", "zoho", "odoo", "csv"],
+        "analytics_advanced": True,
+        "roles_enabled": True,
+    },
+    "core": {
+        "calendar_full": False,
+        "calendar_week_day": True,
+        "workflows_limit": 3,
+        "languages_allowance": 3,
+        "agents_limit": 5,  # 5 agents max
+        "integrations": ["hubspot", "zoho", "odoo", "csv"],
+    },
+    "free": {
+        "calendar_full": False,
+        "calendar_week_day": False,
+        "workflows_limit": 0,
+        "languages_allowance": 1,
+        "agents_limit": 1,  # 1 agent max (Free plan)
+        "integrations": ["csv"],
+    },
+}
+
+
+class TenantEntitlements(NamedTuple):
+    tenant_id: int
+    subscription_id: Optional[int]  # None: the tenant has no subscription row yet
+    plan_code: str
+    status: str
+    trial_expires_at: Optional[datetime]  # Free trials only
+    addons: Mapping[str, int]  # active addon type -> qty
+    overrides: Mapping[str, Any]  # entitlements table, per tenant
+    entitlements: Mapping[str, Any]  # plan defaults + addons + overrides
+
+    def trial_expired(self, now: Optional[datetime] = None) -> bool:
+        return self.trial_expires_at is not None and (now or datetime.now(timezone.utc)) > self.trial_expires_at
+
+
+_SNAPSHOTS: Dict[int, Tuple[float, TenantEntitlements]] = {}  # tenant_id -> (loaded_at, snapshot)
+_CHANGES: Dict[Optional[int], int] = {}  # bumped on invalidation (None: all tenants); racing loads aren't cached
+_ENTITLEMENTS_LOCK = threading.Lock()
+_LISTENER: Optional[threading.Thread] = None
+
+
+def plan_entitlements(plan_code: Optional[str]) -> Dict[str, Any]:
+    """Default entitlements of a plan (unknown plans get the Free ones)"""
+    return dict(_PLAN_ENTITLEMENTS.get((plan_code or "free").lower(), _PLAN_ENTITLEMENTS["free"]))
+
+
+def _drop_snapshots(tenant_id: Optional[int] = None) -> None:
+    _CHANGES[tenant_id] = _CHANGES.get(tenant_id, 0) + 1
+    if tenant_id is None:
+        _SNAPSHOTS.clear()
+    else:
+        _SNAPSHOTS.pop(int(tenant_id), None)
+
+
+def _listen_for_changes() -> None:
+    """Drop local snapshots whenever another process announces a billing write"""
+    while True:
+        r = get_redis()
+        if r is None:
+            return
+        try:
+            pubsub = r.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(_ENTITLEMENTS_CHANNEL)
+            # Anything may have changed while (re)subscribing
+            _drop_snapshots()
+            for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                data = message.get("data")
+                data = data.decode() if isinstance(data, bytes) else str(data or "")
+                _drop_snapshots(int(data) if data.isdigit() else None)
+        except Exception as e:
+            logger.warning("[entitlements] change listener disconnected: %s", e)
+            time.sleep(5)
+
+
+def _ensure_listener() -> None:
+    global _LISTENER
+    if _LISTENER is not None or get_redis() is None:
+        return
+    with _ENTITLEMENTS_LOCK:
+        if _LISTENER is None:
+            _LISTENER = threading.Thread(target=_listen_for_changes, name="entitlements-listener", daemon=True)
+            _LISTENER.start()
+
+
+def _load_entitlements(tenant_id: int) -> TenantEntitlements:
+    with Session(engine) as session:
+        sub = (
+            session.query(Subscription)
+            .filter(Subscription.tenant_id == tenant_id)
+            .order_by(Subscription.id.desc())
+            .first()
+        )
+        addon_rows = session.query(Addon).filter(Addon.tenant_id == tenant_id, Addon.active == 1).all()
+        override_rows = session.query(Entitlement).filter(Entitlement.tenant_id == tenant_id).all()
+
+    plan_code = (sub.plan_code if sub else None) or "free"
+    status = (sub.status if sub else None) or "trialing"
+    trial_expires_at = None
+    if sub and plan_code == "free" and status == "trialing":
+        started = sub.created_at or datetime.now(timezone.utc)
+        if started.tzinfo is None:
+            started = started.replace(tzinfo=timezone.utc)
+        trial_expires_at = started + timedelta(days=FREE_TRIAL_DAYS)
+
+    addons: Dict[str, int] = {}
+    for a in addon_rows:
+        if a.type and a.qty and a.qty > 0:
+            addons[a.type] = addons.get(a.type, 0) + int(a.qty)
+
+    overrides: Dict[str, Any] = {}
+    for e in override_rows:
+        if not e.key:
+            continue
+        try:
+            overrides[e.key] = json.loads(e.value) if e.value else True
+        except Exception:
+            overrides[e.key] = e.value
+
+    entitlements = plan_entitlements(plan_code)
+    entitlements["inbound_slots"] = addons.get("inbound_slot", 0)
+    entitlements["inbound_enabled"] = entitlements["inbound_slots"] > 0
+    entitlements.update(overrides)
+
+    return TenantEntitlements(
+        tenant_id=tenant_id,
+        subscription_id=sub.id if sub else None,
+        plan_code=plan_code,
+        status=status,
+        trial_expires_at=trial_expires_at,
+        addons=addons,
+        overrides=overrides,
+        entitlements=entitlements,
+    )
+
+
+def get_tenant_entitlements(tenant_id: Optional[int]) -> TenantEntitlements:
+    """Cached plan, subscription state and entitlements of a tenant (None = tenant 0)
+
+    Treat the returned snapshot as read-only.
+    """
+    tenant_id = int(tenant_id or 0)
+    _ensure_listener()
+    cached = _SNAPSHOTS.get(tenant_id)
+    if cached is not None and time.monotonic() - cached[0] < ENTITLEMENTS_CACHE_TTL_S:
+        return cached[1]
+    changes = (_CHANGES.get(tenant_id, 0), _CHANGES.get(None, 0))
+    snapshot = _load_entitlements(tenant_id)
+    with _ENTITLEMENTS_LOCK:
+        if changes == (_CHANGES.get(tenant_id, 0), _CHANGES.get(None, 0)):
+            _SNAPSHOTS[tenant_id] = (time.monotonic(), snapshot)
+    return snapshot
+
+
+def invalidate_entitlements(tenant_id: Optional[int] = None) -> None:
+    """Signal that a tenant's subscription, addons or entitlements changed (call after commit)
+
+    Args:
+        tenant_id: Tenant whose snapshot is dropped, or None for all tenants
+    """
+    with _ENTITLEMENTS_LOCK:
+        _drop_snapshots(tenant_id)
+    r = get_redis()
+    if r is not None:
+        try:
+            r.publish(_ENTITLEMENTS_CHANNEL, "" if tenant_id is None else str(int(tenant_id)))
+        except Exception as e:
+            logger.warning("[entitlements] could not publish entitlements change: %s", e)
@@ -0,0 +1,123 @@
+"""Compiled quiet-hours schedules
+
+A quiet-hours definition (weekdays / saturday / sunday windows like "21:00-08:00"
+or "forbidden", plus a timezone) is compiled once into a week-minute table:
+10080 entries, one per minute from Monday 00:00 local time. Each entry holds the
+distance in minutes to the next allowed minute (0 = allowed now), so both
+"is this instant quiet" and "when is the next allowed minute" are a single index
+lookup. Compiled schedules are cached by definition, so every campaign, settings
+row and country rule with the same hours shares one schedule.
+"""
+import logging
+from array import array
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from utils.numbering_plan import get_zone
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+_NEVER = 0xFFFF  # no allowed minute in the whole week
+
+
+def _parse_window(hours: str) -> Optional[Tuple[int, int]]:
+    """"HH:MM-HH:MM" -> (start_minute, end_minute); None if malformed"""
+    try:
+        start_str, end_str = hours.split("-")
+        start_h, start_m = map(int, start_str.split(":"))
+        end_h, end_m = map(int, end_str.split(":"))
+    except (ValueError, AttributeError):
+        logger.warning("Ignoring malformed quiet hours window: %r", hours)
+        return None
+    return start_h * 60 + start_m, end_h * 60 + end_m
+
+
+class QuietHoursSchedule:
+    """Immutable compiled weekly schedule (build via compile_quiet_hours)"""
+
+    __slots__ = ("tz", "next_allowed_offset", "day_reasons")
+
+    def __init__(self, tz, next_allowed_offset: array, day_reasons: Tuple[Optional[str], ...]) -> None:
+        self.tz = tz
+        self.next_allowed_offset = next_allowed_offset
+        self.day_reasons = day_reasons
+
+    def _index(self, local: datetime) -> int:
+        return local.weekday() * MINUTES_PER_DAY + local.hour * 60 + local.minute
+
+    def is_quiet(self, when: Optional[datetime] = None) -> Tuple[bool, Optional[str]]:
+        """Return (in_quiet_hours, reason) for an instant (default: now)"""
+        local = (when or datetime.now(timezone.utc)).astimezone(self.tz)
+        if self.next_allowed_offset[self._index(local)] == 0:
+            return (False, None)
+        return (True, self.day_reasons[local.weekday()])
+
+    def next_allowed(self, when: Optional[datetime] = None) -> Optional[datetime]:
+        """First allowed instant at or after `when` (UTC), or None if every minute is quiet"""
+        when = when or datetime.now(timezone.utc)
+        local = when.astimezone(self.tz)
+        offset = self.next_allowed_offset[self._index(local)]
+        if offset == 0:
+            return when.astimezone(timezone.utc)
+        if offset == _NEVER:
+            return None
+        # Offsets are in local wall-clock minutes; localize so DST changes are respected
+        target = local.replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=offset)
+        return self.tz.localize(target).astimezone(timezone.utc)
+
+
+@lru_cache(maxsize=1024)
+def compile_quiet_hours(
+    weekdays: Optional[str],
+    saturday: Optional[str],
+    sunday: Optional[str],
+    tz_name: Optional[str] = "UTC",
+) -> QuietHoursSchedule:
+    """Compile quiet-hours windows into a QuietHoursSchedule (cached per definition)
+
+    Semantics match the previous string-based check: each day only uses its own
+    window, a window with start > end wraps within the same day (quiet before end
+    and from start), "forbidden" blocks the whole Saturday/Sunday.
+
+    Args:
+        weekdays: Monday-Friday window ("HH:MM-HH:MM")
+        saturday: Saturday window or "forbidden"
+        sunday: Sunday window or "forbidden"
+        tz_name: IANA timezone the windows are expressed in (invalid -> UTC)
+    """
+    tz = get_zone(tz_name)
+
+    quiet = bytearray(MINUTES_PER_WEEK)
+    reasons = []
+    for day in range(7):
+        hours = weekdays if day < 5 else (saturday if day == 5 else sunday)
+        base = day * MINUTES_PER_DAY
+        reason: Optional[str] = None
+        if hours == "forbidden":
+            # Weekdays never supported "forbidden" (treated as no restriction)
+            if day >= 5:
+                quiet[base:base + MINUTES_PER_DAY] = b"\x01" * MINUTES_PER_DAY
+                reason = "Saturday calls forbidden" if day == 5 else "Sunday calls forbidden"
+        elif hours:
+            window = _parse_window(hours)
+            if window is not None:
+                start, end = window
+                for minute in range(MINUTES_PER_DAY):
+                    in_window = (minute >= start or minute < end) if start > end else (start <= minute < end)
+                    if in_window:
+                        quiet[base + minute] = 1
+                reason = f"Quiet hours: {hours}"
+        reasons.append(reason)
+
+    # Distance to the next allowed minute, wrapping around the end of the week
+    offsets = array("H", [_NEVER]) * MINUTES_PER_WEEK
+    if 0 in quiet:
+        distance = _NEVER
+        for _ in range(2):
+            for i in range(MINUTES_PER_WEEK - 1, -1, -1):
+                distance = 0 if not quiet[i] else (distance + 1 if distance != _NEVER else _NEVER)
+                offsets[i] = distance
+    return QuietHoursSchedule(tz, offsets, tuple(reasons))
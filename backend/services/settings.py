@@ -1,11 +1,70 @@
-"""Settings service functions"""
+"""Settings service functions
+
+get_settings() serves a process-wide snapshot of the settings row instead of
+querying it on every call (a single dial used to read it 4-6 times). Writers
+call invalidate_settings() after commit: the local snapshot is dropped and, with
+Redis, a message on the settings channel makes every other process drop theirs.
+SETTINGS_CACHE_TTL_S bounds staleness if a message is missed (or without Redis).
+"""
+import os
+import time
+import logging
+import threading
+from typing import Optional, Tuple
+
 from sqlalchemy.orm import Session
 from config.database import engine
 from models.settings import AppSettings, AppMeta
+from utils.redis_client import get_redis
 
+logger = logging.getLogger(__name__)
 
-def get_settings() -> AppSettings:
-    """Get or create settings"""
+
+SETTINGS_CACHE_TTL_S = float(os.getenv("SETTINGS_CACHE_TTL_S", "60"))
+_SETTINGS_CHANNEL = "settings:changed"
+
+_SETTINGS_CACHE: Optional[Tuple[float, AppSettings]] = None  # (loaded_at, row)
+_CHANGES = 0  # bumped on every invalidation; a load that raced with one is not cached
+_SETTINGS_LOCK = threading.Lock()
+_LISTENER: Optional[threading.Thread] = None
+
+
+def _drop_snapshot() -> None:
+    global _SETTINGS_CACHE, _CHANGES
+    _CHANGES += 1
+    _SETTINGS_CACHE = None
+
+
+def _listen_for_changes() -> None:
+    """Drop the local snapshot whenever another process announces a settings write"""
+    while True:
+        r = get_redis()
+        if r is None:
+            return
+        try:
+            pubsub = r.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(_SETTINGS_CHANNEL)
+            # Anything may have changed while (re)subscribing
+            _drop_snapshot()
+            for message in pubsub.listen():
+                if message.get("type") == "message":
+                    _drop_snapshot()
+        except Exception as e:
+            logger.warning("[settings] change listener disconnected: %s", e)
+            time.sleep(5)
+
+
+def _ensure_listener() -> None:
+    global _LISTENER
+    if _LISTENER is not None or get_redis() is None:
+        return
+    with _SETTINGS_LOCK:
+        if _LISTENER is None:
+            _LISTENER = threading.Thread(target=_listen_for_changes, name="settings-listener", daemon=True)
+            _LISTENER.start()
+
+
+def _load_settings() -> AppSettings:
     with Session(engine) as session:
         row = session.query(AppSettings).order_by(AppSettings.id.asc()).first()
         if not row:
@@ -13,9 +72,39 @@ def get_settings() -> AppSettings:
             session.add(row)
             session.commit()
             session.refresh(row)
+        session.expunge(row)
+        return row
+
+
+def get_settings() -> AppSettings:
+    """Get or create settings (cached snapshot; treat the returned row as read-only)"""
+    global _SETTINGS_CACHE
+    _ensure_listener()
+    cached = _SETTINGS_CACHE
+    if cached is not None and time.monotonic() - cached[0] < SETTINGS_CACHE_TTL_S:
+        return cached[1]
+    with _SETTINGS_LOCK:
+        cached = _SETTINGS_CACHE
+        if cached is not None and time.monotonic() - cached[0] < SETTINGS_CACHE_TTL_S:
+            return cached[1]
+        changes = _CHANGES
+        row = _load_settings()
+        if changes == _CHANGES:
+            _SETTINGS_CACHE = (time.monotonic(), row)
         return row
 
 
+def invalidate_settings() -> None:
+    """Signal that the settings row changed (call after commit); every process reloads"""
+    _drop_snapshot()
+    r = get_redis()
+    if r is not None:
+        try:
+            r.publish(_SETTINGS_CHANNEL, str(time.time()))
+        except Exception as e:
+            logger.warning("[settings] could not publish settings change: %s", e)
+
+
 def get_meta() -> AppMeta:
     """Get or create app metadata"""
     with Session(engine) as session:
@@ -26,4 +115,3 @@ def get_meta() -> AppMeta:
             session.commit()
             session.refresh(row)
         return row
-
@@ -0,0 +1,481 @@
+"""Per-tenant monthly spend ledger and budget reservations
+
+Budget checks (every outbound dial, the number cost estimate, renewals) used to
+load and sum every cost_events row. Costs are now recorded with record_cost(),
+which inserts the CostEvent and adds its amount to the tenant's row in
+tenant_spend_monthly in the same transaction (INSERT ... ON CONFLICT DO UPDATE
+spent_cents = spent_cents + amount), so a budget check reads a single row.
+
+Calls in flight hold a reservation: reserve_budget() adds the estimated cost to
+reserved_cents with a single conditional UPDATE (spent + reserved + amount <= cap),
+so concurrent dials can't overshoot the cap. The reservation is settled against
+the actual call cost when the call finishes (settle_reservation) or released if
+the dial fails (release_reservation); reservations never closed expire
+BUDGET_RESERVATION_TTL_S after the scheduled dial time. Calls placed without a
+reservation are costed by settle_reservation() all the same.
+
+reconcile_spend_ledger() recomputes the counters of recent months from
+cost_events and open reservations (scheduled via the worker) and corrects drift
+from events written outside record_cost(). It locks the month's ledger rows
+(SELECT ... FOR UPDATE) before recomputing, so a record_cost() or reservation
+change racing with it either commits before the recompute reads the tables or
+waits and applies its increment on top of the corrected value.
+
+Env config:
+    SPEND_RECONCILE_MONTHS     Months (including the current one) the reconcile job recomputes (default 2)
+    BUDGET_RESERVATION_TTL_S   Age after which an open reservation is released (default 7200)
+"""
+import os
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from config.database import engine
+from models.calls import CallRecord
+from models.compliance import BudgetReservation, CostEvent, TenantSpendMonthly
+
+logger = logging.getLogger(__name__)
+
+
+SPEND_RECONCILE_MONTHS = int(os.getenv("SPEND_RECONCILE_MONTHS", "2"))
+BUDGET_RESERVATION_TTL_S = int(os.getenv("BUDGET_RESERVATION_TTL_S", "7200"))
+
+UNATTRIBUTED = 0  # tenant_spend_monthly.tenant_id for cost events without a tenant
+
+
+def month_start(ts: Optional[datetime] = None) -> date:
+    """First day of the (UTC) month containing ts (default: now)"""
+    ts = ts or datetime.now(timezone.utc)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc)
+    return date(ts.year, ts.month, 1)
+
+
+def _month_bounds(month: date) -> Tuple[datetime, datetime]:
+    start = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    if month.month == 12:
+        end = datetime(month.year + 1, 1, 1, tzinfo=timezone.utc)
+    else:
+        end = datetime(month.year, month.month + 1, 1, tzinfo=timezone.utc)
+    return start, end
+
+
+def _previous_month(month: date) -> date:
+    return date(month.year - 1, 12, 1) if month.month == 1 else date(month.year, month.month - 1, 1)
+
+
+def _ledger_key(tenant_id: Optional[int]) -> int:
+    return UNATTRIBUTED if tenant_id is None else int(tenant_id)
+
+
+def _upsert_stmt(rows, increment: bool):
+    """INSERT ... ON CONFLICT (tenant_id, month) DO UPDATE for the current dialect"""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    table = TenantSpendMonthly.__table__
+    stmt = insert(table).values(rows)
+    excluded = stmt.excluded
+    if increment:
+        set_ = {
+            "spent_cents": table.c.spent_cents + excluded.spent_cents,
+            "events": table.c.events + excluded.events,
+            "updated_at": excluded.updated_at,
+        }
+    else:
+        set_ = {
+            "spent_cents": excluded.spent_cents,
+            "reserved_cents": excluded.reserved_cents,
+            "events": excluded.events,
+            "updated_at": excluded.updated_at,
+            "reconciled_at": excluded.reconciled_at,
+        }
+    return stmt.on_conflict_do_update(index_elements=[table.c.tenant_id, table.c.month], set_=set_)
+
+
+def record_cost(
+    session: Session,
+    tenant_id: Optional[int],
+    component: str,
+    amount_cents: int,
+    currency: str = "USD",
+    call_id: Optional[int] = None,
+    ts: Optional[datetime] = None,
+) -> CostEvent:
+    """Record a cost event and add it to the tenant's monthly counter (caller commits)
+
+    Args:
+        session: Session whose transaction both writes join
+        tenant_id: Tenant charged (None for unattributed costs)
+        component: telephony | llm | stt | tts | call (settled call cost)
+        amount_cents: Cost in cents
+        currency: ISO currency code
+        call_id: Related call, if any
+        ts: Time of the cost (default: now)
+
+    Returns:
+        The added CostEvent
+    """
+    ts = ts or datetime.now(timezone.utc)
+    event = CostEvent(
+        tenant_id=tenant_id,
+        call_id=call_id,
+        component=component,
+        amount=int(amount_cents),
+        currency=currency,
+        ts=ts,
+    )
+    session.add(event)
+    session.execute(_upsert_stmt([{
+        "tenant_id": _ledger_key(tenant_id),
+        "month": month_start(ts),
+        "spent_cents": int(amount_cents),
+        "reserved_cents": 0,
+        "events": 1,
+        "updated_at": datetime.now(timezone.utc),
+    }], increment=True))
+    return event
+
+
+def tenant_monthly_spend_cents(
+    session: Session,
+    tenant_id: Optional[int],
+    month: Optional[date] = None,
+    include_reserved: bool = False,
+) -> int:
+    """Spend of a tenant in a month (default: current) from the ledger
+
+    Args:
+        session: DB session
+        tenant_id: Tenant; None returns the total across all tenants
+        month: First day of the month
+        include_reserved: Add the cost held by calls in flight
+
+    Returns:
+        Spend in cents
+    """
+    month = month or month_start()
+    total = TenantSpendMonthly.spent_cents
+    if include_reserved:
+        total = total + TenantSpendMonthly.reserved_cents
+    q = session.query(func.coalesce(func.sum(total), 0)).filter(TenantSpendMonthly.month == month)
+    if tenant_id is not None:
+        q = q.filter(TenantSpendMonthly.tenant_id == int(tenant_id))
+    return int(q.scalar() or 0)
+
+
+def _cost_day():
+    """UTC calendar day of CostEvent.ts as a SQL expression"""
+    if engine.dialect.name == "postgresql":
+        return func.date(func.timezone("UTC", CostEvent.ts))
+    return func.date(CostEvent.ts)
+
+
+def cost_breakdown(
+    session: Session,
+    tenant_id: Optional[int],
+    start: datetime,
+    end: datetime,
+) -> List[Dict[str, Any]]:
+    """Costs per UTC day and component in [start, end), summed in SQL
+
+    Uses the (tenant_id, ts) index; cost is proportional to the events in the range.
+
+    Args:
+        session: DB session
+        tenant_id: Tenant; None covers every tenant
+        start: Range start (inclusive)
+        end: Range end (exclusive)
+
+    Returns:
+        Rows with day (YYYY-MM-DD), component, currency, amount_cents and events, ordered by day
+    """
+    day = _cost_day()
+    q = (
+        session.query(
+            day.label("day"),
+            CostEvent.component,
+            CostEvent.currency,
+            func.sum(CostEvent.amount),
+            func.count(CostEvent.id),
+        )
+        .filter(CostEvent.ts >= start, CostEvent.ts < end)
+    )
+    if tenant_id is not None:
+        q = q.filter(CostEvent.tenant_id == int(tenant_id))
+    q = q.group_by(day, CostEvent.component, CostEvent.currency).order_by(day, CostEvent.component)
+    return [
+        {
+            "day": str(d),
+            "component": component,
+            "currency": currency,
+            "amount_cents": int(total or 0),
+            "events": int(count or 0),
+        }
+        for d, component, currency, total, count in q
+    ]
+
+
+def reserve_budget(
+    session: Session,
+    tenant_id: Optional[int],
+    amount_cents: int,
+    cap_cents: Optional[int] = None,
+    dial_delay_s: float = 0,
+) -> Optional[BudgetReservation]:
+    """Hold amount_cents of the tenant's current month for a call about to be placed (caller commits)
+
+    Args:
+        session: DB session
+        tenant_id: Tenant charged
+        amount_cents: Estimated cost of the call
+        cap_cents: Monthly cap; the reservation fails if spent + reserved + amount would exceed it
+        dial_delay_s: How long until the call is dialed (queued batch items); the reservation
+            expires BUDGET_RESERVATION_TTL_S after the scheduled dial
+
+    Returns:
+        The reservation, or None if the cap does not allow it
+    """
+    key = _ledger_key(tenant_id)
+    month = month_start()
+    amount = max(0, int(amount_cents or 0))
+    now = datetime.now(timezone.utc)
+    session.execute(_upsert_stmt([{
+        "tenant_id": key, "month": month, "spent_cents": 0, "reserved_cents": 0, "events": 0, "updated_at": now,
+    }], increment=True))
+    ledger = TenantSpendMonthly.__table__
+    stmt = (
+        update(ledger)
+        .where(ledger.c.tenant_id == key, ledger.c.month == month)
+        .values(reserved_cents=ledger.c.reserved_cents + amount, updated_at=now)
+    )
+    if cap_cents is not None:
+        # Checked and applied in one statement: the row lock serializes concurrent reservations
+        stmt = stmt.where(ledger.c.spent_cents + ledger.c.reserved_cents + amount <= int(cap_cents))
+    if session.execute(stmt).rowcount != 1:
+        return None
+    reservation = BudgetReservation(
+        tenant_id=key,
+        month=month,
+        amount_cents=amount,
+        status="reserved",
+        created_at=now,
+        expires_at=now + timedelta(seconds=max(0.0, float(dial_delay_s or 0)) + BUDGET_RESERVATION_TTL_S),
+    )
+    session.add(reservation)
+    session.flush()
+    return reservation
+
+
+def attach_reservation(session: Session, reservation_id: Optional[int], provider_call_id: Optional[str]) -> None:
+    """Link a reservation to the call placed with it (so call.finished can settle it)"""
+    if reservation_id is None or not provider_call_id:
+        return
+    session.execute(
+        update(BudgetReservation)
+        .where(BudgetReservation.id == reservation_id)
+        .values(provider_call_id=str(provider_call_id))
+    )
+
+
+def _close_reservation(session: Session, reservation: BudgetReservation, status: str, actual_cents: Optional[int]) -> bool:
+    now = datetime.now(timezone.utc)
+    closed = session.execute(
+        update(BudgetReservation)
+        .where(BudgetReservation.id == reservation.id, BudgetReservation.status == "reserved")
+        .values(status=status, actual_cents=actual_cents, closed_at=now)
+    ).rowcount == 1
+    if not closed:
+        return False  # already settled or released (duplicate webhook, retry)
+    ledger = TenantSpendMonthly.__table__
+    session.execute(
+        update(ledger)
+        .where(ledger.c.tenant_id == reservation.tenant_id, ledger.c.month == reservation.month)
+        .values(reserved_cents=ledger.c.reserved_cents - reservation.amount_cents, updated_at=now)
+    )
+    return True
+
+
+def release_reservation(session: Session, reservation_id: Optional[int]) -> bool:
+    """Return a reservation's amount to the budget (the call was not placed); caller commits
+
+    Returns:
+        True if the reservation was open
+    """
+    if reservation_id is None:
+        return False
+    reservation = session.get(BudgetReservation, reservation_id)
+    if reservation is None:
+        return False
+    return _close_reservation(session, reservation, "released", None)
+
+
+def _call_already_costed(session: Session, provider_call_id: str, call_id: Optional[int]) -> bool:
+    """Whether a call's actual cost is already in cost_events (settled reservation or "call" event)"""
+    settled = session.query(BudgetReservation.id).filter(
+        BudgetReservation.provider_call_id == provider_call_id,
+        BudgetReservation.status == "settled",
+        BudgetReservation.actual_cents > 0,
+    ).first()
+    if settled is not None:
+        return True
+    if call_id is None:
+        return False
+    return session.query(CostEvent.id).filter(
+        CostEvent.call_id == call_id, CostEvent.component == "call"
+    ).first() is not None
+
+
+def settle_reservation(session: Session, provider_call_id: Optional[str], actual_cents: Optional[int]) -> bool:
+    """Record a finished call's actual cost, replacing its reservation if it has one (caller commits)
+
+    Calls placed without a reservation (inline paths, reservations already expired,
+    calls first seen by the call sync) are costed too. A call is costed at most once:
+    the call row is locked while checking, and the cost event carries its call id.
+
+    Args:
+        session: DB session
+        provider_call_id: Retell call id
+        actual_cents: Final call cost (None or 0 releases the reservation without a cost)
+
+    Returns:
+        True if a reservation was settled or the cost recorded
+    """
+    if not provider_call_id:
+        return False
+    provider_call_id = str(provider_call_id)
+    actual = int(actual_cents) if actual_cents else 0
+    # Serializes concurrent settles of the same call (webhook and call sync)
+    call = session.execute(
+        select(CallRecord.id, CallRecord.tenant_id)
+        .where(CallRecord.provider_call_id == provider_call_id)
+        .with_for_update()
+    ).first()
+    call_id = call.id if call is not None else None
+    costed = _call_already_costed(session, provider_call_id, call_id)
+
+    reservation = (
+        session.query(BudgetReservation)
+        .filter(BudgetReservation.provider_call_id == provider_call_id, BudgetReservation.status == "reserved")
+        .order_by(BudgetReservation.id.desc())
+        .first()
+    )
+    if reservation is not None:
+        if not _close_reservation(session, reservation, "settled", 0 if costed else actual):
+            return False
+        tenant_id = reservation.tenant_id if reservation.tenant_id != UNATTRIBUTED else None
+    elif call is not None:
+        tenant_id = call.tenant_id
+    else:
+        return False  # unknown call: nothing to dedupe against, the call sync costs it once the row exists
+    if actual > 0 and not costed:
+        record_cost(session, tenant_id, component="call", amount_cents=actual, call_id=call_id)
+        return True
+    return reservation is not None
+
+
+def expire_reservations(session: Session, ttl_s: int = BUDGET_RESERVATION_TTL_S) -> int:
+    """Release reservations past their expiry (calls that never reported back); caller commits
+
+    Reservations without expires_at (created before it existed) expire ttl_s after creation.
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(seconds=ttl_s)
+    stale = (
+        session.query(BudgetReservation)
+        .filter(
+            BudgetReservation.status == "reserved",
+            or_(
+                BudgetReservation.expires_at < now,
+                and_(BudgetReservation.expires_at.is_(None), BudgetReservation.created_at < cutoff),
+            ),
+        )
+        .all()
+    )
+    return sum(1 for r in stale if _close_reservation(session, r, "released", None))
+
+
+def reconcile_spend_ledger(months: int = SPEND_RECONCILE_MONTHS) -> Dict[str, int]:
+    """Expire stale reservations, then recompute the counters of the last `months` months
+
+    Spent counters are recomputed from cost_events, reserved counters from open reservations.
+
+    Returns:
+        Counts: reservations expired, rows checked and rows corrected
+    """
+    stats = {"expired": 0, "checked": 0, "corrected": 0}
+    month = month_start()
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        stats["expired"] = expire_reservations(session)
+        session.commit()
+        for _ in range(max(1, months)):
+            start, end = _month_bounds(month)
+            spent_q = (
+                select(
+                    func.coalesce(CostEvent.tenant_id, UNATTRIBUTED),
+                    func.sum(CostEvent.amount),
+                    func.count(CostEvent.id),
+                )
+                .where(CostEvent.ts >= start, CostEvent.ts < end)
+                .group_by(func.coalesce(CostEvent.tenant_id, UNATTRIBUTED))
+            )
+            reserved_q = (
+                select(BudgetReservation.tenant_id, func.sum(BudgetReservation.amount_cents))
+                .where(BudgetReservation.month == month, BudgetReservation.status == "reserved")
+                .group_by(BudgetReservation.tenant_id)
+            )
+
+            # Every tenant with activity gets a ledger row first, so all of them can be locked
+            tenants = {t for t, _, _ in session.execute(spent_q)} | {t for t, _ in session.execute(reserved_q)}
+            if tenants:
+                session.execute(_upsert_stmt([
+                    {"tenant_id": t, "month": month, "spent_cents": 0, "reserved_cents": 0, "events": 0, "updated_at": now}
+                    for t in sorted(tenants)
+                ], increment=True))
+                session.commit()
+
+            # Lock the month's rows (in tenant order), then recompute: writers that committed
+            # before the lock are in the sums, later ones wait and increment the corrected rows
+            ledger = {
+                row.tenant_id: (int(row.spent_cents or 0), int(row.events or 0), int(row.reserved_cents or 0))
+                for row in session.query(TenantSpendMonthly)
+                .filter(TenantSpendMonthly.month == month)
+                .order_by(TenantSpendMonthly.tenant_id)
+                .with_for_update()
+            }
+            spent = {tenant: (int(total or 0), int(count or 0)) for tenant, total, count in session.execute(spent_q)}
+            reserved = {tenant: int(total or 0) for tenant, total in session.execute(reserved_q)}
+            rows = []
+            for tenant in ledger:  # a tenant whose row appeared after the lock is left to the next run
+                stats["checked"] += 1
+                expected = spent.get(tenant, (0, 0)) + (reserved.get(tenant, 0),)
+                if ledger.get(tenant) != expected:
+                    logger.warning(
+                        "[spend_ledger] tenant %s %s: ledger %s, actual %s (spent, events, reserved); correcting",
+                        tenant, month.isoformat(), ledger.get(tenant), expected,
+                    )
+                    rows.append({
+                        "tenant_id": tenant,
+                        "month": month,
+                        "spent_cents": expected[0],
+                        "events": expected[1],
+                        "reserved_cents": expected[2],
+                        "updated_at": now,
+                        "reconciled_at": now,
+                    })
+            if rows:
+                session.execute(_upsert_stmt(rows, increment=False))
+                stats["corrected"] += len(rows)
+            session.query(TenantSpendMonthly).filter(TenantSpendMonthly.month == month).update(
+                {TenantSpendMonthly.reconciled_at: now}, synchronize_session=False
+            )
+            session.commit()
+            month = _previous_month(month)
+    logger.info("[spend_ledger] reconcile done: %s", stats)
+    return stats
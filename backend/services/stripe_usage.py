@@ -0,0 +1,268 @@
+"""Report metered usage (billed call minutes) to Stripe
+
+Every finished call with billed minutes adds a usage_events row
+(record_call_usage). report_usage_to_stripe(), run by the worker, turns the
+unsynced rows into Stripe usage records:
+- rows are aggregated in SQL per tenant and closed time window
+  (STRIPE_USAGE_WINDOW_S); the open window is left for the next run
+- each tenant maps to the metered item of its latest subscription, and one usage
+  record (action=increment) is sent per subscription item and window
+- every record carries an idempotency key derived from the item, the window and
+  the id range of the rows it covers, so a run that dies between the Stripe call
+  and the commit re-sends the same key and Stripe doesn't count it twice
+- the rows are then marked with one set-based UPDATE per aggregate
+
+usage_events.synced_to_stripe: 0 pending, 1 reported, 2 not billable (no
+tenant or no subscription with a Stripe id, subscription canceled). Rows of a
+tenant whose metered item can't be resolved stay pending and are retried.
+
+Usage records are the legacy metered billing API: it needs stripe>=10.8,<12
+(pinned in requirements.txt); _stripe() refuses to run on an SDK without it
+rather than leaving every row pending. Only Stripe errors count an aggregate as
+failed (rows stay pending and are retried with the same key); anything else
+aborts the run.
+
+STRIPE_API_BASE points the client at a local Stripe stub (e.g. stripe-mock on
+http://localhost:12111) for tests and staging.
+
+Env config:
+    STRIPE_API_KEY                Stripe secret key (reporting is skipped when empty)
+    STRIPE_API_BASE               Override the Stripe API base URL (default: Stripe)
+    STRIPE_PRICE_MINUTES          Metered price of call minutes (default: first metered item of the subscription)
+    STRIPE_USAGE_WINDOW_S         Aggregation window in seconds (default 3600)
+    STRIPE_USAGE_MAX_AGGREGATES   Usage records sent per run at most (default 500)
+"""
+import os
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import cast, func, update, Integer
+from sqlalchemy.orm import Session
+
+from config.database import engine
+from models.billing import Subscription, UsageEvent
+from models.calls import CallRecord
+from services.usage_rollup import billed_minutes
+
+logger = logging.getLogger(__name__)
+
+
+STRIPE_PRICE_MINUTES = os.getenv("STRIPE_PRICE_MINUTES", "")
+STRIPE_USAGE_WINDOW_S = max(60, int(os.getenv("STRIPE_USAGE_WINDOW_S", "3600")))
+STRIPE_USAGE_MAX_AGGREGATES = int(os.getenv("STRIPE_USAGE_MAX_AGGREGATES", "500"))
+
+USAGE_PENDING = 0
+USAGE_REPORTED = 1
+USAGE_NOT_BILLABLE = 2
+
+
+def _stripe():
+    """The stripe module configured from env, or None when Stripe isn't configured
+
+    Raises:
+        RuntimeError: The installed stripe-python has no usage records API
+    """
+    api_key = os.getenv("STRIPE_API_KEY", "")
+    if not api_key:
+        return None
+    import stripe
+
+    if not hasattr(getattr(stripe, "SubscriptionItem", None), "create_usage_record"):
+        # Legacy usage records were removed in stripe-python 12 (API 2025-03-31.basil)
+        raise RuntimeError(
+            "stripe %s has no SubscriptionItem.create_usage_record; install stripe>=10.8,<12"
+            % getattr(stripe, "VERSION", "?")
+        )
+    stripe.api_key = api_key
+    api_base = os.getenv("STRIPE_API_BASE")
+    if api_base:
+        stripe.api_base = api_base
+    return stripe
+
+
+def record_call_usage(session: Session, rec: CallRecord) -> None:
+    """Add the usage event of a finished call (caller commits)
+
+    Call once per call (on the transition to ended); calls without billed minutes
+    are not recorded.
+    """
+    minutes = billed_minutes(rec.duration_seconds)
+    if minutes <= 0:
+        return
+    if rec.id is None:
+        session.flush()
+    session.add(UsageEvent(
+        tenant_id=rec.tenant_id,
+        call_id=rec.id,
+        minutes_billed=minutes,
+        ts=datetime.now(timezone.utc),
+        synced_to_stripe=USAGE_PENDING,
+    ))
+
+
+def metered_item_id(subscription: Any) -> Optional[str]:
+    """Subscription item of the minutes price in a Stripe subscription object
+
+    Args:
+        subscription: Stripe subscription (object or webhook payload dict)
+
+    Returns:
+        The item id, or None if the subscription has no matching metered item
+    """
+    items = ((subscription or {}).get("items") or {}).get("data") or []
+    for item in items:
+        price = item.get("price") or {}
+        if STRIPE_PRICE_MINUTES:
+            if price.get("id") == STRIPE_PRICE_MINUTES:
+                return item.get("id")
+        elif (price.get("recurring") or {}).get("usage_type") == "metered":
+            return item.get("id")
+    return None
+
+
+def _window_expr():
+    """Index of the STRIPE_USAGE_WINDOW_S window of UsageEvent.ts as a SQL expression"""
+    if engine.dialect.name == "postgresql":
+        return cast(func.floor(func.extract("epoch", UsageEvent.ts) / STRIPE_USAGE_WINDOW_S), Integer)
+    return cast(func.strftime("%s", UsageEvent.ts), Integer) // STRIPE_USAGE_WINDOW_S
+
+
+def _pending_aggregates(session: Session, before_window: int) -> List[Tuple[Optional[int], int, int, int, int, int]]:
+    """(tenant_id, window, minutes, rows, min_id, max_id) of pending rows in closed windows"""
+    window = _window_expr()
+    q = (
+        session.query(
+            UsageEvent.tenant_id,
+            window,
+            func.sum(UsageEvent.minutes_billed),
+            func.count(UsageEvent.id),
+            func.min(UsageEvent.id),
+            func.max(UsageEvent.id),
+        )
+        .filter(UsageEvent.synced_to_stripe == USAGE_PENDING, window < before_window)
+        .group_by(UsageEvent.tenant_id, window)
+        .order_by(window)
+    )
+    return [
+        (tenant_id, int(w), int(minutes or 0), int(rows), int(min_id), int(max_id))
+        for tenant_id, w, minutes, rows, min_id, max_id in q
+    ]
+
+
+def _latest_subscriptions(session: Session, tenant_ids: List[int]) -> Dict[int, Subscription]:
+    subs: Dict[int, Subscription] = {}
+    if not tenant_ids:
+        return subs
+    for sub in (
+        session.query(Subscription)
+        .filter(Subscription.tenant_id.in_(tenant_ids))
+        .order_by(Subscription.id)
+    ):
+        subs[sub.tenant_id] = sub
+    return subs
+
+
+def _resolve_item(stripe, session: Session, sub: Subscription) -> Optional[str]:
+    """Metered item of a subscription, looked up in Stripe once and stored"""
+    if sub.stripe_usage_item_id:
+        return sub.stripe_usage_item_id
+    try:
+        item_id = metered_item_id(stripe.Subscription.retrieve(sub.stripe_subscription_id))
+    except Exception as e:
+        logger.warning("[stripe_usage] could not retrieve subscription %s: %s", sub.stripe_subscription_id, e)
+        return None
+    if item_id:
+        sub.stripe_usage_item_id = item_id
+        session.commit()
+    else:
+        logger.warning("[stripe_usage] subscription %s has no metered minutes item", sub.stripe_subscription_id)
+    return item_id
+
+
+def _mark(session: Session, tenant_ids: List[Optional[int]], window: int, max_id: int, status: int) -> int:
+    """Set-based status update of the pending rows of one aggregate"""
+    start = datetime.fromtimestamp(window * STRIPE_USAGE_WINDOW_S, tz=timezone.utc)
+    end = datetime.fromtimestamp((window + 1) * STRIPE_USAGE_WINDOW_S, tz=timezone.utc)
+    tenant_filter = (
+        UsageEvent.tenant_id.is_(None) if tenant_ids == [None]
+        else UsageEvent.tenant_id.in_([t for t in tenant_ids if t is not None])
+    )
+    result = session.execute(
+        update(UsageEvent)
+        .where(
+            UsageEvent.synced_to_stripe == USAGE_PENDING,
+            tenant_filter,
+            UsageEvent.ts >= start,
+            UsageEvent.ts < end,
+            UsageEvent.id <= max_id,
+        )
+        .values(synced_to_stripe=status)
+        .execution_options(synchronize_session=False)
+    )
+    return int(result.rowcount or 0)
+
+
+def report_usage_to_stripe(max_aggregates: int = STRIPE_USAGE_MAX_AGGREGATES) -> Dict[str, int]:
+    """Send the pending usage of closed windows to Stripe
+
+    Returns:
+        Counts: usage records sent, rows reported, rows marked not billable,
+        aggregates skipped (item not resolved) and failed (Stripe error)
+
+    Raises:
+        RuntimeError: The installed stripe-python has no usage records API
+    """
+    stats = {"records": 0, "reported": 0, "not_billable": 0, "skipped": 0, "failed": 0}
+    stripe = _stripe()
+    if stripe is None:
+        logger.info("[stripe_usage] STRIPE_API_KEY not set, skipping")
+        return stats
+
+    now_window = int(datetime.now(timezone.utc).timestamp()) // STRIPE_USAGE_WINDOW_S
+    with Session(engine) as session:
+        aggregates = _pending_aggregates(session, now_window)
+        subs = _latest_subscriptions(session, sorted({t for t, *_ in aggregates if t is not None}))
+
+        # tenant aggregates -> one aggregate per (subscription item, window)
+        by_item: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        for tenant_id, window, minutes, rows, min_id, max_id in aggregates:
+            sub = subs.get(tenant_id) if tenant_id is not None else None
+            if sub is None or not sub.stripe_subscription_id or sub.status == "canceled":
+                stats["not_billable"] += _mark(session, [tenant_id], window, max_id, USAGE_NOT_BILLABLE)
+                continue
+            item_id = _resolve_item(stripe, session, sub)
+            if not item_id:
+                stats["skipped"] += 1
+                continue
+            agg = by_item.setdefault((item_id, window), {"tenants": [], "minutes": 0, "rows": 0, "min_id": min_id, "max_id": max_id})
+            agg["tenants"].append(tenant_id)
+            agg["minutes"] += minutes
+            agg["rows"] += rows
+            agg["min_id"] = min(agg["min_id"], min_id)
+            agg["max_id"] = max(agg["max_id"], max_id)
+        session.commit()
+
+        for (item_id, window), agg in list(by_item.items())[:max(1, int(max_aggregates))]:
+            if agg["minutes"] > 0:
+                try:
+                    stripe.SubscriptionItem.create_usage_record(
+                        item_id,
+                        quantity=agg["minutes"],
+                        timestamp=window * STRIPE_USAGE_WINDOW_S,
+                        action="increment",
+                        idempotency_key=f"usage-{item_id}-{window}-{agg['min_id']}-{agg['max_id']}-{agg['rows']}",
+                    )
+                except stripe.StripeError as e:
+                    logger.warning("[stripe_usage] usage record for %s (window %s) failed: %s", item_id, window, e)
+                    stats["failed"] += 1
+                    continue
+                stats["records"] += 1
+            marked = _mark(session, agg["tenants"], window, agg["max_id"], USAGE_REPORTED)
+            session.commit()
+            if marked != agg["rows"]:
+                logger.warning("[stripe_usage] %s (window %s): reported %s rows, marked %s", item_id, window, agg["rows"], marked)
+            stats["reported"] += marked
+
+    logger.info("[stripe_usage] %s", stats)
+    return stats
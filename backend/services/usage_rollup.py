@@ -0,0 +1,299 @@
+"""Daily per-tenant usage rollups (usage_daily, usage_daily_outcomes)
+
+Billing and dashboard endpoints used to scan calls (or usage_events) for every
+request. They now read one row per tenant and day:
+- usage_daily: calls created, calls finished, billed seconds and minutes (per call,
+  rounded up), call cost
+- usage_daily_outcomes: calls per disposition outcome
+
+Calls are attributed to the UTC day they were created. Counters are updated
+incrementally while webhooks are processed (rollup_call_created,
+rollup_call_finished, in the caller's transaction) and recomputed from calls by
+the worker (rebuild_usage_daily, under row locks so racing increments are kept),
+which also corrects what the incremental path can't see: calls inserted by the
+Retell call sync, dispositions edited later, duplicate deliveries.
+
+Env config:
+    USAGE_ROLLUP_DAYS   Days (including today) the periodic rebuild recomputes (default 3)
+"""
+import os
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func
+from sqlalchemy.orm import Session
+
+from config.database import engine
+from models.billing import UsageDaily, UsageDailyOutcome
+from models.calls import CallRecord
+
+logger = logging.getLogger(__name__)
+
+
+USAGE_ROLLUP_DAYS = int(os.getenv("USAGE_ROLLUP_DAYS", "3"))
+
+UNATTRIBUTED = 0  # usage_daily.tenant_id for calls without a tenant
+
+
+def _insert():
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def _utc_day(ts: Optional[datetime]) -> date:
+    ts = ts or datetime.now(timezone.utc)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc)
+    return ts.date()
+
+
+def _created_day_expr():
+    """UTC day of CallRecord.created_at as a SQL expression"""
+    if engine.dialect.name == "postgresql":
+        return func.date(func.timezone("UTC", CallRecord.created_at))
+    return func.date(CallRecord.created_at)
+
+
+def billed_minutes(duration_seconds: Optional[int]) -> int:
+    """Minutes billed for a call (started minutes)"""
+    seconds = int(duration_seconds or 0)
+    return (seconds + 59) // 60 if seconds > 0 else 0
+
+
+def _add(session: Session, tenant_id: Optional[int], day: date, **counters: int) -> None:
+    """Add to a tenant-day row (INSERT ... ON CONFLICT DO UPDATE col = col + value)"""
+    table = UsageDaily.__table__
+    values = {
+        "tenant_id": UNATTRIBUTED if tenant_id is None else int(tenant_id),
+        "day": day,
+        "calls_created": 0,
+        "calls_finished": 0,
+        "billed_seconds": 0,
+        "minutes_billed": 0,
+        "cost_cents": 0,
+        "updated_at": datetime.now(timezone.utc),
+    }
+    values.update(counters)
+    stmt = _insert()(table).values(values)
+    set_ = {name: table.c[name] + stmt.excluded[name] for name in counters}
+    set_["updated_at"] = stmt.excluded.updated_at
+    session.execute(stmt.on_conflict_do_update(index_elements=[table.c.tenant_id, table.c.day], set_=set_))
+
+
+def _add_outcome(session: Session, tenant_id: Optional[int], day: date, outcome: str, calls: int = 1) -> None:
+    table = UsageDailyOutcome.__table__
+    stmt = _insert()(table).values(
+        tenant_id=UNATTRIBUTED if tenant_id is None else int(tenant_id),
+        day=day,
+        outcome=str(outcome)[:64],
+        calls=calls,
+    )
+    session.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.tenant_id, table.c.day, table.c.outcome],
+        set_={"calls": table.c.calls + stmt.excluded.calls},
+    ))
+
+
+def rollup_call_created(session: Session, tenant_id: Optional[int], created_at: Optional[datetime] = None) -> None:
+    """Count a new call (caller commits, together with the CallRecord)"""
+    try:
+        with session.begin_nested():  # a failed rollup must not abort the caller's transaction
+            _add(session, tenant_id, _utc_day(created_at), calls_created=1)
+    except Exception as e:
+        logger.warning("[usage_rollup] could not count created call: %s", e)
+
+
+def rollup_call_finished(session: Session, rec: CallRecord, outcome: Optional[str] = None) -> None:
+    """Count a call that just ended: duration, billed minutes, cost and outcome (caller commits)
+
+    Call once per call (on the transition to ended).
+    """
+    try:
+        day = _utc_day(rec.created_at)
+        with session.begin_nested():
+            _add(
+                session,
+                rec.tenant_id,
+                day,
+                calls_finished=1,
+                billed_seconds=int(rec.duration_seconds or 0),
+                minutes_billed=billed_minutes(rec.duration_seconds),
+                cost_cents=int(rec.call_cost_cents or 0),
+            )
+            if outcome:
+                _add_outcome(session, rec.tenant_id, day, outcome)
+    except Exception as e:
+        logger.warning("[usage_rollup] could not count finished call %s: %s", rec.provider_call_id, e)
+
+
+def _recompute_usage(session: Session, start: datetime) -> Dict[Tuple[int, date], Dict[str, int]]:
+    """usage_daily counters per (tenant, day) recomputed from calls created since start"""
+    day = _created_day_expr()
+    tenant = func.coalesce(CallRecord.tenant_id, UNATTRIBUTED)
+    ended = CallRecord.status == "ended"
+    duration = func.coalesce(CallRecord.duration_seconds, 0)
+    return {
+        (int(t), date.fromisoformat(str(d))): {
+            "calls_created": int(created or 0),
+            "calls_finished": int(finished or 0),
+            "billed_seconds": int(seconds or 0),
+            "minutes_billed": int(minutes or 0),
+            "cost_cents": int(cost or 0),
+        }
+        for t, d, created, finished, seconds, minutes, cost in session.query(
+            tenant,
+            day,
+            func.count(CallRecord.id),
+            func.sum(case((ended, 1), else_=0)),
+            func.sum(case((ended, duration), else_=0)),
+            func.sum(case((ended & (duration > 0), (duration + 59) // 60), else_=0)),
+            func.sum(case((ended, func.coalesce(CallRecord.call_cost_cents, 0)), else_=0)),
+        )
+        .filter(CallRecord.created_at >= start)
+        .group_by(tenant, day)
+    }
+
+
+def _recompute_outcomes(session: Session, start: datetime) -> Dict[Tuple[int, date, str], int]:
+    """usage_daily_outcomes counters per (tenant, day, outcome) recomputed from calls created since start"""
+    day = _created_day_expr()
+    tenant = func.coalesce(CallRecord.tenant_id, UNATTRIBUTED)
+    return {
+        (int(t), date.fromisoformat(str(d)), str(outcome)[:64]): int(n)
+        for t, d, outcome, n in session.query(tenant, day, CallRecord.disposition_outcome, func.count(CallRecord.id))
+        .filter(CallRecord.created_at >= start, CallRecord.disposition_outcome.isnot(None))
+        .group_by(tenant, day, CallRecord.disposition_outcome)
+    }
+
+
+def rebuild_usage_daily(days: int = USAGE_ROLLUP_DAYS) -> Dict[str, int]:
+    """Recompute the rollups of the last `days` days (today included) from calls
+
+    Use a large `days` to backfill history. The rollup rows of the range are locked
+    (SELECT ... FOR UPDATE) before recomputing, so an increment racing with the
+    rebuild either commits before the recompute reads calls or waits and is applied
+    on top of the recomputed value.
+
+    Returns:
+        Counts: days rebuilt, usage rows and outcome rows written
+    """
+    days = max(1, int(days))
+    start_day = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    start = datetime.combine(start_day, datetime.min.time()).replace(tzinfo=timezone.utc)
+    now = datetime.now(timezone.utc)
+    insert = _insert()
+    usage_table = UsageDaily.__table__
+    outcome_table = UsageDailyOutcome.__table__
+
+    with Session(engine) as session:
+        # Make sure every (tenant, day) with calls has a row, so all of them can be locked
+        keys = sorted(set(_recompute_usage(session, start)) | {(t, d) for t, d, _ in _recompute_outcomes(session, start)})
+        for i in range(0, len(keys), 1000):
+            session.execute(
+                insert(usage_table).values([
+                    {"tenant_id": t, "day": d, "calls_created": 0, "calls_finished": 0, "billed_seconds": 0,
+                     "minutes_billed": 0, "cost_cents": 0, "updated_at": now}
+                    for t, d in keys[i:i + 1000]
+                ]).on_conflict_do_nothing(index_elements=[usage_table.c.tenant_id, usage_table.c.day])
+            )
+        session.commit()
+
+        # Lock (usage rows first, like rollup_call_finished), then recompute
+        locked = {
+            (t, d) for t, d in session.query(UsageDaily.tenant_id, UsageDaily.day)
+            .filter(UsageDaily.day >= start_day)
+            .order_by(UsageDaily.tenant_id, UsageDaily.day)
+            .with_for_update()
+        }
+        locked_outcomes = {
+            (t, d, o) for t, d, o in session.query(UsageDailyOutcome.tenant_id, UsageDailyOutcome.day, UsageDailyOutcome.outcome)
+            .filter(UsageDailyOutcome.day >= start_day)
+            .order_by(UsageDailyOutcome.tenant_id, UsageDailyOutcome.day, UsageDailyOutcome.outcome)
+            .with_for_update()
+        }
+        usage = _recompute_usage(session, start)
+        outcomes = _recompute_outcomes(session, start)
+
+        # Rows that appeared after the lock are left to the next run
+        zero = {"calls_created": 0, "calls_finished": 0, "billed_seconds": 0, "minutes_billed": 0, "cost_cents": 0}
+        usage_rows = [
+            {"tenant_id": t, "day": d, **usage.get((t, d), zero), "updated_at": now}
+            for t, d in sorted(locked)
+        ]
+        for i in range(0, len(usage_rows), 1000):
+            stmt = insert(usage_table).values(usage_rows[i:i + 1000])
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=[usage_table.c.tenant_id, usage_table.c.day],
+                set_={name: stmt.excluded[name] for name in (*zero, "updated_at")},
+            ))
+        outcome_rows = [
+            {"tenant_id": t, "day": d, "outcome": o, "calls": n}
+            for (t, d, o), n in sorted(outcomes.items())
+            if (t, d) in locked
+        ]
+        for i in range(0, len(outcome_rows), 1000):
+            stmt = insert(outcome_table).values(outcome_rows[i:i + 1000])
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=[outcome_table.c.tenant_id, outcome_table.c.day, outcome_table.c.outcome],
+                set_={"calls": stmt.excluded.calls},
+            ))
+        for t, d, o in locked_outcomes - set(outcomes):
+            session.execute(delete(UsageDailyOutcome).where(
+                UsageDailyOutcome.tenant_id == t, UsageDailyOutcome.day == d, UsageDailyOutcome.outcome == o,
+            ))
+        session.commit()
+
+    stats = {"days": days, "usage_rows": len(usage_rows), "outcome_rows": len(outcome_rows)}
+    logger.info("[usage_rollup] rebuilt: %s", stats)
+    return stats
+
+
+def usage_by_day(
+    session: Session,
+    tenant_id: Optional[int],
+    start_day: date,
+    end_day: date,
+) -> List[Dict[str, Any]]:
+    """Rollup rows per day in [start_day, end_day] (summed over tenants when tenant_id is None)"""
+    q = session.query(
+        UsageDaily.day,
+        func.sum(UsageDaily.calls_created),
+        func.sum(UsageDaily.calls_finished),
+        func.sum(UsageDaily.billed_seconds),
+        func.sum(UsageDaily.minutes_billed),
+        func.sum(UsageDaily.cost_cents),
+    ).filter(UsageDaily.day >= start_day, UsageDaily.day <= end_day)
+    if tenant_id is not None:
+        q = q.filter(UsageDaily.tenant_id == int(tenant_id))
+    return [
+        {
+            "day": d,
+            "calls_created": int(created or 0),
+            "calls_finished": int(finished or 0),
+            "billed_seconds": int(seconds or 0),
+            "minutes_billed": int(minutes or 0),
+            "cost_cents": int(cost or 0),
+        }
+        for d, created, finished, seconds, minutes, cost in q.group_by(UsageDaily.day).order_by(UsageDaily.day)
+    ]
+
+
+def outcomes_between(
+    session: Session,
+    tenant_id: Optional[int],
+    start_day: date,
+    end_day: date,
+) -> Tuple[Dict[str, int], int]:
+    """Calls per outcome in [start_day, end_day], plus the total number of calls created"""
+    q = session.query(UsageDailyOutcome.outcome, func.sum(UsageDailyOutcome.calls)).filter(
+        UsageDailyOutcome.day >= start_day, UsageDailyOutcome.day <= end_day
+    )
+    if tenant_id is not None:
+        q = q.filter(UsageDailyOutcome.tenant_id == int(tenant_id))
+    outcomes = {outcome: int(n or 0) for outcome, n in q.group_by(UsageDailyOutcome.outcome)}
+    total = sum(row["calls_created"] for row in usage_by_day(session, tenant_id, start_day, end_day))
+    return outcomes, total
@@ -0,0 +1,172 @@
+"""Short-lived cache of compliance verdicts
+
+The same number is typically checked several times within minutes (UI indicator,
+outbound gating, batch gating). Verdicts are cached in-process keyed by
+everything they depend on:
+- tenant, number, and a fingerprint of the lead (consent, nature, quiet-hours
+  override, campaign, timezone) and of the request metadata
+- the country-rule index version and a fingerprint of the settings used
+- the tenant's verdict generation, bumped on DNC and campaign changes (shared
+  through Redis when available, re-read at most every COMPLIANCE_VERDICT_GEN_CHECK_S)
+- the minute of the evaluated instant, so quiet-hours answers never go stale
+
+Env config:
+    COMPLIANCE_VERDICT_CACHE_SIZE   Max cached verdicts (default 50000, 0 disables the cache)
+    COMPLIANCE_VERDICT_TTL_S        Max age of a cached verdict (default 120)
+    COMPLIANCE_VERDICT_GEN_CHECK_S  How often the shared generation is re-read (default 1)
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from utils.redis_client import get_redis
+
+
+COMPLIANCE_VERDICT_CACHE_SIZE = int(os.getenv("COMPLIANCE_VERDICT_CACHE_SIZE", "50000"))
+COMPLIANCE_VERDICT_TTL_S = float(os.getenv("COMPLIANCE_VERDICT_TTL_S", "120"))
+COMPLIANCE_VERDICT_GEN_CHECK_S = float(os.getenv("COMPLIANCE_VERDICT_GEN_CHECK_S", "1"))
+
+_GEN_KEY = "compliance:verdicts:gen:{}"
+_ALL_TENANTS = "all"  # tenant_id None checks see every tenant's DNC entries
+
+_CACHE: "OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_LOCK = threading.Lock()
+_LOCAL_GEN: Dict[str, int] = {}
+_SHARED_GEN: Dict[str, Tuple[float, str]] = {}  # tenant -> (checked_at, value)
+_STATS: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+
+def _tenant_key(tenant_id: Optional[int]) -> str:
+    return _ALL_TENANTS if tenant_id is None else str(int(tenant_id))
+
+
+def _generation(tenant_id: Optional[int]) -> str:
+    name = _tenant_key(tenant_id)
+    local = _LOCAL_GEN.get(name, 0)
+    r = get_redis()
+    if r is None:
+        return str(local)
+    now = time.monotonic()
+    cached = _SHARED_GEN.get(name)
+    if cached is None or now - cached[0] >= COMPLIANCE_VERDICT_GEN_CHECK_S:
+        try:
+            shared = str(r.get(_GEN_KEY.format(name)) or "0")
+        except Exception:
+            shared = cached[1] if cached else "0"
+        cached = (now, shared)
+        _SHARED_GEN[name] = cached
+    return f"{cached[1]}.{local}"
+
+
+def invalidate_verdicts(tenant_id: Optional[int] = None) -> None:
+    """Drop cached verdicts of a tenant (and of tenant-less checks) in every process
+
+    Args:
+        tenant_id: Tenant whose inputs changed (DNC entry, campaign); None only
+                   invalidates tenant-less checks
+    """
+    _STATS["invalidations"] += 1
+    names = {_tenant_key(tenant_id), _ALL_TENANTS}
+    r = get_redis()
+    for name in names:
+        _LOCAL_GEN[name] = _LOCAL_GEN.get(name, 0) + 1
+        _SHARED_GEN.pop(name, None)
+        if r is not None:
+            try:
+                r.incr(_GEN_KEY.format(name))
+            except Exception:
+                pass
+
+
+def _fingerprint(obj: Optional[Any], fields: Tuple[str, ...]) -> Optional[Tuple[Any, ...]]:
+    if obj is None:
+        return None
+    return tuple(getattr(obj, f, None) for f in fields)
+
+
+_LEAD_FIELDS = ("id", "nature", "consent_status", "quiet_hours_disabled", "campaign_id", "timezone")
+_SETTINGS_FIELDS = (
+    "require_legal_review", "quiet_hours_enabled", "quiet_hours_weekdays",
+    "quiet_hours_saturday", "quiet_hours_sunday", "quiet_hours_timezone",
+)
+
+
+def verdict_key(
+    tenant_id: Optional[int],
+    to_number: str,
+    lead: Optional[Any],
+    settings: Optional[Any],
+    rules_version: str,
+    scheduled_time: Optional[datetime],
+    metadata: Optional[dict],
+) -> Hashable:
+    """Cache key for a compliance check (see module docstring)"""
+    when = scheduled_time or datetime.now(timezone.utc)
+    meta = metadata or {}
+    return (
+        tenant_id,
+        to_number,
+        _fingerprint(lead, _LEAD_FIELDS),
+        (meta.get("nature"), bool(meta.get("legal_accepted", False)), meta.get("campaign_id")),
+        _fingerprint(settings, _SETTINGS_FIELDS),
+        rules_version,
+        _generation(tenant_id),
+        int(when.timestamp() // 60),
+    )
+
+
+def _copy_verdict(verdict: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy deep enough that callers can mutate the result (the rule mapping is read-only)"""
+    result = dict(verdict)
+    if isinstance(result.get("checks"), dict):
+        result["checks"] = {k: dict(v) if isinstance(v, dict) else v for k, v in result["checks"].items()}
+    if isinstance(result.get("warnings"), list):
+        result["warnings"] = list(result["warnings"])
+    return result
+
+
+def get_verdict(key: Hashable) -> Optional[Dict[str, Any]]:
+    """Cached verdict for key (a copy), or None"""
+    if COMPLIANCE_VERDICT_CACHE_SIZE <= 0:
+        return None
+    with _LOCK:
+        entry = _CACHE.get(key)
+        if entry is not None and time.monotonic() - entry[0] < COMPLIANCE_VERDICT_TTL_S:
+            _CACHE.move_to_end(key)
+            _STATS["hits"] += 1
+            return _copy_verdict(entry[1])
+        if entry is not None:
+            del _CACHE[key]
+        _STATS["misses"] += 1
+    return None
+
+
+def put_verdict(key: Hashable, verdict: Dict[str, Any]) -> None:
+    """Store a verdict (evicting the least recently used entries beyond the size limit)"""
+    if COMPLIANCE_VERDICT_CACHE_SIZE <= 0:
+        return
+    with _LOCK:
+        _CACHE[key] = (time.monotonic(), _copy_verdict(verdict))
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > COMPLIANCE_VERDICT_CACHE_SIZE:
+            _CACHE.popitem(last=False)
+            _STATS["evictions"] += 1
+
+
+def clear_verdicts() -> None:
+    """Drop every cached verdict in this process"""
+    with _LOCK:
+        _CACHE.clear()
+
+
+def get_verdict_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters, hit rate and current size"""
+    lookups = _STATS["hits"] + _STATS["misses"]
+    return {
+        **_STATS,
+        "size": len(_CACHE),
+        "hit_rate": round(_STATS["hits"] / lookups, 4) if lookups else None,
+    }
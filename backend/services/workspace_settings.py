@@ -323,11 +323,18 @@ def update_workspace_settings(
     Returns:
         Updated WorkspaceSettings instance
     """
-    if session:
-        return _update_settings(tenant_id, updates, session)
-    
-    with Session(engine) as s:
-        return _update_settings(tenant_id, updates, s)
+    touches_retell_key = "retell_api_key" in updates or "retell_api_key_encrypted" in updates
+    try:
+        if session:
+            return _update_settings(tenant_id, updates, session)
+        
+        with Session(engine) as s:
+            return _update_settings(tenant_id, updates, s)
+    finally:
+        if touches_retell_key:
+            # Drop cached BYO key so the next Retell request picks up the new one
+            from utils.retell import invalidate_retell_api_key
+            invalidate_retell_api_key(tenant_id)
 
 
 def _update_settings(tenant_id: int, updates: Dict[str, Any], session: Session) -> WorkspaceSettings:
@@ -0,0 +1,22 @@
+"""Test setup: a throwaway SQLite database and the backend on sys.path"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Must be set before config.database creates the engine
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="backend-tests-"), "test.db")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.database import Base, engine  # noqa: E402
+import models  # noqa: E402,F401
+
+
+@pytest.fixture(autouse=True)
+def db():
+    """Fresh tables for every test"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
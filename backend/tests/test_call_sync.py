@@ -0,0 +1,59 @@
+"""sync_retell_calls high-water mark against a stub list-calls pager"""
+import asyncio
+import time
+
+from sqlalchemy.orm import Session
+
+from config.database import engine
+from models.calls import CallRecord, CallSyncState
+from services import call_sync
+
+
+def _call(call_id, minutes_ago, status="ended"):
+    return {
+        "call_id": call_id,
+        "call_status": status,
+        "direction": "outbound",
+        "start_timestamp": int((time.time() - minutes_ago * 60) * 1000),
+    }
+
+
+def _stub_pages(monkeypatch, pages):
+    seen = {}
+
+    async def pager(**kwargs):
+        seen.update(kwargs)
+        for page in pages[:kwargs["max_pages"]]:
+            await asyncio.sleep(0)
+            yield page
+
+    monkeypatch.setattr(call_sync, "retell_iter_call_pages", pager)
+    return seen
+
+
+def _mark():
+    with Session(engine) as session:
+        return session.get(CallSyncState, call_sync.GLOBAL_ACCOUNT).high_water_ms
+
+
+def test_mark_stops_at_the_oldest_running_call(monkeypatch):
+    running = _call("c2", 30, "ongoing")
+    _stub_pages(monkeypatch, [[_call("c1", 40), running], [_call("c3", 20), _call("c4", 10)]])
+
+    result = asyncio.run(call_sync.sync_retell_calls(page_size=2))
+
+    assert result["calls"] == 4 and result["pages"] == 2
+    assert _mark() == running["start_timestamp"]
+    with Session(engine) as session:
+        assert session.query(CallRecord).count() == 4
+        assert session.get(CallSyncState, call_sync.GLOBAL_ACCOUNT).last_error is None
+
+
+def test_stuck_call_does_not_pin_the_mark(monkeypatch):
+    stuck_minutes = call_sync.RETELL_SYNC_OPEN_MAX_AGE_S // 60 + 60
+    newest = _call("c3", 5)
+    _stub_pages(monkeypatch, [[_call("c1", stuck_minutes, "ongoing"), _call("c2", 10)], [newest]])
+
+    asyncio.run(call_sync.sync_retell_calls(page_size=2))
+
+    assert _mark() == newest["start_timestamp"]
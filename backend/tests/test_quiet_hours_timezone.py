@@ -0,0 +1,50 @@
+"""Country quiet hours in the callee's zone, and the lead timezone backfill"""
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from config.database import engine
+from models.campaigns import Lead
+from services.enforcement import _evaluate_compliance, backfill_lead_timezones
+
+US_RULE = {
+    "regime_b2b": "allowed",
+    "quiet_hours_enabled": True,
+    "quiet_hours_weekdays": "21:00-08:00",
+    "quiet_hours_saturday": "21:00-08:00",
+    "quiet_hours_sunday": "forbidden",
+    "timezone": "America/New_York",
+}
+# Wednesday 08:30 in New York, 05:30 in Los Angeles
+WEDNESDAY_0830_ET = datetime(2026, 10, 21, 12, 30, tzinfo=timezone.utc)
+
+
+def _quiet_hours_passed(to_number, lead=None):
+    result = _evaluate_compliance("US", US_RULE, False, lead, None, None, WEDNESDAY_0830_ET, None, to_number)
+    return result["checks"]["quiet_hours"]["passed"]
+
+
+def test_leadless_dial_uses_the_dialed_number_zone():
+    assert _quiet_hours_passed("+12125550100") is True
+    assert _quiet_hours_passed("+14155550100") is False
+
+
+def test_stored_lead_zone_wins():
+    lead = Lead(name="x", phone="+14155550100", timezone="America/New_York")
+    assert _quiet_hours_passed("+14155550100", lead) is True
+
+
+def test_backfill_lead_timezones():
+    with Session(engine) as session:
+        session.add_all([
+            Lead(name="a", phone="+14155550100"),
+            Lead(name="b", phone="+12125550100", timezone="Europe/Rome"),
+            Lead(name="c", phone="not a number"),
+        ])
+        session.commit()
+
+    assert backfill_lead_timezones(batch_size=1) == 1
+    assert backfill_lead_timezones() == 0
+    with Session(engine) as session:
+        zones = [lead.timezone for lead in session.query(Lead).order_by(Lead.id)]
+    assert zones == ["America/Los_Angeles", "Europe/Rome", None]
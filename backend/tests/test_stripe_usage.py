@@ -0,0 +1,143 @@
+"""report_usage_to_stripe against a stub of the stripe module"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+from config.database import engine
+from models.billing import Subscription, UsageEvent
+from services import stripe_usage
+
+W = stripe_usage.STRIPE_USAGE_WINDOW_S
+
+
+class StubStripeError(Exception):
+    pass
+
+
+class StubStripe:
+    """Records usage records; fails the next `fail` calls with a StripeError"""
+
+    StripeError = StubStripeError
+
+    def __init__(self, fail: int = 0):
+        self.records = []
+        self.fail = fail
+        stub = self
+
+        class SubscriptionItem:
+            @staticmethod
+            def create_usage_record(item_id, **params):
+                if stub.fail:
+                    stub.fail -= 1
+                    raise StubStripeError("stub: unavailable")
+                stub.records.append({"item": item_id, **params})
+
+        class Subscription:
+            @staticmethod
+            def retrieve(sub_id):
+                return {"items": {"data": [{"id": f"si_{sub_id}", "price": {"recurring": {"usage_type": "metered"}}}]}}
+
+        self.SubscriptionItem = SubscriptionItem
+        self.Subscription = Subscription
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    stub = StubStripe()
+    monkeypatch.setattr(stripe_usage, "_stripe", lambda: stub)
+    return stub
+
+
+def _window_start(windows_ago: int) -> datetime:
+    now_window = int(datetime.now(timezone.utc).timestamp()) // W
+    return datetime.fromtimestamp((now_window - windows_ago) * W, tz=timezone.utc)
+
+
+def _seed(events, subscriptions=(("1", 1),)):
+    """events: (tenant_id, windows_ago, minutes); subscriptions: (stripe id, tenant_id)"""
+    with Session(engine) as session:
+        for sub_id, tenant_id in subscriptions:
+            session.add(Subscription(tenant_id=tenant_id, plan_code="core", status="active", stripe_subscription_id=f"sub_{sub_id}"))
+        for i, (tenant_id, windows_ago, minutes) in enumerate(events):
+            session.add(UsageEvent(
+                tenant_id=tenant_id,
+                minutes_billed=minutes,
+                ts=_window_start(windows_ago) + timedelta(seconds=i + 1),
+                synced_to_stripe=stripe_usage.USAGE_PENDING,
+            ))
+        session.commit()
+
+
+def _statuses():
+    with Session(engine) as session:
+        return [row.synced_to_stripe for row in session.query(UsageEvent).order_by(UsageEvent.id)]
+
+
+def test_one_record_per_item_and_closed_window(stub):
+    _seed([(1, 2, 3), (1, 2, 4), (1, 1, 5), (1, 0, 7), (2, 1, 9), (None, 1, 1)])
+
+    stats = stripe_usage.report_usage_to_stripe()
+
+    assert sorted((r["item"], r["timestamp"], r["quantity"]) for r in stub.records) == [
+        ("si_sub_1", int(_window_start(2).timestamp()), 7),
+        ("si_sub_1", int(_window_start(1).timestamp()), 5),
+    ]
+    assert all(r["action"] == "increment" for r in stub.records)
+    # Open window stays pending; tenant 2 (no subscription) and unattributed rows aren't billable
+    assert _statuses() == [1, 1, 1, 0, 2, 2]
+    assert stats == {"records": 2, "reported": 3, "not_billable": 2, "skipped": 0, "failed": 0}
+
+
+def test_failed_record_is_retried_with_the_same_idempotency_key(stub):
+    _seed([(1, 1, 3), (1, 1, 4)])
+    stub.fail = 1
+
+    stats = stripe_usage.report_usage_to_stripe()
+    assert stats["failed"] == 1 and stub.records == []
+    assert _statuses() == [0, 0]
+
+    stripe_usage.report_usage_to_stripe()
+    assert len(stub.records) == 1
+    first_key = stub.records[0]["idempotency_key"]
+    assert first_key.startswith(f"usage-si_sub_1-{int(_window_start(1).timestamp()) // W}-")
+    assert _statuses() == [1, 1]
+
+    # A run that dies before the commit re-sends exactly the same key
+    with Session(engine) as session:
+        session.query(UsageEvent).update({UsageEvent.synced_to_stripe: stripe_usage.USAGE_PENDING})
+        session.commit()
+    stripe_usage.report_usage_to_stripe()
+    assert [r["idempotency_key"] for r in stub.records] == [first_key, first_key]
+
+
+def test_new_rows_in_a_window_get_a_new_idempotency_key(stub):
+    _seed([(1, 1, 3)])
+    stripe_usage.report_usage_to_stripe()
+    _seed([(1, 1, 2)], subscriptions=())
+    stripe_usage.report_usage_to_stripe()
+
+    assert [r["quantity"] for r in stub.records] == [3, 2]
+    assert stub.records[0]["idempotency_key"] != stub.records[1]["idempotency_key"]
+
+
+def test_unexpected_errors_abort_the_run(stub, monkeypatch):
+    _seed([(1, 1, 3)])
+
+    def broken(item_id, **params):
+        raise AttributeError("create_usage_record")
+
+    monkeypatch.setattr(stub.SubscriptionItem, "create_usage_record", broken)
+    with pytest.raises(AttributeError):
+        stripe_usage.report_usage_to_stripe()
+    assert _statuses() == [0]
+
+
+def test_sdk_without_usage_records_is_rejected(monkeypatch):
+    import sys
+    import types
+
+    monkeypatch.setenv("STRIPE_API_KEY", "sk_test_stub")
+    monkeypatch.setitem(sys.modules, "stripe", types.SimpleNamespace(VERSION="12.0.0", SubscriptionItem=object))
+    with pytest.raises(RuntimeError, match="create_usage_record"):
+        stripe_usage._stripe()
@@ -0,0 +1,58 @@
+"""Incremental usage rollups vs rebuild_usage_daily"""
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from config.database import engine
+from models.billing import UsageDaily, UsageDailyOutcome
+from models.calls import CallRecord
+from services import usage_rollup
+
+
+def _counters(session: Session):
+    usage = {
+        (row.tenant_id, row.day): (row.calls_created, row.calls_finished, row.billed_seconds, row.minutes_billed, row.cost_cents)
+        for row in session.query(UsageDaily)
+    }
+    outcomes = {(row.tenant_id, row.day, row.outcome): row.calls for row in session.query(UsageDailyOutcome)}
+    return usage, outcomes
+
+
+def test_rebuild_matches_incremental_counters():
+    now = datetime.now(timezone.utc)
+    calls = [
+        # (tenant_id, duration_seconds, cost_cents, outcome, ended)
+        (1, 30, 5, "qualified", True),
+        (1, 30, 5, "qualified", True),
+        (1, 30, 5, None, True),
+        (1, 61, 12, "no_answer", True),
+        (1, None, None, None, False),
+        (2, 0, 0, "voicemail", True),
+        (None, 119, 20, None, True),
+    ]
+    with Session(engine) as session:
+        for i, (tenant_id, duration, cost, outcome, ended) in enumerate(calls):
+            rec = CallRecord(
+                tenant_id=tenant_id,
+                direction="outbound",
+                provider_call_id=f"call_{i}",
+                created_at=now,
+                status="ended" if ended else "ongoing",
+                duration_seconds=duration,
+                call_cost_cents=cost,
+                disposition_outcome=outcome,
+            )
+            session.add(rec)
+            usage_rollup.rollup_call_created(session, tenant_id, now)
+            if ended:
+                usage_rollup.rollup_call_finished(session, rec, outcome)
+        session.commit()
+        incremental = _counters(session)
+
+    usage_rollup.rebuild_usage_daily(1)
+
+    with Session(engine) as session:
+        rebuilt = _counters(session)
+    assert rebuilt == incremental
+    # Minutes are rounded up per call, not on the day total (3 x 30 s = 3 minutes)
+    assert incremental[0][(1, now.date())] == (5, 4, 151, 5, 27)
@@ -6,6 +6,7 @@ from fastapi import Request
 
 from models.agents import TenantAgent, PhoneNumber
 from models.campaigns import Lead, Campaign
+from utils.numbering_plan import country_iso_for_number
 
 
 def normalize_e164(phone: Optional[str]) -> Optional[str]:
@@ -77,37 +78,8 @@ def normalize_e164(phone: Optional[str]) -> Optional[str]:
 
 
 def country_iso_from_e164(e164: Optional[str]) -> Optional[str]:
-    """Extract country ISO from E.164 number"""
-    if not e164:
-        return None
-    # Minimal mapping - in production use a proper library like phonenumbers
-    mapping = {
-        "+39": "IT",
-        "+33": "FR",
-        "+34": "ES",
-        "+49": "DE",
-        "+351": "PT",
-        "+41": "CH",
-        "+44": "GB",
-        "+212": "MA",
-        "+216": "TN",
-        "+213": "DZ",
-        "+20": "EG",
-        "+1": "US",
-        "+91": "IN",
-        "+81": "JP",
-        "+86": "CN",
-        "+7": "RU",
-        "+61": "AU",
-        "+55": "BR",
-        "+52": "MX",
-    }
-    # Find longest prefix match
-    best = None
-    for prefix, iso in mapping.items():
-        if e164.startswith(prefix) and (best is None or len(prefix) > len(best[0])):
-            best = (prefix, iso)
-    return best[1] if best else None
+    """Extract country ISO from E.164 number (longest-prefix match on the numbering plan)"""
+    return country_iso_for_number(e164)
 
 
 def _resolve_lang(session: Session, request: Request, to_number: Optional[str], provided_lang: Optional[str]) -> str:
@@ -0,0 +1,173 @@
+"""Numbering-plan lookup: E.164 number -> country and timezone via a prefix trie
+
+The plan is a generated data file (knowledge/general/data/numbering_plan.v1.json,
+built by scripts/build_numbering_plan.py) mapping digit prefixes to ISO alpha-2
+codes: every ITU country calling code plus the areas of shared codes (NANP area
+codes, +7 76/77 Kazakhstan, +44 Crown Dependencies, ...), and prefixes to IANA
+timezones (country main zone, refined by area code in multi-zone countries).
+It is loaded into a digit trie once at import; a lookup walks the number's
+digits and keeps the deepest prefix that has a country (or zone), so it costs
+O(len(number)) regardless of the size of the plan.
+"""
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+NUMBERING_PLAN_PATH = BACKEND_DIR.parent / "knowledge" / "general" / "data" / "numbering_plan.v1.json"
+
+# Used only if the data file is missing (the historical built-in mapping)
+_FALLBACK_PREFIXES = {
+    "39": "IT", "33": "FR", "34": "ES", "49": "DE", "351": "PT", "41": "CH", "44": "GB",
+    "212": "MA", "216": "TN", "213": "DZ", "20": "EG", "1": "US", "91": "IN", "81": "JP",
+    "86": "CN", "7": "RU", "61": "AU", "55": "BR", "52": "MX",
+}
+_SEPARATORS = frozenset(" -().")
+
+
+class NumberMatch(NamedTuple):
+    country_iso: str
+    country_code: str  # ITU calling code, e.g. "1" for +1 204 ...
+    prefix: str        # deepest matching prefix, e.g. "1204" (region within a shared code)
+
+
+class _Node:
+    __slots__ = ("children", "match", "timezone")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_Node"] = {}
+        self.match: Optional[NumberMatch] = None
+        self.timezone: Optional[str] = None
+
+
+def _build_trie(prefixes: Dict[str, str], timezones: Dict[str, str]) -> _Node:
+    root = _Node()
+    # Shorter prefixes first so every node knows its country calling code
+    for prefix in sorted(prefixes, key=len):
+        iso = prefixes[prefix]
+        node = root
+        country_code = None
+        for digit in prefix:
+            node = node.children.setdefault(digit, _Node())
+            if country_code is None and node.match is not None:
+                country_code = node.match.country_code
+        node.match = NumberMatch(iso, country_code or prefix, prefix)
+    for prefix, tz in timezones.items():
+        node = root
+        for digit in prefix:
+            node = node.children.setdefault(digit, _Node())
+        node.timezone = tz
+    return root
+
+
+def _load_plan() -> Tuple[Dict[str, str], Dict[str, str]]:
+    """(prefix -> ISO, prefix -> IANA zone) from the data file"""
+    try:
+        with open(NUMBERING_PLAN_PATH, "r", encoding="utf-8") as f:
+            plan = json.load(f)
+        prefixes = {str(p): str(iso).upper() for p, iso in plan["prefixes"].items() if str(p).isdigit()}
+        timezones = {str(p): str(tz) for p, tz in (plan.get("timezones") or {}).items() if str(p).isdigit()}
+        return prefixes, timezones
+    except Exception as e:
+        logger.warning("Numbering plan not loaded from %s (%s), using built-in fallback", NUMBERING_PLAN_PATH, e)
+        return dict(_FALLBACK_PREFIXES), {}
+
+
+def _country_timezones(prefixes: Dict[str, str], timezones: Dict[str, str]) -> Dict[str, str]:
+    """ISO -> main zone (the zone of the country's shortest prefix)"""
+    result: Dict[str, str] = {}
+    for prefix in sorted(prefixes, key=len):
+        if prefix in timezones:
+            result.setdefault(prefixes[prefix], timezones[prefix])
+    return result
+
+
+_PREFIXES, _TIMEZONES = _load_plan()
+_TRIE = _build_trie(_PREFIXES, _TIMEZONES)
+_COUNTRY_TIMEZONES = _country_timezones(_PREFIXES, _TIMEZONES)
+del _PREFIXES, _TIMEZONES
+
+
+def _digits(e164: Optional[str]) -> Iterable[str]:
+    if not e164:
+        return ""
+    number = e164.strip()
+    if not number.startswith("+"):
+        return ""
+    return (ch for ch in number[1:] if ch not in _SEPARATORS)
+
+
+def lookup_e164(e164: Optional[str]) -> Optional[NumberMatch]:
+    """Longest-prefix match of an E.164 number ("+" followed by digits; spaces, dashes,
+    dots and parentheses are ignored). None if not E.164 or no country matches."""
+    node = _TRIE
+    best: Optional[NumberMatch] = None
+    for ch in _digits(e164):
+        node = node.children.get(ch)
+        if node is None:
+            break
+        if node.match is not None:
+            best = node.match
+    return best
+
+
+def country_iso_for_number(e164: Optional[str]) -> Optional[str]:
+    """ISO alpha-2 country of an E.164 number (None if unknown)"""
+    match = lookup_e164(e164)
+    return match.country_iso if match else None
+
+
+def country_isos_for_numbers(numbers: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """Batch country detection for a column of numbers (same order; repeated numbers are looked up once)"""
+    seen: Dict[Optional[str], Optional[str]] = {}
+    result: List[Optional[str]] = []
+    for number in numbers:
+        if number not in seen:
+            seen[number] = country_iso_for_number(number)
+        result.append(seen[number])
+    return result
+
+
+def timezone_for_number(e164: Optional[str]) -> Optional[str]:
+    """IANA timezone of an E.164 number from its prefix/area code (None if unknown)"""
+    node = _TRIE
+    best: Optional[str] = None
+    for ch in _digits(e164):
+        node = node.children.get(ch)
+        if node is None:
+            break
+        if node.timezone is not None:
+            best = node.timezone
+    return best
+
+
+def timezones_for_numbers(numbers: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """Batch timezone detection for a column of numbers (same order)"""
+    seen: Dict[Optional[str], Optional[str]] = {}
+    result: List[Optional[str]] = []
+    for number in numbers:
+        if number not in seen:
+            seen[number] = timezone_for_number(number)
+        result.append(seen[number])
+    return result
+
+
+def default_timezone_for_country(country_iso: Optional[str]) -> Optional[str]:
+    """Main IANA timezone of a country (None if unknown)"""
+    return _COUNTRY_TIMEZONES.get((country_iso or "").upper())
+
+
+@lru_cache(maxsize=512)
+def get_zone(tz_name: Optional[str]):
+    """Cached pytz zone object for an IANA name (UTC if missing or invalid)"""
+    try:
+        return pytz.timezone(tz_name or "UTC")
+    except Exception:
+        return pytz.UTC
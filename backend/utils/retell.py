@@ -2,21 +2,107 @@
 import os
 import json
 import io
+import copy
+import time
+import hashlib
+import random
+import asyncio
+import logging
+import threading
 import httpx
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple, List, AsyncIterator
 from fastapi import HTTPException
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import Session
 
 from config.database import engine
 
+logger = logging.getLogger(__name__)
+
+
+# Tenant credential cache
+# Schema capabilities are detected once (at startup via init_retell_credentials, or on first use)
+# so the hot path never runs inspect(engine). Keys are cached per tenant with a TTL and are
+# explicitly invalidated when integration settings change.
+RETELL_KEY_CACHE_TTL = float(os.getenv("RETELL_KEY_CACHE_TTL", "300"))
+
+_SCHEMA_CAPS: Optional[Dict[str, bool]] = None
+_TENANT_KEY_CACHE: Dict[int, Tuple[Optional[str], float]] = {}
+_TENANT_KEY_LOCK = threading.Lock()
+
+
+def init_retell_credentials(force: bool = False) -> Dict[str, bool]:
+    """Detect which tenant credential columns exist (runs schema introspection once)
+    
+    Args:
+        force: Re-run detection even if already done (e.g. after migrations)
+    
+    Returns:
+        Dict of detected capabilities
+    """
+    global _SCHEMA_CAPS
+    if _SCHEMA_CAPS is not None and not force:
+        return _SCHEMA_CAPS
+    caps = {"tenants_retell_api_key": False, "workspace_retell_api_key": False}
+    try:
+        inspector = inspect(engine)
+        tables = inspector.get_table_names()
+        if "tenants" in tables:
+            columns = [col["name"] for col in inspector.get_columns("tenants")]
+            caps["tenants_retell_api_key"] = "retell_api_key" in columns
+        if "workspace_settings" in tables:
+            columns = [col["name"] for col in inspector.get_columns("workspace_settings")]
+            caps["workspace_retell_api_key"] = "retell_api_key_encrypted" in columns
+    except Exception:
+        # Schema unavailable (DB down at boot) - retry on next call instead of caching failure
+        return caps
+    _SCHEMA_CAPS = caps
+    return caps
+
+
+def _load_tenant_retell_api_key(tenant_id: int) -> Optional[str]:
+    """Load tenant's BYO Retell key from DB (no caching)"""
+    caps = init_retell_credentials()
+    with Session(engine) as session:
+        # 1. Legacy tenants.retell_api_key (plaintext)
+        if caps.get("tenants_retell_api_key"):
+            result = session.execute(
+                text("SELECT retell_api_key FROM tenants WHERE id = :tenant_id"),
+                {"tenant_id": tenant_id}
+            ).first()
+            if result and result[0]:
+                return result[0]
+        # 2. workspace_settings.retell_api_key_encrypted (set via /settings/workspace/integrations)
+        if caps.get("workspace_retell_api_key"):
+            result = session.execute(
+                text("SELECT retell_api_key_encrypted FROM workspace_settings WHERE tenant_id = :tenant_id LIMIT 1"),
+                {"tenant_id": tenant_id}
+            ).first()
+            if result and result[0]:
+                from utils.encryption import decrypt_value
+                return decrypt_value(result[0])
+    return None
+
+
+def invalidate_retell_api_key(tenant_id: Optional[int] = None) -> None:
+    """Drop cached Retell key for a tenant (or all tenants if tenant_id is None)"""
+    with _TENANT_KEY_LOCK:
+        if tenant_id is None:
+            _TENANT_KEY_CACHE.clear()
+        else:
+            _TENANT_KEY_CACHE.pop(int(tenant_id), None)
+
 
 def get_retell_api_key(tenant_id: Optional[int] = None) -> str:
     """Get Retell API key for a tenant
     
     Supports BYO (Bring Your Own) Retell account:
-    - If tenant has retell_api_key set, use that
+    - If tenant has a custom key (tenants.retell_api_key or encrypted
+      workspace_settings.retell_api_key_encrypted), use that
     - Otherwise, fallback to global RETELL_API_KEY
     
+    Tenant lookups are cached for RETELL_KEY_CACHE_TTL seconds (including "no custom key").
+    
     Args:
         tenant_id: Optional tenant ID. If None, uses global key.
     
@@ -24,24 +110,20 @@ def get_retell_api_key(tenant_id: Optional[int] = None) -> str:
         Retell API key string
     """
     if tenant_id is not None:
-        # Check if tenant has custom Retell API key (BYO account)
-        try:
-            with Session(engine) as session:
-                # Check if tenants table exists and has retell_api_key column
-                from sqlalchemy import inspect, text
-                inspector = inspect(engine)
-                if 'tenants' in inspector.get_table_names():
-                    columns = [col['name'] for col in inspector.get_columns('tenants')]
-                    if 'retell_api_key' in columns:
-                        result = session.execute(
-                            text("SELECT retell_api_key FROM tenants WHERE id = :tenant_id"),
-                            {"tenant_id": tenant_id}
-                        ).first()
-                        if result and result[0]:
-                            return result[0]  # Use tenant's custom key
-        except Exception:
-            # If lookup fails, fallback to global key
-            pass
+        now = time.monotonic()
+        cached = _TENANT_KEY_CACHE.get(tenant_id)
+        if cached is not None and cached[1] > now:
+            tenant_key = cached[0]
+        else:
+            try:
+                tenant_key = _load_tenant_retell_api_key(tenant_id)
+                with _TENANT_KEY_LOCK:
+                    _TENANT_KEY_CACHE[tenant_id] = (tenant_key, now + RETELL_KEY_CACHE_TTL)
+            except Exception:
+                # If lookup fails, fallback to global key (don't cache the failure)
+                tenant_key = None
+        if tenant_key:
+            return tenant_key  # Use tenant's custom key
     
     # Fallback to global RETELL_API_KEY
     api_key = os.getenv("RETELL_API_KEY")
@@ -68,9 +150,292 @@ def get_retell_base_url() -> str:
     return os.getenv("RETELL_BASE_URL", "https://api.retellai.com")
 
 
+# Retry / circuit breaker configuration
+# - Idempotent requests (GET/PATCH/DELETE and read-only POSTs) are retried on 5xx and transport errors
+# - Any request is retried on 429 (Retell rejected it before processing), honoring Retry-After
+# - Backoff is exponential with full jitter so concurrent workers don't retry in lockstep
+RETELL_MAX_RETRIES = int(os.getenv("RETELL_MAX_RETRIES", "3"))
+RETELL_RETRY_BASE_MS = int(os.getenv("RETELL_RETRY_BASE_MS", "250"))
+RETELL_RETRY_MAX_MS = int(os.getenv("RETELL_RETRY_MAX_MS", "8000"))
+RETELL_RETRY_AFTER_MAX_S = float(os.getenv("RETELL_RETRY_AFTER_MAX_S", "30"))
+RETELL_CB_FAILURE_THRESHOLD = int(os.getenv("RETELL_CB_FAILURE_THRESHOLD", "5"))
+RETELL_CB_COOLDOWN_S = float(os.getenv("RETELL_CB_COOLDOWN_S", "30"))
+
+_IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "PATCH", "DELETE"}
+# POST endpoints that only read data (safe to retry on 5xx)
+_IDEMPOTENT_POST_PATHS = {"/v2/list-calls", "/list-calls"}
+
+
+def _endpoint_key(path: str) -> str:
+    """Normalize API path to an endpoint key (strip ids/query): /get-call/abc -> /get-call"""
+    parts = [p for p in path.split("?", 1)[0].split("/") if p]
+    if not parts:
+        return "/"
+    if parts[0] in {"v1", "v2"} and len(parts) > 1:
+        return f"/{parts[0]}/{parts[1]}"
+    return f"/{parts[0]}"
+
+
+class _CircuitBreaker:
+    """Per-endpoint circuit breaker (closed -> open -> half_open -> closed)"""
+    
+    def __init__(self, endpoint: str) -> None:
+        self.endpoint = endpoint
+        self.state = "closed"
+        self.failures = 0
+        self.opened_until = 0.0
+        self.half_open_in_flight = False
+    
+    def allow(self) -> bool:
+        """Return True if a request may be sent now"""
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() < self.opened_until:
+                return False
+            # Cooldown elapsed: let a single probe through
+            self.state = "half_open"
+            self.half_open_in_flight = False
+        if self.half_open_in_flight:
+            return False
+        self.half_open_in_flight = True
+        return True
+    
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self.half_open_in_flight = False
+    
+    def record_failure(self, retry_after: Optional[float] = None) -> None:
+        self.failures += 1
+        self.half_open_in_flight = False
+        if self.state == "half_open" or self.failures >= RETELL_CB_FAILURE_THRESHOLD:
+            cooldown = max(RETELL_CB_COOLDOWN_S, retry_after or 0.0)
+            self.state = "open"
+            self.opened_until = time.monotonic() + cooldown
+            _publish_circuit_open(self.endpoint, cooldown)
+    
+    def retry_after_seconds(self) -> int:
+        return max(1, int(self.opened_until - time.monotonic() + 0.999))
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_after_s": self.retry_after_seconds() if self.state == "open" else 0,
+        }
+
+
+_CIRCUITS: Dict[str, _CircuitBreaker] = {}
+
+
+def _get_circuit(path: str) -> _CircuitBreaker:
+    key = _endpoint_key(path)
+    breaker = _CIRCUITS.get(key)
+    if breaker is None:
+        breaker = _CIRCUITS.setdefault(key, _CircuitBreaker(key))
+    return breaker
+
+
+def _publish_circuit_open(endpoint: str, cooldown: float) -> None:
+    """Share open circuit with other processes (workers/web) via Redis, best-effort"""
+    try:
+        from utils.redis_client import get_redis
+        r = get_redis()
+        if r is not None:
+            r.set(f"retell:circuit:{endpoint}", "open", ex=max(1, int(cooldown)))
+    except Exception:
+        pass
+
+
+def get_retell_circuit_state() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of local circuit breakers, keyed by endpoint (for status/metrics endpoints)"""
+    return {key: breaker.snapshot() for key, breaker in _CIRCUITS.items()}
+
+
+def retell_circuit_open(path: Optional[str] = None) -> bool:
+    """Check if Retell circuit is open (locally or in another process via Redis)
+    
+    Dial schedulers use this to back off globally instead of hammering Retell.
+    
+    Args:
+        path: API path/endpoint to check. If None, returns True if any circuit is open.
+    """
+    now = time.monotonic()
+    if path is None:
+        if any(b.state == "open" and b.opened_until > now for b in _CIRCUITS.values()):
+            return True
+    else:
+        breaker = _CIRCUITS.get(_endpoint_key(path))
+        if breaker is not None and breaker.state == "open" and breaker.opened_until > now:
+            return True
+    try:
+        from utils.redis_client import get_redis
+        r = get_redis()
+        if r is None:
+            return False
+        if path is None:
+            return next(iter(r.scan_iter(match="retell:circuit:*", count=100)), None) is not None
+        return bool(r.exists(f"retell:circuit:{_endpoint_key(path)}"))
+    except Exception:
+        return False
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        from datetime import datetime, timezone
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except Exception:
+        return None
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter (seconds)"""
+    cap_ms = min(RETELL_RETRY_MAX_MS, RETELL_RETRY_BASE_MS * (2 ** attempt))
+    return random.uniform(0, cap_ms) / 1000.0
+
+
+def _rewind_files(files: Any) -> None:
+    """Seek file-like objects back to 0 so a multipart request can be resent"""
+    items = files.values() if isinstance(files, dict) else (files or [])
+    for item in items:
+        if isinstance(item, tuple) and len(item) == 2 and isinstance(item[1], tuple):
+            item = item[1]  # list format: (field_name, (filename, file_obj, content_type))
+        if isinstance(item, tuple) and len(item) > 1 and hasattr(item[1], "seek"):
+            try:
+                item[1].seek(0)
+            except Exception:
+                pass
+
+
+async def retell_request(
+    method: str,
+    path: str,
+    tenant_id: Optional[int] = None,
+    headers: Optional[Dict[str, str]] = None,
+    idempotent: Optional[bool] = None,
+    timeout: float = 30,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Send a request to Retell with retries, Retry-After handling and circuit breaking
+    
+    Args:
+        method: HTTP method
+        path: API path (e.g., "/v2/create-phone-call")
+        tenant_id: Optional tenant ID for BYO Retell account support
+        headers: Optional headers (defaults to get_retell_headers(tenant_id))
+        idempotent: Override retry-safety detection (default: by method / known read-only POSTs)
+        timeout: Request timeout in seconds
+        **kwargs: Passed to httpx (json, files, data, params)
+    
+    Returns:
+        Last httpx.Response (callers map status >= 400 to errors)
+    
+    Raises:
+        HTTPException 503: If the endpoint's circuit is open
+        httpx.TransportError: If the request could not be sent after retries
+    """
+    method = method.upper()
+    if idempotent is None:
+        idempotent = method in _IDEMPOTENT_METHODS or (
+            method == "POST" and _endpoint_key(path) in _IDEMPOTENT_POST_PATHS
+        )
+    if headers is None:
+        headers = get_retell_headers(tenant_id)
+    breaker = _get_circuit(path)
+    url = f"{get_retell_base_url()}{path}"
+    
+    attempt = 0
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        while True:
+            if not breaker.allow():
+                retry_after = breaker.retry_after_seconds()
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Retell temporarily unavailable ({breaker.endpoint}), retry in {retry_after}s",
+                    headers={"Retry-After": str(retry_after)},
+                )
+            if attempt > 0 and "files" in kwargs:
+                _rewind_files(kwargs["files"])
+            try:
+                resp = await client.request(method, url, headers=headers, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                # Request never reached Retell: safe to retry for any method
+                breaker.record_failure()
+                if attempt >= RETELL_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(_backoff_delay(attempt))
+                attempt += 1
+                continue
+            except httpx.TransportError:
+                breaker.record_failure()
+                if not idempotent or attempt >= RETELL_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(_backoff_delay(attempt))
+                attempt += 1
+                continue
+            except Exception:
+                breaker.half_open_in_flight = False
+                raise
+            
+            if resp.status_code == 429 or resp.status_code >= 500:
+                retry_after = _parse_retry_after(resp.headers.get("Retry-After"))
+                breaker.record_failure(retry_after)
+                retryable = resp.status_code == 429 or idempotent
+                if (
+                    not retryable
+                    or attempt >= RETELL_MAX_RETRIES
+                    or (retry_after is not None and retry_after > RETELL_RETRY_AFTER_MAX_S)
+                ):
+                    return resp
+                delay = _backoff_delay(attempt)
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            
+            breaker.record_success()
+            if method != "GET" and resp.status_code < 400:
+                # Mutations through our own routes drop affected catalog cache entries
+                from utils.retell_cache import invalidate_for_mutation
+                invalidate_for_mutation(path, headers.get("Authorization"))
+            return resp
+
+
+# Singleflight: concurrent identical GETs (same credentials + path) share one in-flight request
+_INFLIGHT_GETS: Dict[str, "asyncio.Future[Any]"] = {}
+_INFLIGHT_FOLLOWERS: Dict[str, int] = {}
+_COALESCE_STATS: Dict[str, int] = {"requests": 0, "upstream": 0, "coalesced": 0}
+
+
+def get_retell_coalescing_stats() -> Dict[str, int]:
+    """Singleflight counters: total GETs, GETs sent upstream, GETs served from a shared in-flight request"""
+    return {**_COALESCE_STATS, "in_flight": len(_INFLIGHT_GETS)}
+
+
+async def _retell_get_json_uncoalesced(path: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    resp = await retell_request("GET", path, headers=headers)
+    if resp.status_code >= 400:
+        raise HTTPException(status_code=resp.status_code, detail=resp.text)
+    return resp.json()
+
+
 async def retell_get_json(path: str, tenant_id: Optional[int] = None) -> Dict[str, Any]:
     """Make a GET request to Retell API
     
+    Identical concurrent requests (same tenant credentials and path) are coalesced
+    into a single upstream request; every caller gets its own copy of the result.
+    
     Args:
         path: API path (e.g., "/list-voices")
         tenant_id: Optional tenant ID for BYO Retell account support
@@ -78,62 +443,81 @@ async def retell_get_json(path: str, tenant_id: Optional[int] = None) -> Dict[st
     Returns:
         JSON response from Retell API
     """
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.get(
-            f"{get_retell_base_url()}{path}",
-            headers=get_retell_headers(tenant_id)
-        )
-        if resp.status_code >= 400:
-            raise HTTPException(status_code=resp.status_code, detail=resp.text)
-        return resp.json()
+    headers = get_retell_headers(tenant_id)
+    key = f"{hashlib.sha256(headers['Authorization'].encode('utf-8')).hexdigest()[:16]}:{path}"
+    _COALESCE_STATS["requests"] += 1
+    
+    inflight = _INFLIGHT_GETS.get(key)
+    if inflight is not None:
+        _COALESCE_STATS["coalesced"] += 1
+        _INFLIGHT_FOLLOWERS[key] = _INFLIGHT_FOLLOWERS.get(key, 0) + 1
+        # shield: a cancelled follower must not cancel the shared request
+        return copy.deepcopy(await asyncio.shield(inflight))
+    
+    _COALESCE_STATS["upstream"] += 1
+    task = asyncio.ensure_future(_retell_get_json_uncoalesced(path, headers))
+    _INFLIGHT_GETS[key] = task
+    followers_ref: Dict[str, int] = {}
+    
+    def _done(_: Any) -> None:
+        # Runs before any awaiting caller resumes, so no follower can join a finished request
+        if _INFLIGHT_GETS.get(key) is task:
+            _INFLIGHT_GETS.pop(key, None)
+            followers_ref["n"] = _INFLIGHT_FOLLOWERS.pop(key, 0)
+    
+    task.add_done_callback(_done)
+    result = await asyncio.shield(task)
+    # Followers deep-copy the shared object; only hand out the original if nobody else saw it
+    return copy.deepcopy(result) if followers_ref.get("n") else result
 
 
-async def retell_post_json(path: str, body: Dict[str, Any], tenant_id: Optional[int] = None) -> Dict[str, Any]:
+async def retell_post_json(
+    path: str,
+    body: Dict[str, Any],
+    tenant_id: Optional[int] = None,
+    idempotent: Optional[bool] = None,
+) -> Dict[str, Any]:
     """Make a POST request to Retell API
     
     Args:
         path: API path (e.g., "/create-batch-call")
         body: Request body as dict
         tenant_id: Optional tenant ID for BYO Retell account support
+        idempotent: Allow retries on 5xx (default: only for known read-only endpoints)
     
     Returns:
         JSON response from Retell API (or empty dict for 204 No Content)
     """
-    base_url = get_retell_base_url()
-    full_url = f"{base_url}{path}"
     headers = get_retell_headers(tenant_id)
     
-    # Log request details for debugging
-    print(f"[DEBUG] [retell_post_json] POST {full_url}", flush=True)
-    print(f"[DEBUG] [retell_post_json] Headers: {dict(headers)}", flush=True)
-    print(f"[DEBUG] [retell_post_json] Body keys: {list(body.keys()) if isinstance(body, dict) else 'N/A'}", flush=True)
-    
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(
-            full_url,
-            headers=headers,
-            json=body
+    # Never log headers (Authorization) or body values, only the shape of the request
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "[retell_post_json] POST %s body_keys=%s", path,
+            list(body.keys()) if isinstance(body, dict) else "N/A",
         )
-        print(f"[DEBUG] [retell_post_json] Response status: {resp.status_code}", flush=True)
-        if resp.status_code >= 400:
-            error_detail = resp.text
-            try:
-                error_json = resp.json()
-                if isinstance(error_json, dict):
-                    error_msg = error_json.get("message") or error_json.get("error") or error_json.get("detail") or resp.text
-                    error_detail = error_msg
-            except Exception:
-                pass
-            print(f"[DEBUG] [retell_post_json] Error {resp.status_code}: {error_detail[:500]}", flush=True)
-            raise HTTPException(status_code=resp.status_code, detail=error_detail)
-        # Handle empty responses (204 No Content or 200 with empty body)
-        if resp.status_code == 204 or not resp.content:
-            return {}
+    
+    resp = await retell_request("POST", path, headers=headers, idempotent=idempotent, json=body)
+    logger.debug("[retell_post_json] POST %s -> %s", path, resp.status_code)
+    if resp.status_code >= 400:
+        error_detail = resp.text
         try:
-            return resp.json()
+            error_json = resp.json()
+            if isinstance(error_json, dict):
+                error_msg = error_json.get("message") or error_json.get("error") or error_json.get("detail") or resp.text
+                error_detail = error_msg
         except Exception:
-            # If JSON parsing fails, return empty dict (for empty string responses)
-            return {}
+            pass
+        logger.warning("[retell_post_json] POST %s -> %s: %s", path, resp.status_code, str(error_detail)[:500])
+        raise HTTPException(status_code=resp.status_code, detail=error_detail)
+    # Handle empty responses (204 No Content or 200 with empty body)
+    if resp.status_code == 204 or not resp.content:
+        return {}
+    try:
+        return resp.json()
+    except Exception:
+        # If JSON parsing fails, return empty dict (for empty string responses)
+        return {}
 
 
 async def retell_patch_json(path: str, body: Dict[str, Any], tenant_id: Optional[int] = None) -> Dict[str, Any]:
@@ -147,21 +531,16 @@ async def retell_patch_json(path: str, body: Dict[str, Any], tenant_id: Optional
     Returns:
         JSON response from Retell API
     """
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.patch(
-            f"{get_retell_base_url()}{path}",
-            headers=get_retell_headers(tenant_id),
-            json=body
-        )
-        if resp.status_code >= 400:
-            raise HTTPException(status_code=resp.status_code, detail=resp.text)
-        # Handle empty responses
-        if resp.status_code == 204 or not resp.content:
-            return {}
-        try:
-            return resp.json()
-        except Exception:
-            return {}
+    resp = await retell_request("PATCH", path, tenant_id=tenant_id, json=body)
+    if resp.status_code >= 400:
+        raise HTTPException(status_code=resp.status_code, detail=resp.text)
+    # Handle empty responses
+    if resp.status_code == 204 or not resp.content:
+        return {}
+    try:
+        return resp.json()
+    except Exception:
+        return {}
 
 
 async def retell_delete_json(path: str, tenant_id: Optional[int] = None) -> Dict[str, Any]:
@@ -174,16 +553,118 @@ async def retell_delete_json(path: str, tenant_id: Optional[int] = None) -> Dict
     Returns:
         JSON response from Retell API (or empty dict for 204 No Content)
     """
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.delete(
-            f"{get_retell_base_url()}{path}",
-            headers=get_retell_headers(tenant_id)
-        )
-        if resp.status_code >= 400:
-            raise HTTPException(status_code=resp.status_code, detail=resp.text)
-        if resp.status_code == 204:
-            return {}
-        return resp.json() if resp.content else {}
+    resp = await retell_request("DELETE", path, tenant_id=tenant_id)
+    if resp.status_code >= 400:
+        raise HTTPException(status_code=resp.status_code, detail=resp.text)
+    if resp.status_code == 204:
+        return {}
+    return resp.json() if resp.content else {}
+
+
+def retell_list_calls_page(data: Any, limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Split a /v2/list-calls response into (calls, next pagination_key)
+    
+    Retell returns a bare array; the next page starts after the last call_id. A page
+    shorter than `limit` is the last one, so no key is returned for it.
+    """
+    if isinstance(data, dict):
+        calls = data.get("calls") or data.get("items") or []
+        if data.get("pagination_key"):
+            return calls, data["pagination_key"]
+    else:
+        calls = data if isinstance(data, list) else []
+    if len(calls) < limit or not calls:
+        return calls, None
+    return calls, calls[-1].get("call_id") or None
+
+
+async def retell_iter_call_pages(
+    filter_criteria: Optional[Dict[str, Any]] = None,
+    sort_order: str = "descending",
+    page_size: int = 1000,
+    tenant_id: Optional[int] = None,
+    pagination_key: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    prefetch: bool = True,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Stream /v2/list-calls page by page
+    
+    The request for the next page is started before a page is yielded, so it runs
+    whenever the caller awaits while processing (blocking work has to go through
+    asyncio.to_thread to overlap it). At most two pages are held in memory
+    regardless of the total number of calls. Breaking out of the loop (or aclose())
+    cancels the pending prefetch.
+    
+    Args:
+        filter_criteria: Retell filter_criteria (e.g. {"start_timestamp": {"lower_threshold": ms}})
+        sort_order: "ascending" or "descending"
+        page_size: Calls per request (max 1000)
+        tenant_id: Optional tenant ID for BYO Retell account support
+        pagination_key: Resume after this call_id
+        max_pages: Stop after this many pages (None = until exhausted)
+        prefetch: Start fetching the next page before yielding the current one
+    
+    Yields:
+        Lists of Retell call objects
+    """
+    limit = max(1, min(int(page_size), 1000))
+    
+    async def _fetch(key: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        body: Dict[str, Any] = {"sort_order": sort_order, "limit": limit}
+        if filter_criteria:
+            body["filter_criteria"] = filter_criteria
+        if key:
+            body["pagination_key"] = key
+        data = await retell_post_json("/v2/list-calls", body, tenant_id=tenant_id)
+        return retell_list_calls_page(data, limit)
+    
+    pages = 0
+    pending: Optional[asyncio.Task] = asyncio.create_task(_fetch(pagination_key))
+    try:
+        while pending is not None:
+            calls, next_key = await pending
+            pending = None
+            pages += 1
+            more = next_key is not None and (max_pages is None or pages < max_pages)
+            if more and prefetch:
+                pending = asyncio.create_task(_fetch(next_key))
+            if calls:
+                yield calls
+            if more and not prefetch:
+                pending = asyncio.create_task(_fetch(next_key))
+    finally:
+        if pending is not None:
+            if not pending.done():
+                pending.cancel()
+            try:
+                await pending  # also retrieves the error of a prefetch that already failed
+            except (asyncio.CancelledError, Exception):
+                pass
+
+
+async def retell_iter_calls(
+    filter_criteria: Optional[Dict[str, Any]] = None,
+    sort_order: str = "descending",
+    page_size: int = 1000,
+    tenant_id: Optional[int] = None,
+    pagination_key: Optional[str] = None,
+    max_pages: Optional[int] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream individual Retell calls (see retell_iter_call_pages)"""
+    pages = retell_iter_call_pages(
+        filter_criteria=filter_criteria,
+        sort_order=sort_order,
+        page_size=page_size,
+        tenant_id=tenant_id,
+        pagination_key=pagination_key,
+        max_pages=max_pages,
+    )
+    try:
+        async for calls in pages:
+            for call in calls:
+                yield call
+    finally:
+        await pages.aclose()
 
 
 async def retell_post_multipart(
@@ -278,27 +759,24 @@ async def retell_post_multipart(
     else:
         form_files = None
     
-    async with httpx.AsyncClient(timeout=120) as client:  # Longer timeout for file uploads (2 minutes)
-        # Log what we're sending for debugging (without file content)
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        # Extract file info without content for logging
-        # Handle both bytes and BytesIO objects
-        def get_file_size(content):
-            """Get size of file content, handling both bytes and BytesIO"""
-            if isinstance(content, bytes):
-                return len(content)
-            elif hasattr(content, 'getbuffer'):  # BytesIO
-                return content.getbuffer().nbytes
-            elif hasattr(content, 'seek') and hasattr(content, 'tell'):  # file-like object
-                pos = content.tell()
-                content.seek(0, io.SEEK_END)
-                size = content.tell()
-                content.seek(pos)
-                return size
-            return 0
-        
+    # Log what we're sending for debugging (without file content)
+    # Extract file info without content for logging
+    # Handle both bytes and BytesIO objects
+    def get_file_size(content):
+        """Get size of file content, handling both bytes and BytesIO"""
+        if isinstance(content, bytes):
+            return len(content)
+        elif hasattr(content, 'getbuffer'):  # BytesIO
+            return content.getbuffer().nbytes
+        elif hasattr(content, 'seek') and hasattr(content, 'tell'):  # file-like object
+            pos = content.tell()
+            content.seek(0, io.SEEK_END)
+            size = content.tell()
+            content.seek(pos)
+            return size
+        return 0
+    
+    if logger.isEnabledFor(logging.DEBUG):
         file_info = {}
         if form_files:
             # form_files can be either a dict (single file) or a list (array of files)
@@ -334,68 +812,55 @@ async def retell_post_multipart(
                             "content_type": file_data[2] if len(file_data) > 2 else "unknown"
                         }
         
-        logger.info(f"[retell_post_multipart] Sending to {path}, data: {form_data_dict}, files: {file_info}")
-        print(f"[DEBUG] [retell_post_multipart] Sending to {path}", flush=True)
-        print(f"[DEBUG] [retell_post_multipart] Data: {form_data_dict}", flush=True)
-        print(f"[DEBUG] [retell_post_multipart] Files: {file_info}", flush=True)
-        
-        # httpx.post() accepts files as either:
-        # - Dict: {"field_name": (filename, content, content_type)} for single file
-        # - List: [("field_name", (filename, content, content_type)), ...] for arrays
-        # When using files=list, we should combine with data into a single multipart request
-        # httpx will handle combining files and data automatically
-        
-        # httpx expects files and data to be passed separately
-        # files can be: Dict or List of tuples
-        # data can be: Dict
-        # httpx will automatically combine them into multipart/form-data
-        
-        # IMPORTANT: Don't mix files and data in a single list!
-        # When files is a list, every element must be a file tuple
-        # Keep files and data separate - httpx will merge them correctly
-        files_param = form_files if form_files else None
-        data_param = form_data_dict if form_data_dict else None
-        
-        # Debug: log the exact format being passed
-        print(f"[DEBUG] [retell_post_multipart] files_param type: {type(files_param)}", flush=True)
-        if files_param:
-            if isinstance(files_param, list):
-                print(f"[DEBUG] [retell_post_multipart] files_param is list, length: {len(files_param)}", flush=True)
-                if len(files_param) > 0:
-                    print(f"[DEBUG] [retell_post_multipart] First element: {files_param[0]}, type: {type(files_param[0])}", flush=True)
-                    if isinstance(files_param[0], tuple) and len(files_param[0]) > 1:
-                        print(f"[DEBUG] [retell_post_multipart] First element[1] type: {type(files_param[0][1])}", flush=True)
-            elif isinstance(files_param, dict):
-                print(f"[DEBUG] [retell_post_multipart] files_param is dict, keys: {list(files_param.keys())}", flush=True)
-        
-        resp = await client.post(
-            f"{get_retell_base_url()}{path}",
-            headers=headers,
-            files=files_param,
-            data=data_param
+        logger.debug(
+            "[retell_post_multipart] Sending to %s, data_keys: %s, files: %s",
+            path, list(form_data_dict.keys()), file_info,
         )
-        
-        logger.info(f"[retell_post_multipart] Response status: {resp.status_code}, body: {resp.text[:500]}")
-        print(f"[DEBUG] [retell_post_multipart] Response status: {resp.status_code}", flush=True)
-        print(f"[DEBUG] [retell_post_multipart] Response body: {resp.text[:500]}", flush=True)
-        
-        if resp.status_code >= 400:
-            # Try to parse Retell error response
-            error_detail = resp.text
-            try:
-                error_json = resp.json()
-                if isinstance(error_json, dict):
-                    error_msg = error_json.get("message") or error_json.get("error") or error_json.get("detail") or resp.text
-                    error_detail = error_msg
-            except Exception:
-                pass
-            logger.error(f"[retell_post_multipart] Retell API error: {resp.status_code} - {error_detail}")
-            print(f"[DEBUG] [retell_post_multipart] Retell API error: {resp.status_code} - {error_detail}", flush=True)
-            raise HTTPException(status_code=resp.status_code, detail=error_detail)
-        if resp.status_code == 204 or not resp.content:
-            return {}
+    
+    # httpx.post() accepts files as either:
+    # - Dict: {"field_name": (filename, content, content_type)} for single file
+    # - List: [("field_name", (filename, content, content_type)), ...] for arrays
+    # When using files=list, we should combine with data into a single multipart request
+    # httpx will handle combining files and data automatically
+    
+    # httpx expects files and data to be passed separately
+    # files can be: Dict or List of tuples
+    # data can be: Dict
+    # httpx will automatically combine them into multipart/form-data
+    
+    # IMPORTANT: Don't mix files and data in a single list!
+    # When files is a list, every element must be a file tuple
+    # Keep files and data separate - httpx will merge them correctly
+    files_param = form_files if form_files else None
+    data_param = form_data_dict if form_data_dict else None
+    
+    resp = await retell_request(
+        "POST",
+        path,
+        headers=headers,
+        timeout=120,  # Longer timeout for file uploads (2 minutes)
+        files=files_param,
+        data=data_param,
+    )
+    
+    logger.debug("[retell_post_multipart] POST %s -> %s", path, resp.status_code)
+    
+    if resp.status_code >= 400:
+        # Try to parse Retell error response
+        error_detail = resp.text
         try:
-            return resp.json()
+            error_json = resp.json()
+            if isinstance(error_json, dict):
+                error_msg = error_json.get("message") or error_json.get("error") or error_json.get("detail") or resp.text
+                error_detail = error_msg
         except Exception:
-            return {}
+            pass
+        logger.error("[retell_post_multipart] Retell API error: %s - %s", resp.status_code, str(error_detail)[:500])
+        raise HTTPException(status_code=resp.status_code, detail=error_detail)
+    if resp.status_code == 204 or not resp.content:
+        return {}
+    try:
+        return resp.json()
+    except Exception:
+        return {}
 
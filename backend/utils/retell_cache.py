@@ -0,0 +1,275 @@
+"""Read-through cache for Retell catalog endpoints (voices, agents, phone numbers, KBs)
+
+Catalog data changes rarely but was fetched from Retell on every page load.
+Entries are keyed by a fingerprint of the tenant's Retell credentials plus the
+API path, so tenants sharing the global key share entries and BYO tenants are
+isolated. Stale entries are served while a background refresh runs
+(stale-while-revalidate). Redis (REDIS_URL) is used as an optional second tier
+shared across processes; invalidations are also published on a Redis channel so
+every process drops its in-memory (L1) entries right away instead of serving
+them until their TTL runs out.
+"""
+import os
+import json
+import copy
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional, Tuple, Set
+
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+RETELL_CACHE_ENABLED = os.getenv("RETELL_CACHE_ENABLED", "1") == "1"
+_REDIS_PREFIX = "retell:cache"
+_INVALIDATION_CHANNEL = "retell:cache:invalidate"
+
+# Per-endpoint (fresh_ttl_s, stale_ttl_s). Stale window is how long past fresh_ttl an entry
+# may still be served while it is refreshed in the background.
+_ENDPOINT_TTLS: Dict[str, Tuple[float, float]] = {
+    "/list-voices": (3600, 86400),
+    "/get-voice": (3600, 86400),
+    "/list-agents": (60, 600),
+    "/v2/list-agents": (60, 600),
+    "/get-agent": (60, 600),
+    "/v2/get-agent": (60, 600),
+    "/get-agent-versions": (60, 600),
+    "/v2/get-agent-versions": (60, 600),
+    "/list-phone-numbers": (60, 600),
+    "/v2/list-phone-numbers": (60, 600),
+    "/get-phone-number": (60, 600),
+    "/list-knowledge-bases": (30, 300),
+    "/get-knowledge-base": (15, 120),  # KB status changes while Retell processes sources
+}
+
+# Mutation endpoint keyword -> cached endpoints to drop
+_INVALIDATION_GROUPS: Dict[str, Tuple[str, ...]] = {
+    "agent": ("/list-agents", "/v2/list-agents", "/get-agent", "/v2/get-agent",
+              "/get-agent-versions", "/v2/get-agent-versions"),
+    "retell-llm": ("/get-agent", "/v2/get-agent", "/get-agent-versions", "/v2/get-agent-versions"),
+    "phone-number": ("/list-phone-numbers", "/v2/list-phone-numbers", "/get-phone-number"),
+    "knowledge-base": ("/list-knowledge-bases", "/get-knowledge-base"),
+}
+
+# L1: key -> (value, fetched_at monotonic)
+_CACHE: Dict[str, Tuple[Any, float]] = {}
+_REFRESHING: Set[str] = set()
+_STATS: Dict[str, int] = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "invalidations": 0}
+_LISTENER: Optional[threading.Thread] = None
+_LISTENER_LOCK = threading.Lock()
+
+
+def _credential_fingerprint(authorization: str) -> str:
+    return hashlib.sha256(authorization.encode("utf-8")).hexdigest()[:16]
+
+
+def _cache_key(fingerprint: str, path: str) -> str:
+    return f"{fingerprint}:{path}"
+
+
+def _ttls_for(path: str) -> Optional[Tuple[float, float]]:
+    from utils.retell import _endpoint_key
+    return _ENDPOINT_TTLS.get(_endpoint_key(path))
+
+
+def _redis_get(key: str) -> Optional[Tuple[Any, float]]:
+    r = get_redis()
+    if r is None:
+        return None
+    try:
+        raw = r.get(f"{_REDIS_PREFIX}:{key}")
+        if not raw:
+            return None
+        payload = json.loads(raw)
+        # Stored wall-clock time; convert to local monotonic age
+        age = max(0.0, time.time() - float(payload["ts"]))
+        return payload["value"], time.monotonic() - age
+    except Exception:
+        return None
+
+
+def _redis_set(key: str, value: Any, expire_s: float) -> None:
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        r.set(
+            f"{_REDIS_PREFIX}:{key}",
+            json.dumps({"ts": time.time(), "value": value}),
+            ex=max(1, int(expire_s)),
+        )
+    except Exception:
+        pass
+
+
+async def _fetch_and_store(key: str, path: str, tenant_id: Optional[int], ttls: Tuple[float, float]) -> Any:
+    from utils.retell import retell_get_json
+    value = await retell_get_json(path, tenant_id=tenant_id)
+    _CACHE[key] = (value, time.monotonic())
+    _redis_set(key, value, ttls[0] + ttls[1])
+    return value
+
+
+async def _background_refresh(key: str, path: str, tenant_id: Optional[int], ttls: Tuple[float, float]) -> None:
+    try:
+        await _fetch_and_store(key, path, tenant_id, ttls)
+        _STATS["refreshes"] += 1
+    except Exception:
+        # Keep serving stale until the stale window expires
+        pass
+    finally:
+        _REFRESHING.discard(key)
+
+
+async def retell_get_cached(path: str, tenant_id: Optional[int] = None) -> Any:
+    """GET a Retell catalog path through the cache
+
+    Paths without a configured TTL (or with caching disabled) go straight to Retell.
+
+    Args:
+        path: API path (e.g., "/list-voices")
+        tenant_id: Optional tenant ID for BYO Retell account support
+
+    Returns:
+        JSON response (a private copy, safe to mutate)
+    """
+    from utils.retell import retell_get_json, get_retell_headers
+
+    ttls = _ttls_for(path)
+    if not RETELL_CACHE_ENABLED or ttls is None:
+        return await retell_get_json(path, tenant_id=tenant_id)
+
+    _ensure_listener()
+    fresh_ttl, stale_ttl = ttls
+    key = _cache_key(_credential_fingerprint(get_retell_headers(tenant_id)["Authorization"]), path)
+
+    entry = _CACHE.get(key)
+    if entry is None:
+        entry = _redis_get(key)
+        if entry is not None:
+            _CACHE[key] = entry
+
+    if entry is not None:
+        value, fetched_at = entry
+        age = time.monotonic() - fetched_at
+        if age < fresh_ttl:
+            _STATS["hits"] += 1
+            return copy.deepcopy(value)
+        if age < fresh_ttl + stale_ttl:
+            _STATS["stale_hits"] += 1
+            if key not in _REFRESHING:
+                _REFRESHING.add(key)
+                asyncio.create_task(_background_refresh(key, path, tenant_id, ttls))
+            return copy.deepcopy(value)
+
+    _STATS["misses"] += 1
+    value = await _fetch_and_store(key, path, tenant_id, ttls)
+    return copy.deepcopy(value)
+
+
+def _key_matcher(fingerprint: Optional[str], endpoints: Optional[Tuple[str, ...]]):
+    def _matches(key: str) -> bool:
+        fp, _, path = key.partition(":")
+        if fingerprint is not None and fp != fingerprint:
+            return False
+        if endpoints is None:
+            return True
+        from utils.retell import _endpoint_key
+        return _endpoint_key(path) in endpoints
+    return _matches
+
+
+def _drop_local(fingerprint: Optional[str], endpoints: Optional[Tuple[str, ...]]) -> None:
+    matches = _key_matcher(fingerprint, endpoints)
+    for key in [k for k in list(_CACHE.keys()) if matches(k)]:
+        _CACHE.pop(key, None)
+
+
+def _listen_for_invalidations() -> None:
+    """Drop L1 entries whenever any process (this one included) announces an invalidation"""
+    while True:
+        r = get_redis()
+        if r is None:
+            return
+        try:
+            pubsub = r.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(_INVALIDATION_CHANNEL)
+            # Anything may have been invalidated while (re)subscribing
+            _CACHE.clear()
+            for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    data = json.loads(message.get("data") or "{}")
+                    endpoints = data.get("endpoints")
+                    _drop_local(data.get("fp"), tuple(endpoints) if endpoints is not None else None)
+                except Exception:
+                    _CACHE.clear()
+        except Exception as e:
+            logger.warning("[retell_cache] invalidation listener disconnected: %s", e)
+            time.sleep(5)
+
+
+def _ensure_listener() -> None:
+    global _LISTENER
+    if _LISTENER is not None or get_redis() is None:
+        return
+    with _LISTENER_LOCK:
+        if _LISTENER is None:
+            _LISTENER = threading.Thread(target=_listen_for_invalidations, name="retell-cache-listener", daemon=True)
+            _LISTENER.start()
+
+
+def invalidate_retell_cache(authorization: Optional[str] = None, endpoints: Optional[Tuple[str, ...]] = None) -> None:
+    """Drop cached catalog entries (locally, in Redis and in every other process's L1)
+
+    Args:
+        authorization: Authorization header of the credentials to invalidate (None = all credentials)
+        endpoints: Endpoint keys to drop (e.g. ("/list-agents",)); None = all endpoints
+    """
+    fingerprint = _credential_fingerprint(authorization) if authorization else None
+    _drop_local(fingerprint, endpoints)
+    _STATS["invalidations"] += 1
+
+    r = get_redis()
+    if r is None:
+        return
+    matches = _key_matcher(fingerprint, endpoints)
+    try:
+        pattern = f"{_REDIS_PREFIX}:{fingerprint or '*'}:*"
+        stale_keys = [
+            k for k in r.scan_iter(match=pattern, count=500)
+            if matches(k[len(_REDIS_PREFIX) + 1:])
+        ]
+        if stale_keys:
+            r.delete(*stale_keys)
+    except Exception:
+        pass
+    try:
+        r.publish(_INVALIDATION_CHANNEL, json.dumps({
+            "fp": fingerprint,
+            "endpoints": list(endpoints) if endpoints is not None else None,
+        }))
+    except Exception as e:
+        logger.warning("[retell_cache] could not publish invalidation: %s", e)
+
+
+def invalidate_for_mutation(path: str, authorization: Optional[str]) -> None:
+    """Invalidate catalog entries affected by a successful mutating Retell request"""
+    from utils.retell import _endpoint_key
+    endpoint = _endpoint_key(path)
+    affected: Tuple[str, ...] = ()
+    for keyword, endpoints in _INVALIDATION_GROUPS.items():
+        if keyword in endpoint:
+            affected += endpoints
+    if affected:
+        invalidate_retell_cache(authorization, affected)
+
+
+def get_retell_cache_stats() -> Dict[str, int]:
+    """Cache counters (hits, stale_hits, misses, refreshes, invalidations) and current size"""
+    return {**_STATS, "entries": len(_CACHE)}
@@ -9,7 +9,6 @@ import urllib.parse
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, Any
 
-import httpx
 from config.database import engine
 from sqlalchemy.orm import Session
 from utils.helpers import _resolve_from_number
@@ -51,12 +50,30 @@ if not _missing_queue():
         metadata: Optional[Dict[str, Any]],
         spacing_ms: Optional[int] = None,
         kb: Optional[Dict[str, Any]] = None,
+        reservation_id: Optional[int] = None,
     ) -> None:
+        import logging
+        import httpx
+        from utils.retell import retell_request, retell_circuit_open
+        from services.spend_ledger import attach_reservation, release_reservation
+
+        logger = logging.getLogger(__name__)
+
+        def _settle_reservation(provider_call_id: Optional[str]) -> None:
+            """Attach the budget reservation to the placed call, or release it if no call was placed"""
+            if reservation_id is None:
+                return
+            with Session(engine) as session:
+                if provider_call_id:
+                    attach_reservation(session, reservation_id, provider_call_id)
+                else:
+                    release_reservation(session, reservation_id)
+                session.commit()
+
         api_key = os.getenv("RETELL_API_KEY")
         if not api_key:
+            _settle_reservation(None)
             return
-        base_url = os.getenv("RETELL_BASE_URL", "https://api.retellai.com")
-        endpoint = f"{base_url}/v2/create-phone-call"
         headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
         
         # Resolve from_number with priority: explicit -> campaign -> settings -> env
@@ -76,6 +93,7 @@ if not _missing_queue():
             )
         
         if not effective_from:
+            _settle_reservation(None)
             return
         
         body: Dict[str, Any] = {"to_number": to_number, "from_number": effective_from}
@@ -102,20 +120,51 @@ if not _missing_queue():
         except Exception:
             pass
 
+        # Global backoff: if Retell's dial endpoint is tripped (in any process), fail fast so
+        # dramatiq re-schedules the job with its own backoff instead of piling onto Retell
+        if retell_circuit_open("/v2/create-phone-call"):
+            if _redis is not None:
+                _redis.incr("metrics:jobs:deferred")
+            raise RuntimeError("Retell circuit open for /v2/create-phone-call, deferring dial")
+
         async def _run() -> None:
-            async with httpx.AsyncClient(timeout=30) as client:
+            try:
+                if _redis is not None:
+                    _redis.incr("metrics:jobs:started")
+                    if tenant_id is not None:
+                        _redis.incr(f"metrics:jobs:started:{tenant_id}")
                 try:
+                    resp = await retell_request("POST", "/v2/create-phone-call", headers=headers, json=body)
+                except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                    raise  # never reached Retell: retried by dramatiq
+                except httpx.TransportError as e:
+                    # The request may have reached Retell (the call may have been placed): don't re-dial.
+                    # The reservation is kept and expires; a placed call is still costed when it finishes.
+                    logger.error("[start_phone_call] create-phone-call to %s failed after sending: %s", to_number, e)
                     if _redis is not None:
-                        _redis.incr("metrics:jobs:started")
-                        if tenant_id is not None:
-                            _redis.incr(f"metrics:jobs:started:{tenant_id}")
-                    resp = await client.post(endpoint, headers=headers, json=body)
-                    if _redis is not None:
-                        _redis.incr("metrics:jobs:succeeded")
-                except Exception:
+                        _redis.incr("metrics:jobs:failed")
+                    return
+                if resp.status_code == 429:
+                    # Rate limited, nothing was created: retried by dramatiq; the reservation is kept
+                    raise RuntimeError("Retell create-phone-call rate limited (429), deferring dial")
+                if resp.status_code >= 500:
+                    # Not retried: a 5xx on a create doesn't mean the call wasn't placed (same policy
+                    # as retell_request for non-idempotent POSTs). The reservation is kept and expires.
+                    logger.error("[start_phone_call] create-phone-call to %s failed: %s", to_number, resp.status_code)
                     if _redis is not None:
                         _redis.incr("metrics:jobs:failed")
-                    raise
+                    return
+                if resp.status_code >= 400:
+                    _settle_reservation(None)
+                else:
+                    data = resp.json()
+                    _settle_reservation(data.get("call_id") or data.get("id"))
+                if _redis is not None:
+                    _redis.incr("metrics:jobs:succeeded")
+            except Exception:
+                if _redis is not None:
+                    _redis.incr("metrics:jobs:failed")
+                raise
 
         asyncio.run(_run())
     
@@ -133,8 +182,8 @@ if not _missing_queue():
         """
         from datetime import datetime, timezone, timedelta
         from models.agents import PhoneNumber
-        from models.compliance import CostEvent
         from services.enforcement import _tenant_monthly_spend_cents
+        from services.spend_ledger import record_cost
         from services.workspace_settings import get_workspace_settings
         from utils.retell import get_retell_api_key, retell_delete_json
         import logging
@@ -204,14 +253,14 @@ if not _missing_queue():
                                 logger.info(f"[process_phone_number_renewals] Renewing number {phone_number.e164} (cost: ${monthly_cost_cents/100:.2f}, remaining budget: ${remaining_budget/100:.2f})")
                                 
                                 # Record renewal cost
-                                renewal_cost_event = CostEvent(
-                                    call_id=None,
+                                record_cost(
+                                    session,
+                                    tenant_id,
                                     component="telephony",
-                                    amount=monthly_cost_cents,
+                                    amount_cents=monthly_cost_cents,
                                     currency="USD",
                                     ts=now,
                                 )
-                                session.add(renewal_cost_event)
                                 
                                 # Update purchased_at to now (reset 30-day cycle)
                                 phone_number.purchased_at = now
@@ -320,3 +369,67 @@ if not _missing_queue():
             logger.info("[process_phone_number_renewals] Daily renewal check completed")
 
 
+    
+    
+    @dramatiq.actor(max_retries=3, time_limit=600000)  # 10 minutes timeout
+    def sync_retell_calls(tenant_id: Optional[int] = None) -> None:
+        """Incrementally sync calls from Retell (recovers missed webhooks)
+        
+        Args:
+            tenant_id: Sync only this tenant's Retell account; None syncs every account
+        
+        Should be scheduled every few minutes via cron or scheduler.
+        """
+        from services.call_sync import sync_retell_calls as _sync_account, sync_all_retell_calls, retell_account_for_tenant
+        
+        if tenant_id is None:
+            asyncio.run(sync_all_retell_calls())
+        else:
+            asyncio.run(_sync_account(retell_account_for_tenant(tenant_id)))
+
+
+    @dramatiq.actor(max_retries=3, time_limit=600000)  # 10 minutes timeout
+    def reconcile_spend_ledger() -> None:
+        """Recompute per-tenant monthly spend counters from cost_events
+        
+        Should be scheduled hourly via cron or scheduler.
+        """
+        from services.spend_ledger import reconcile_spend_ledger as _reconcile
+        
+        _reconcile()
+
+
+    @dramatiq.actor(max_retries=3, time_limit=600000)  # 10 minutes timeout
+    def rollup_usage_daily(days: Optional[int] = None) -> None:
+        """Recompute the daily per-tenant usage rollups of the last `days` days
+        
+        Should be scheduled hourly via cron or scheduler. Run once with a large
+        `days` to backfill history.
+        """
+        from services.usage_rollup import rebuild_usage_daily, USAGE_ROLLUP_DAYS
+        
+        rebuild_usage_daily(days or USAGE_ROLLUP_DAYS)
+
+
+    @dramatiq.actor(max_retries=3, time_limit=600000)  # 10 minutes timeout
+    def backfill_lead_timezones() -> None:
+        """Store the IANA zone of leads created before leads.timezone existed
+        
+        Run once after migration 0027; re-running only touches leads still NULL.
+        """
+        import logging
+        from services.enforcement import backfill_lead_timezones as _backfill
+        
+        logger = logging.getLogger(__name__)
+        logger.info("[backfill_lead_timezones] Updated %s leads", _backfill())
+
+
+    @dramatiq.actor(max_retries=3, time_limit=600000)  # 10 minutes timeout
+    def report_stripe_usage() -> None:
+        """Send pending metered usage (billed minutes) to Stripe
+        
+        Should be scheduled every STRIPE_USAGE_WINDOW_S (hourly by default) via cron or scheduler.
+        """
+        from services.stripe_usage import report_usage_to_stripe
+        
+        report_usage_to_stripe()